@@ -0,0 +1,199 @@
+"""Fingerprinted, precompressed static assets and in-memory HTML shells."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import mimetypes
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Mapping
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Scope
+
+try:
+    from .encoding import EncodedBody, choose_encoding, compress_variants
+except ImportError:  # pragma: no cover - fallback for script execution
+    from encoding import EncodedBody, choose_encoding, compress_variants
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+COMPRESSIBLE = {".css", ".js", ".json", ".svg", ".txt", ".html"}
+SUFFIXES = {"identity": "", "gzip": ".gz", "br": ".br"}
+MANIFEST = "manifest.json"
+# Bump when the build output format changes so stale builds are redone.
+BUILD_FORMAT = 1
+
+
+def fingerprint(name: str, data: bytes) -> str:
+    """Return ``name`` with a short content hash before its extension."""
+
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    stem, dot, ext = name.rpartition(".")
+    return f"{stem}.{digest}.{ext}" if dot else f"{name}.{digest}"
+
+
+class AssetPipeline:
+    """Build and look up fingerprinted assets for ``source``."""
+
+    def __init__(self, source: Path, output: Path) -> None:
+        self.source = Path(source)
+        self.output = Path(output)
+        # logical name -> fingerprinted name, e.g. "style.css" -> "style.ab12.css"
+        self.assets: Dict[str, str] = {}
+        # fingerprinted name -> available encodings ("identity", "gzip", "br")
+        self.files: Dict[str, tuple[str, ...]] = {}
+        self.pages: Dict[str, EncodedBody] = {}
+        self.ready = False
+        self._lock = threading.Lock()
+
+    def _sources(self) -> Dict[str, str]:
+        return {
+            p.name: hashlib.sha256(p.read_bytes()).hexdigest()
+            for p in sorted(self.source.iterdir())
+            if p.is_file()
+        }
+
+    def _manifest(self) -> Dict[str, Any]:
+        try:
+            return json.loads((self.output / MANIFEST).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def prepare(self) -> None:
+        """Load the existing build when it matches the sources, else rebuild.
+
+        If the build directory cannot be written the pages are still served
+        from memory, just with their original, unfingerprinted references.
+        """
+
+        sources = self._sources()
+        manifest = self._manifest()
+        if manifest.get("format") == BUILD_FORMAT and manifest.get("sources") == sources:
+            self.assets = manifest["assets"]
+            self.files = {k: tuple(v) for k, v in manifest["files"].items()}
+        else:
+            try:
+                self.build(sources)
+            except OSError as exc:
+                logger.warning("Serving unfingerprinted assets; build failed: %s", exc)
+                self.assets, self.files = {}, {}
+        self._load_pages()
+        self.ready = True
+
+    def ensure(self) -> None:
+        """Run :meth:`prepare` once, on first use rather than at import."""
+
+        if self.ready:
+            return
+        with self._lock:
+            if not self.ready:
+                self.prepare()
+
+    def build(self, sources: Mapping[str, str] | None = None) -> None:
+        """Write fingerprinted copies and compressed siblings to ``output``.
+
+        Files from the previous build that are no longer referenced are
+        removed; nothing else in ``output`` is touched.
+        """
+
+        sources = sources if sources is not None else self._sources()
+        previous = self._manifest().get("files", {})
+        self.output.mkdir(parents=True, exist_ok=True)
+        self.assets, self.files = {}, {}
+        for path in sorted(self.source.iterdir()):
+            if not path.is_file() or path.suffix == ".html":
+                continue
+            data = path.read_bytes()
+            name = fingerprint(path.name, data)
+            (self.output / name).write_bytes(data)
+            encodings = ["identity"]
+            if path.suffix in COMPRESSIBLE:
+                for coding, blob in compress_variants(data).items():
+                    (self.output / (name + SUFFIXES[coding])).write_bytes(blob)
+                    encodings.append(coding)
+            self.assets[path.name] = name
+            self.files[name] = tuple(encodings)
+        manifest = {
+            "format": BUILD_FORMAT,
+            "sources": dict(sources),
+            "assets": self.assets,
+            "files": self.files,
+        }
+        (self.output / MANIFEST).write_text(json.dumps(manifest, indent=2))
+        for name, encodings in previous.items():
+            if name not in self.files:
+                for coding in encodings:
+                    (self.output / (name + SUFFIXES.get(coding, ""))).unlink(missing_ok=True)
+        logger.info("Built %d fingerprinted assets in %s", len(self.assets), self.output)
+
+    def rewrite(self, html: str) -> str:
+        """Point ``/static/<name>`` references in ``html`` at fingerprints."""
+
+        if not self.assets:
+            return html
+        names = "|".join(re.escape(n) for n in sorted(self.assets, key=len, reverse=True))
+        pattern = re.compile(rf"/static/({names})(?=[\"'?#\s>)])")
+        return pattern.sub(lambda m: "/static/" + self.assets[m.group(1)], html)
+
+    def _load_pages(self) -> None:
+        self.pages = {
+            p.name: EncodedBody.build(
+                self.rewrite(p.read_text(encoding="utf-8")).encode("utf-8"),
+                media_type="text/html; charset=utf-8",
+            )
+            for p in sorted(self.source.glob("*.html"))
+        }
+
+    def page(self, name: str, headers: Mapping[str, str]) -> Response:
+        """Serve the in-memory HTML shell ``name``."""
+
+        self.ensure()
+        body = self.pages.get(name)
+        if body is None:  # pipeline disabled or page added after startup
+            return FileResponse(self.source / name)
+        return body.respond(headers)
+
+
+class AssetFiles(StaticFiles):
+    """``StaticFiles`` that serves fingerprinted names from the build.
+
+    Unknown names fall through to the plain files in ``directory`` so old
+    links and direct references keep working.
+    """
+
+    def __init__(self, *, directory: Path, pipeline: AssetPipeline) -> None:
+        super().__init__(directory=str(directory))
+        self.pipeline = pipeline
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if not self.pipeline.ready:
+            await asyncio.to_thread(self.pipeline.ensure)
+        encodings = self.pipeline.files.get(path)
+        if encodings is None:
+            return await super().get_response(path, scope)
+        accepted = choose_encoding(encodings, Headers(scope=scope).get("accept-encoding"))
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        headers = {"Cache-Control": IMMUTABLE, "Vary": "Accept-Encoding"}
+        if accepted != "identity":
+            headers["Content-Encoding"] = accepted
+        return FileResponse(
+            self.pipeline.output / (path + SUFFIXES[accepted]), media_type=media_type, headers=headers
+        )
+
+
+if __name__ == "__main__":  # pragma: no cover - build entry point
+    import os
+
+    app_dir = Path(__file__).parent
+    out = Path(os.getenv("ASSET_BUILD_DIR", app_dir / "build" / "static"))
+    pipeline = AssetPipeline(app_dir / "static", out)
+    pipeline.build()
+    print(json.dumps(pipeline.assets, indent=2))
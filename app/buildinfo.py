@@ -0,0 +1,79 @@
+"""Build-time metadata such as the resume's "last updated" date."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import subprocess
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict
+
+APP_DIR = Path(__file__).parent
+BUILD_INFO_PATH = APP_DIR / "build_info.json"
+
+
+def content_version(raw: bytes) -> str:
+    """Return the short content hash used to version resume data."""
+
+    return hashlib.sha256(raw).hexdigest()[:12]
+
+
+@lru_cache(maxsize=1)
+def load_build_info(path: Path = BUILD_INFO_PATH) -> Dict[str, Any]:
+    """Return the generated build metadata, or ``{}`` when it was not built."""
+
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def last_updated(path: Path, version: str) -> str:
+    """Return the ``YYYY-MM-DD`` date ``path`` was last changed.
+
+    ``version`` is the content hash of the data being served; the build
+    artifact is used only when it was generated for that same content.
+    """
+
+    entry = load_build_info().get("files", {}).get(path.name, {})
+    if entry.get("version") == version and entry.get("last_updated"):
+        return entry["last_updated"]
+    return datetime.fromtimestamp(path.stat().st_mtime).strftime("%Y-%m-%d")
+
+
+def git_last_updated(path: Path) -> str | None:
+    """Return the last commit date touching ``path`` (build time only)."""
+
+    try:
+        out = subprocess.check_output(
+            ["git", "log", "-1", "--format=%cs", "--", path.name],
+            cwd=path.parent,
+            stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.decode().strip() or None
+
+
+def generate(paths: list[Path], out: Path = BUILD_INFO_PATH) -> Dict[str, Any]:
+    """Write ``out`` describing ``paths`` and return the written mapping."""
+
+    files: Dict[str, Any] = {}
+    for path in paths:
+        stamp = git_last_updated(path) or datetime.fromtimestamp(
+            path.stat().st_mtime
+        ).strftime("%Y-%m-%d")
+        files[path.name] = {
+            "version": content_version(path.read_bytes()),
+            "last_updated": stamp,
+        }
+    info = {"generated_at": datetime.now().isoformat(timespec="seconds"), "files": files}
+    out.write_text(json.dumps(info, indent=2) + "\n")
+    load_build_info.cache_clear()
+    return info
+
+
+if __name__ == "__main__":  # pragma: no cover - build entry point
+    print(json.dumps(generate([APP_DIR / "resume.json"]), indent=2))
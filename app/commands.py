@@ -0,0 +1,177 @@
+"""Table-driven command registry for the terminal."""
+
+from __future__ import annotations
+
+import shlex
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+try:
+    from .fuzzy import TrigramIndex
+except ImportError:  # pragma: no cover - fallback for script execution
+    from fuzzy import TrigramIndex
+
+Handler = Callable[["Invocation"], Optional[Dict[str, Any]]]
+
+EMPTY_FLAGS: Mapping[str, Tuple[str, ...]] = MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class CommandSpec:
+    """Declarative description of one command.
+
+    ``flags`` maps each recognised ``--flag`` to the number of values it
+    consumes.  ``min_args`` is the number of words (flags included) that
+    must follow the command name; shorter invocations are treated as unknown
+    commands, mirroring the old ``if command == "open" and args`` checks.
+    ``arg_kinds`` names what each positional argument is (``"section"`` or
+    ``"term"``), the last one covering any further arguments; typo
+    suggestions only correct arguments that have a kind.
+    """
+
+    name: str
+    handler: Handler
+    flags: Mapping[str, int] = field(default_factory=dict)
+    min_args: int = 0
+    arg_kinds: Tuple[str, ...] = ()
+
+    def arg_kind(self, index: int) -> str | None:
+        if not self.arg_kinds:
+            return None
+        return self.arg_kinds[min(index, len(self.arg_kinds) - 1)]
+
+
+@dataclass(frozen=True)
+class ParsedCommand:
+    """Result of splitting a command line; shared through the parse cache."""
+
+    name: str
+    words: Tuple[str, ...]
+    positional: Tuple[str, ...]
+    flags: Mapping[str, Tuple[str, ...]]
+
+
+@dataclass
+class Invocation:
+    """Everything a handler needs to run one command."""
+
+    state: Dict[str, Any]
+    line: str
+    parsed: ParsedCommand
+    snapshot: Any
+
+    @property
+    def args(self) -> Tuple[str, ...]:
+        """Positional arguments, original case."""
+
+        return self.parsed.positional
+
+    def arg(self, index: int, default: str | None = None) -> str | None:
+        return self.parsed.positional[index] if index < len(self.parsed.positional) else default
+
+    def has(self, flag: str) -> bool:
+        return flag in self.parsed.flags
+
+    def flag(self, flag: str, default: str | None = None) -> str | None:
+        """Return the first value given for ``flag``."""
+
+        values = self.parsed.flags.get(flag, ())
+        return values[0] if values else default
+
+    def flag_values(self, flag: str) -> Tuple[str, ...]:
+        return self.parsed.flags.get(flag, ())
+
+
+class CommandRegistry:
+    """Map command names to handlers and parse command lines for them."""
+
+    def __init__(self, cache_size: int = 1024) -> None:
+        self.specs: Dict[str, CommandSpec] = {}
+        self.parse = lru_cache(maxsize=cache_size)(self._parse)
+        self._names: TrigramIndex | None = None
+
+    def register(
+        self,
+        *names: str,
+        flags: Mapping[str, int] | None = None,
+        min_args: int = 0,
+        arg_kinds: Tuple[str, ...] = (),
+    ) -> Callable[[Handler], Handler]:
+        """Decorator registering a handler under one or more ``names``."""
+
+        def decorator(handler: Handler) -> Handler:
+            for name in names:
+                self.specs[name] = CommandSpec(
+                    name, handler, dict(flags or {}), min_args, tuple(arg_kinds)
+                )
+            self.parse.cache_clear()
+            self._names = None
+            return handler
+
+        return decorator
+
+    def suggest(self, name: str) -> str | None:
+        """The registered command closest to a misspelt ``name``."""
+
+        if self._names is None:
+            self._names = TrigramIndex(self.specs)
+        return self._names.best(name)
+
+    def _parse(self, line: str) -> ParsedCommand | None:
+        """Split ``line`` into name, positional arguments and flag values.
+
+        Flags are matched case-insensitively and consume the number of values
+        declared in the command's spec (fewer if the line ends early).
+        Returns ``None`` for lines that cannot be tokenised.
+        """
+
+        try:
+            words = tuple(shlex.split(line))
+        except ValueError:  # e.g. unbalanced quotes
+            return None
+        if not words:
+            return ParsedCommand("", (), (), EMPTY_FLAGS)
+
+        name = words[0].lower()
+        spec = self.specs.get(name)
+        arity = spec.flags if spec else {}
+        positional = []
+        flags: Dict[str, Tuple[str, ...]] = {}
+        i = 1
+        while i < len(words):
+            word = words[i]
+            count = arity.get(word.lower()) if word.startswith("--") else None
+            if count is None:
+                positional.append(word)
+                i += 1
+                continue
+            flags.setdefault(word.lower(), tuple(words[i + 1 : i + 1 + count]))
+            i += 1 + count
+        return ParsedCommand(
+            name,
+            words[1:],
+            tuple(positional),
+            MappingProxyType(flags) if flags else EMPTY_FLAGS,
+        )
+
+    def dispatch(
+        self,
+        state: Dict[str, Any],
+        line: str,
+        snapshot: Any,
+        parsed: ParsedCommand | None = None,
+    ) -> Dict[str, Any] | None:
+        """Run the handler for ``line``; ``None`` when no command matched.
+
+        ``parsed`` may be passed when the caller already parsed ``line``.
+        """
+
+        parsed = parsed or self.parse(line)
+        if parsed is None:
+            return None
+        spec = self.specs.get(parsed.name)
+        if spec is None or len(parsed.words) < spec.min_args:
+            return None
+        return spec.handler(Invocation(state, line, parsed, snapshot))
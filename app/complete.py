@@ -0,0 +1,77 @@
+"""Prefix tries behind ``/api/complete``."""
+
+from __future__ import annotations
+
+import shlex
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+# Completions kept per trie node (and returned per request).
+MAX_COMPLETIONS = 20
+
+
+class Trie:
+    """Case-insensitive prefix tree mapping prefixes to completions.
+
+    Every node holds its first ``limit`` completions, so a lookup walks
+    ``len(prefix)`` nodes whatever the number of terms.  ``terms`` are
+    inserted in sorted order so every node's list is sorted.
+    Values are returned as given, e.g. quoted when they contain spaces.
+    """
+
+    def __init__(self, terms: Iterable[str], limit: int = MAX_COMPLETIONS) -> None:
+        # node = (children by character, first ``limit`` completions below it)
+        self.root: Tuple[Dict[str, Any], List[str]] = ({}, [])
+        self.size = 0
+        for term in sorted(set(terms), key=str.lower):
+            self.size += 1
+            node = self.root
+            if len(node[1]) < limit:
+                node[1].append(term)
+            for char in term.lower().lstrip("'\""):
+                node = node[0].setdefault(char, ({}, []))
+                if len(node[1]) < limit:
+                    node[1].append(term)
+
+    def complete(self, prefix: str) -> List[str]:
+        node = self.root
+        for char in prefix.lower().lstrip("'\""):
+            child = node[0].get(char)
+            if child is None:
+                return []
+            node = child
+        return node[1]
+
+
+def _words(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [str(v) for v in value if isinstance(v, (str, int, float))]
+    return [str(value)] if isinstance(value, (str, int, float)) and value != "" else []
+
+
+class ResumeCompletions:
+    """Tries over the completable values of one resume revision.
+
+    Built lazily once per snapshot; command and flag tries never change and
+    live in ``main.command_tries``.
+    """
+
+    def __init__(self, data: Mapping[str, Any]) -> None:
+        skills = [s for s in data.get("skills", []) if isinstance(s, dict)]
+        self.tries: Dict[str, Trie] = {
+            "sections": Trie(k for k, v in data.items() if isinstance(v, list) or k == "overview"),
+            "skills": Trie(shlex.quote(s["name"]) for s in skills if s.get("name")),
+            "levels": Trie(w for s in skills for w in _words(s.get("level"))),
+            "tags": Trie(
+                shlex.quote(tag)
+                for items in data.values()
+                if isinstance(items, list)
+                for item in items
+                if isinstance(item, dict)
+                for tag in _words(item.get("tags"))
+            ),
+            "fields": Trie(k for k, v in (data.get("overview") or {}).items() if v),
+        }
+
+    def complete(self, kind: str, prefix: str) -> List[str]:
+        trie = self.tries.get(kind)
+        return trie.complete(prefix) if trie is not None else []
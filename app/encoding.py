@@ -0,0 +1,121 @@
+"""Pre-encoded HTTP response bodies with content negotiation."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Mapping, Tuple
+
+from fastapi.responses import Response
+
+try:  # Optional brotli support; gzip is always available
+    import brotli
+except Exception:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Preferred order when a client accepts several encodings equally.
+PREFERENCE = ("br", "gzip", "identity")
+
+# Browsers may keep the body but must revalidate it, which is what lets a
+# hot-reloaded resume show up immediately.
+CACHE_CONTROL = "no-cache"
+
+
+def parse_accept_encoding(header: str | None) -> Dict[str, float]:
+    """Return a mapping of content-coding to q-value from ``header``."""
+
+    accepted: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(available: Iterable[str], accept_encoding: str | None) -> str:
+    """Return the best of ``available`` codings for an ``Accept-Encoding``."""
+
+    available = set(available)
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = "identity", 0.0
+    for coding in PREFERENCE:
+        if coding not in available:
+            continue
+        default = 1.0 if coding == "identity" else wildcard
+        q = accepted.get(coding, default)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    """Return the compressed encodings of ``body`` that are smaller than it."""
+
+    compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed["br"] = brotli.compress(body, quality=11)
+    return {coding: data for coding, data in compressed.items() if len(data) < len(body)}
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """A response body encoded once in every supported content-coding."""
+
+    media_type: str
+    variants: Mapping[str, Tuple[bytes, str]]
+
+    @classmethod
+    def build(cls, body: bytes, media_type: str = "application/json") -> "EncodedBody":
+        """Encode ``body``; compressed variants are kept only when smaller."""
+
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        variants: Dict[str, Tuple[bytes, str]] = {"identity": (body, f'"{digest}"')}
+        for coding, data in compress_variants(body).items():
+            variants[coding] = (data, f'"{digest}-{coding}"')
+        return cls(media_type, variants)
+
+    @classmethod
+    def from_json(cls, data: Any) -> "EncodedBody":
+        """Serialise ``data`` the way FastAPI's ``JSONResponse`` does."""
+
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return cls.build(body)
+
+    def choose(self, accept_encoding: str | None) -> str:
+        """Return the best available coding for an ``Accept-Encoding`` value."""
+
+        return choose_encoding(self.variants, accept_encoding)
+
+    def not_modified(self, if_none_match: str | None) -> bool:
+        """Whether ``If-None-Match`` names any variant of this body."""
+
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: ignore ``W/`` prefixes added by some proxies.
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return any(etag in tags for _, etag in self.variants.values())
+
+    def respond(self, headers: Mapping[str, str]) -> Response:
+        """Build the response for a request with the given ``headers``."""
+
+        coding = self.choose(headers.get("accept-encoding"))
+        body, etag = self.variants[coding]
+        out = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": CACHE_CONTROL}
+        if self.not_modified(headers.get("if-none-match")):
+            return Response(status_code=304, headers=out)
+        if coding != "identity":
+            out["Content-Encoding"] = coding
+        return Response(content=body, media_type=self.media_type, headers=out)
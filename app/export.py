@@ -0,0 +1,315 @@
+"""Streaming resume export for ``download`` and ``print``."""
+
+from __future__ import annotations
+
+import html
+import logging
+import os
+import re
+import textwrap
+import uuid
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+MODES = ("detailed", "compact")
+SAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+@dataclass(frozen=True)
+class Document:
+    """Resume content as already formatted terminal text.
+
+    Every ``write_*`` function turns one into a generator of byte chunks, so
+    exports stream to the client as they are produced.
+    """
+
+    title: str
+    overview: Tuple[str, ...]
+    # (heading, one text block per item)
+    sections: Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+def _encoded(chunks: Iterable[str]) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield chunk.encode("utf-8")
+
+
+def write_text(doc: Document) -> Iterator[bytes]:
+    def chunks() -> Iterator[str]:
+        yield doc.title + "\n" + "=" * len(doc.title) + "\n\n"
+        yield "\n".join(doc.overview) + "\n"
+        for heading, blocks in doc.sections:
+            yield f"\n{heading.upper()}\n{'-' * len(heading)}\n"
+            for block in blocks:
+                yield block + "\n\n"
+
+    return _encoded(chunks())
+
+
+def _md_escape(text: str) -> str:
+    return re.sub(r"([\\`*_\[\]#<>])", r"\\\1", text)
+
+
+def write_markdown(doc: Document) -> Iterator[bytes]:
+    def chunks() -> Iterator[str]:
+        yield f"# {_md_escape(doc.title)}\n\n"
+        yield "".join(f"{_md_escape(line)}  \n" for line in doc.overview)
+        for heading, blocks in doc.sections:
+            yield f"\n## {_md_escape(heading)}\n\n"
+            for block in blocks:
+                first, *rest = block.splitlines() or [""]
+                lines = [f"### {_md_escape(first)}"] if rest else [f"- {_md_escape(first)}"]
+                for line in rest:
+                    # Bullets stay list items; other lines are hard-wrapped.
+                    lines.append(
+                        f"- {_md_escape(line[2:])}" if line.startswith("- ") else f"{_md_escape(line)}  "
+                    )
+                yield "\n".join(lines) + ("\n\n" if rest else "\n")
+
+    return _encoded(chunks())
+
+
+HTML_STYLE = (
+    "body{font:11pt/1.4 Helvetica,Arial,sans-serif;max-width:50em;margin:2em auto;padding:0 1em}"
+    "h1{margin-bottom:.2em}h2{border-bottom:1px solid #999;margin-top:1.5em}"
+    "article{margin:.6em 0;break-inside:avoid}p{margin:.1em 0}ul{margin:.2em 0}"
+    "@media print{body{margin:0;max-width:none}}"
+)
+
+
+def write_html(doc: Document) -> Iterator[bytes]:
+    e = html.escape
+
+    def chunks() -> Iterator[str]:
+        yield (
+            '<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8">'
+            f"<title>{e(doc.title)}</title><style>{HTML_STYLE}</style></head><body>\n"
+            f"<h1>{e(doc.title)}</h1>\n"
+        )
+        yield "".join(f"<p>{e(line)}</p>\n" for line in doc.overview)
+        for heading, blocks in doc.sections:
+            yield f"<h2>{e(heading)}</h2>\n"
+            for block in blocks:
+                parts: List[str] = ["<article>"]
+                bullets: List[str] = []
+                for line in block.splitlines():
+                    if line.startswith("- "):
+                        bullets.append(f"<li>{e(line[2:])}</li>")
+                        continue
+                    if bullets:
+                        parts.append("<ul>" + "".join(bullets) + "</ul>")
+                        bullets = []
+                    parts.append(f"<p>{e(line)}</p>")
+                if bullets:
+                    parts.append("<ul>" + "".join(bullets) + "</ul>")
+                yield "".join(parts) + "</article>\n"
+        yield "</body></html>\n"
+
+    return _encoded(chunks())
+
+
+# US Letter in points, with 54pt margins.
+PAGE_WIDTH, PAGE_HEIGHT, MARGIN = 612, 792, 54
+# (font resource, size, leading, wrap width in characters) per line style
+PDF_STYLES = {
+    "title": ("F2", 18, 26, 55),
+    "heading": ("F2", 13, 22, 75),
+    "body": ("F1", 10, 13, 100),
+}
+
+
+def _pdf_string(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _pdf_lines(doc: Document) -> Iterator[Tuple[str, str]]:
+    yield "title", doc.title
+    for line in doc.overview:
+        yield "body", line
+    for heading, blocks in doc.sections:
+        yield "heading", heading
+        for block in blocks:
+            yield from (("body", line) for line in block.splitlines())
+            yield "body", ""
+
+
+def _pdf_pages(doc: Document) -> List[List[Tuple[str, float, str]]]:
+    """Lay out wrapped ``(style, y, text)`` lines on pages."""
+
+    pages: List[List[Tuple[str, float, str]]] = [[]]
+    y = PAGE_HEIGHT - MARGIN
+    for style, text in _pdf_lines(doc):
+        _, _, leading, width = PDF_STYLES[style]
+        indent = "  " if text.startswith("- ") else ""
+        wrapped = textwrap.wrap(text, width, subsequent_indent=indent) or [""]
+        for part in wrapped:
+            if y - leading < MARGIN:
+                pages.append([])
+                y = PAGE_HEIGHT - MARGIN
+            y -= leading
+            pages[-1].append((style, y, part))
+    return pages
+
+
+def write_pdf(doc: Document) -> Iterator[bytes]:
+    """Stream ``doc`` as a PDF, one page's objects at a time.
+
+    Base-14 Helvetica with WinAnsi encoding and one Flate-compressed content
+    stream per page: enough for a text resume, with no extra dependency.
+    """
+
+    pages = _pdf_pages(doc)
+    # Objects: 1 catalog, 2 page tree, 3-4 fonts, then a page and its content
+    # stream for every page.
+    page_ids = [5 + 2 * i for i in range(len(pages))]
+    offsets: List[int] = []
+    written = 0
+
+    def emit(number: int, body: bytes) -> bytes:
+        nonlocal written
+        offsets.append(written)
+        chunk = b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        written += len(chunk)
+        return chunk
+
+    header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    written = len(header)
+    yield header
+    yield emit(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = b" ".join(b"%d 0 R" % pid for pid in page_ids)
+    yield emit(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(pages)))
+    for number, font in ((3, b"Helvetica"), (4, b"Helvetica-Bold")):
+        yield emit(
+            number,
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % font,
+        )
+    for pid, lines in zip(page_ids, pages):
+        yield emit(
+            pid,
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, pid + 1),
+        )
+        ops = [b"BT"]
+        for style, y, text in lines:
+            font, size, _, _ = PDF_STYLES[style]
+            ops.append(
+                b"/%s %d Tf 1 0 0 1 %d %.1f Tm %s Tj" % (font.encode(), size, MARGIN, y, _pdf_string(text))
+            )
+        ops.append(b"ET")
+        stream = zlib.compress(b"\n".join(ops))
+        yield emit(
+            pid + 1,
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream),
+        )
+    xref = [b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1)]
+    xref.extend(b"%010d 00000 n \n" % offset for offset in offsets)
+    yield b"".join(xref) + (
+        b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, written)
+    )
+
+
+# format -> (media type, writer)
+FORMATS: Mapping[str, Tuple[str, Callable[[Document], Iterator[bytes]]]] = {
+    "txt": ("text/plain; charset=utf-8", write_text),
+    "md": ("text/markdown; charset=utf-8", write_markdown),
+    "html": ("text/html; charset=utf-8", write_html),
+    "pdf": ("application/pdf", write_pdf),
+}
+
+
+def safe_filename(name: str | None, fmt: str) -> str:
+    """``name`` reduced to a harmless file name ending in ``.<fmt>``."""
+
+    stem = SAFE_FILENAME_RE.sub("_", name or "").strip("._") or "resume"
+    return stem if stem.lower().endswith(f".{fmt}") else f"{stem}.{fmt}"
+
+
+class ExportCache:
+    """Stream exports to clients while caching them per resume version.
+
+    Each stream is teed into ``<version>-<mode>.<format>`` and renamed into
+    place once complete.  The version is a content hash, so an artifact never
+    goes stale; only the newest ``keep`` are retained.
+    """
+
+    def __init__(self, directory: Path, *, keep: int = 64) -> None:
+        self.directory = Path(directory)
+        self.keep = keep
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, version: str, fmt: str, mode: str) -> Path:
+        return self.directory / f"{version}-{mode}.{fmt}"
+
+    def _tee(self, chunks: Iterator[bytes], path: Path) -> Iterator[bytes]:
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            out = tmp.open("wb")
+        except OSError as exc:
+            logger.warning("Not caching export %s: %s", path.name, exc)
+            yield from chunks
+            return
+        try:
+            with out:
+                for chunk in chunks:
+                    out.write(chunk)
+                    yield chunk
+            os.replace(tmp, path)
+        finally:
+            # Left behind only when the client went away mid-stream.
+            tmp.unlink(missing_ok=True)
+        self._prune()
+
+    def _prune(self) -> None:
+        try:
+            artifacts = sorted(
+                (p for p in self.directory.iterdir() if not p.name.startswith(".")),
+                key=lambda p: p.stat().st_mtime_ns,
+            )
+        except OSError:
+            return
+        for stale in artifacts[: max(0, len(artifacts) - self.keep)]:
+            stale.unlink(missing_ok=True)
+
+    def response(
+        self,
+        headers: Mapping[str, str],
+        *,
+        version: str,
+        fmt: str,
+        mode: str,
+        document: Callable[[], Document],
+        filename: str,
+        inline: bool = False,
+    ) -> Response:
+        """Serve the ``fmt`` export of resume ``version``.
+
+        ``document`` is only called when the artifact is not cached yet.
+        """
+
+        media_type, writer = FORMATS[fmt]
+        etag = f'"{version}-{mode}-{fmt}"'
+        response_headers: Dict[str, str] = {
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+            "Content-Disposition": f'{"inline" if inline else "attachment"}; filename="{filename}"',
+        }
+        if headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=response_headers)
+        path = self.path(version, fmt, mode)
+        if path.is_file():
+            self.hits += 1
+            return FileResponse(path, media_type=media_type, headers=response_headers)
+        self.misses += 1
+        return StreamingResponse(
+            self._tee(writer(document()), path), media_type=media_type, headers=response_headers
+        )
@@ -0,0 +1,105 @@
+"""Typo-tolerant term lookup with a trigram index."""
+
+from __future__ import annotations
+
+import heapq
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+# Candidates (by trigram score) whose edit distance is computed.
+CANDIDATES = 8
+
+
+def padded_trigrams(term: str) -> FrozenSet[str]:
+    """Trigrams of ``^term$``; the padding lets short words match too."""
+
+    padded = f"^{term}$"
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def max_edits(word: str) -> int:
+    """Typos tolerated in ``word``: one up to five letters, two up to nine, then three."""
+
+    return 1 if len(word) <= 5 else 2 if len(word) <= 9 else 3
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or ``limit + 1`` once it exceeds ``limit``.
+
+    Only the diagonal band of width ``limit`` is computed.
+    """
+
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    before: List[int] = []
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        row = [i if i <= limit else over] + [over] * len(b)
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cost = a[i - 1] != b[j - 1]
+            best = min(previous[j] + 1, row[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                best = min(best, before[j - 2] + 1)
+            row[j] = best
+        if min(row) > limit:
+            return over
+        before, previous = previous, row
+    return min(previous[-1], over)
+
+
+class TrigramIndex:
+    """Rank known ``terms`` by closeness to a possibly misspelt word."""
+
+    def __init__(self, terms: Iterable[str]) -> None:
+        self.terms: Tuple[str, ...] = tuple(sorted({t.lower() for t in terms if t}))
+        self.known = frozenset(self.terms)
+        self.sizes: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+        for term_id, term in enumerate(self.terms):
+            grams = padded_trigrams(term)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(term_id)
+
+    def __contains__(self, term: str) -> bool:
+        return term.lower() in self.known
+
+    def suggest(self, word: str, limit: int = 3) -> List[str]:
+        """Up to ``limit`` known terms within :func:`max_edits` of ``word``.
+
+        Closest first; ties go to the higher trigram score.
+        """
+
+        word = word.lower()
+        grams = padded_trigrams(word)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for term_id in self.postings.get(gram, ()):
+                shared[term_id] = shared.get(term_id, 0) + 1
+        allowed = max_edits(word)
+        # One edit changes at most four trigrams (a transposition), so terms
+        # sharing fewer cannot be within ``allowed`` edits.
+        scored = heapq.nlargest(
+            CANDIDATES,
+            (
+                (count / (len(grams) + self.sizes[term_id] - count), term_id)
+                for term_id, count in shared.items()
+                if count >= max(len(grams), self.sizes[term_id]) - 4 * allowed
+            ),
+        )
+        ranked = []
+        for score, term_id in scored:
+            term = self.terms[term_id]
+            distance = edit_distance(word, term, allowed)
+            if distance <= allowed and term != word:
+                ranked.append((distance, -score, term))
+                if distance == 1 and len(ranked) >= limit and all(r[0] == 1 for r in ranked):
+                    break  # nothing left can be closer
+        ranked.sort()
+        return [term for _, _, term in ranked[:limit]]
+
+    def best(self, word: str) -> str | None:
+        """The closest known term to ``word``, or ``None``."""
+
+        found = self.suggest(word, 1)
+        return found[0] if found else None
@@ -12,25 +12,92 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
+import math
 import os
 import random
+import secrets
 import shlex
-import subprocess
 import time
 import uuid
-from datetime import datetime
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple, TypeVar
 
 try:
-    from .utils import format_date, strip_scheme
+    from .assets import AssetFiles, AssetPipeline
+    from .buildinfo import last_updated
+    from .commands import CommandRegistry, Invocation, ParsedCommand
+    from .complete import MAX_COMPLETIONS, Trie
+    from .export import FORMATS, MODES, Document, ExportCache, safe_filename
+    from .metrics import CONTENT_TYPE, SIZE_BUCKETS, MetricsMiddleware, Registry
+    from .model import FilterError
+    from .profiling import CommandProfiler, ProfileCapture
+    from .ratelimit import (
+        AsyncRedisRateLimiter,
+        BucketSpec,
+        MemoryRateLimiter,
+        RedisRateLimiter,
+    )
+    from .revisions import RevisionError, RevisionStore
+    from .sessions import (
+        REVISION_FIELD,
+        AsyncRedisHashSessions,
+        AsyncRedisSessions,
+        MemorySessions,
+        RedisHashSessions,
+        RedisSessions,
+        SessionLocks,
+        async_redis_client,
+        migrate_session,
+        new_session,
+    )
+    from .search import item_label
+    from .snapshot import ResumeSnapshot, ResumeStore
+    from .tenants import DEFAULT_TENANT, TenantMiddleware, TenantStores
+    from .tokens import SessionTokens
+    from .utils import strip_scheme
+    from .vfs import FileSystem
 except ImportError:  # pragma: no cover - fallback for script execution
-    from utils import format_date, strip_scheme
-
-from fastapi import FastAPI
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, constr
+    from assets import AssetFiles, AssetPipeline
+    from buildinfo import last_updated
+    from commands import CommandRegistry, Invocation, ParsedCommand
+    from complete import MAX_COMPLETIONS, Trie
+    from export import FORMATS, MODES, Document, ExportCache, safe_filename
+    from metrics import CONTENT_TYPE, SIZE_BUCKETS, MetricsMiddleware, Registry
+    from model import FilterError
+    from profiling import CommandProfiler, ProfileCapture
+    from ratelimit import (
+        AsyncRedisRateLimiter,
+        BucketSpec,
+        MemoryRateLimiter,
+        RedisRateLimiter,
+    )
+    from revisions import RevisionError, RevisionStore
+    from sessions import (
+        REVISION_FIELD,
+        AsyncRedisHashSessions,
+        AsyncRedisSessions,
+        MemorySessions,
+        RedisHashSessions,
+        RedisSessions,
+        SessionLocks,
+        async_redis_client,
+        migrate_session,
+        new_session,
+    )
+    from search import item_label
+    from snapshot import ResumeSnapshot, ResumeStore
+    from tenants import DEFAULT_TENANT, TenantMiddleware, TenantStores
+    from tokens import SessionTokens
+    from utils import strip_scheme
+    from vfs import FileSystem
+
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, Response
+from pydantic import BaseModel, conlist, constr
+from starlette.requests import HTTPConnection
 
 try:  # Optional redis support for horizontal scalability
     import redis
@@ -44,42 +111,92 @@ except Exception:  # pragma: no cover - redis is optional
 APP_DIR = Path(__file__).parent
 DATA_PATH = APP_DIR / "resume.json"
 
-with DATA_PATH.open() as f:
-    RESUME: Dict[str, Any] = json.load(f)
-
-
-def get_last_updated() -> str:
-    try:
-        return (
-            subprocess.check_output(
-                ["git", "log", "-1", "--format=%cs", str(DATA_PATH)]
-            )
-            .decode()
-            .strip()
-        )
-    except Exception:
-        return datetime.fromtimestamp(DATA_PATH.stat().st_mtime).strftime("%Y-%m-%d")
-
-
-RESUME.setdefault("meta", {})["last_updated"] = get_last_updated()
+# Seconds between checks of ``DATA_PATH`` for edits; ``0`` disables reloading.
+RELOAD_INTERVAL = float(os.getenv("RESUME_RELOAD_INTERVAL", "2"))
+
+
+# The store owns the parsed resume and everything derived from it (such as
+# the search index).  Handlers read ``STORE.current`` once per command so a
+# background reload never changes the data underneath them.  The "last
+# updated" date comes from the ``python -m app.buildinfo`` artifact when
+# present, falling back to the file's mtime; git is never run at import.
+# Every revision served is recorded for ``versions --list/--diff`` unless
+# ``REVISIONS_DIR`` is read-only; see ``app/revisions.py``.  The revision
+# loaded at import is recorded by a startup hook, so importing writes nothing.
+REVISIONS = RevisionStore(Path(os.getenv("REVISIONS_DIR", str(APP_DIR / "build" / "revisions"))))
+
+
+def record_revision(snapshot: ResumeSnapshot) -> None:
+    REVISIONS.record(snapshot.source, snapshot.version, snapshot.data)
+
+
+STORE = ResumeStore(DATA_PATH, last_updated=last_updated, name=DEFAULT_TENANT)
+STORE.on_load = record_revision  # reloads from here on
+
+# Multi-tenant hosting (see ``app/tenants.py``).  ``TENANT_MODE=host`` serves
+# ``TENANTS_DIR/<name>.json`` at ``<name><TENANT_HOST_SUFFIX>``, ``path`` at
+# ``/t/<name>/``; requests naming no tenant get ``DATA_PATH``.  Tenant
+# resumes are loaded on first use and evicted least recently used first.
+TENANT_MODE = os.getenv("TENANT_MODE", "off")
+TENANTS = TenantStores(
+    Path(os.getenv("TENANTS_DIR", str(APP_DIR / "tenants"))),
+    STORE,
+    max_tenants=int(os.getenv("TENANT_CACHE_SIZE", "128")),
+    max_bytes=int(float(os.getenv("TENANT_CACHE_MB", "64")) * 1024 * 1024),
+    reload_interval=RELOAD_INTERVAL,
+    last_updated=last_updated,
+    on_load=record_revision,
+)
 
 STATIC_DIR = APP_DIR / "static"
+# Fingerprinted, precompressed copies of ``STATIC_DIR``; see ``app/assets.py``.
+ASSET_BUILD_DIR = Path(os.getenv("ASSET_BUILD_DIR", str(APP_DIR / "build" / "static")))
+
+# Prepared on the first page or asset request, or ahead of time with
+# ``python -m app.assets``; importing the app writes nothing.
+ASSETS = AssetPipeline(STATIC_DIR, ASSET_BUILD_DIR)
+
+# Rendered ``download``/``print`` artifacts, one file per format, mode and
+# resume version; see ``app/export.py``.
+EXPORTS = ExportCache(
+    Path(os.getenv("EXPORT_DIR", str(APP_DIR / "build" / "exports"))),
+    keep=int(os.getenv("EXPORT_CACHE_KEEP", "64")),
+)
+
+# Read-only tree behind ``ls``/``cd``/``cat`` for the default resume; tenants
+# get ``TENANTS_DIR/<name>.filesystem.json`` or nothing.  Sessions only keep
+# ``cwd``.
+FILESYSTEM = FileSystem.load(APP_DIR / "filesystem.json")
 
 # ---------------------------------------------------------------------------
 # FastAPI setup
 # ---------------------------------------------------------------------------
 
 app = FastAPI()
-app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+app.mount("/static", AssetFiles(directory=STATIC_DIR, pipeline=ASSETS), name="static")
 
 # ---------------------------------------------------------------------------
 # Request models
 # ---------------------------------------------------------------------------
 
 
+MAX_COMMAND_LENGTH = 200
+
+
 class CommandRequest(BaseModel):
     session_id: str
-    command: constr(max_length=200)
+    command: constr(max_length=MAX_COMMAND_LENGTH)
+
+
+# Upper bound on the number of commands accepted by ``/api/batch``.
+MAX_BATCH_COMMANDS = 50
+
+
+class BatchRequest(BaseModel):
+    session_id: str
+    commands: conlist(
+        constr(max_length=MAX_COMMAND_LENGTH), min_length=1, max_length=MAX_BATCH_COMMANDS
+    )
 
 # ---------------------------------------------------------------------------
 # Session state
@@ -88,45 +205,437 @@ class CommandRequest(BaseModel):
 # Each session keeps track of the current section view, pagination state,
 # and auxiliary data such as expanded items or user notes.  Sessions can be
 # stored either in memory (default) or in Redis when ``SESSION_REDIS_URL`` is
-# provided in the environment.
+# provided in the environment.  With Redis, ``SESSION_BACKEND=hash`` keeps one
+# hash per session and writes only the fields a command changed; the default
+# ``json`` backend stores one JSON blob per session.  ``SESSION_REDIS_ASYNC=1``
+# switches either layout to ``redis.asyncio`` so Redis round trips do not
+# block the event loop.
 
 SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))
 REDIS_URL = os.getenv("SESSION_REDIS_URL")
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "json")
+REDIS_ASYNC = os.getenv("SESSION_REDIS_ASYNC", "0") == "1"
+REDIS_MAX_CONNECTIONS = int(os.getenv("SESSION_REDIS_MAX_CONNECTIONS", "50"))
+REDIS_TIMEOUT = float(os.getenv("SESSION_REDIS_TIMEOUT", "0.5"))
+# Upper bound on in-memory sessions; the least recently used one is evicted
+# when a new session would exceed it.  ``0`` means unbounded.
+SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))
+
+ASYNC_SESSIONS = False
+if redis and REDIS_URL and REDIS_ASYNC:
+    _redis_client = async_redis_client(
+        REDIS_URL, max_connections=REDIS_MAX_CONNECTIONS, timeout=REDIS_TIMEOUT
+    )
+    if SESSION_BACKEND == "hash":
+        sessions: Any = AsyncRedisHashSessions(_redis_client, SESSION_TTL)
+    else:
+        sessions = AsyncRedisSessions(_redis_client, SESSION_TTL)
+    USE_REDIS = True
+    ASYNC_SESSIONS = True
+
+    @app.on_event("shutdown")
+    async def _close_redis() -> None:  # pragma: no cover - requires a Redis server
+        await _redis_client.close()
+elif redis and REDIS_URL:
+    _redis_client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+    if SESSION_BACKEND == "hash":
+        sessions: Dict[str, Dict[str, Any]] = RedisHashSessions(_redis_client, SESSION_TTL)
+    else:
+        sessions = RedisSessions(_redis_client, SESSION_TTL)
+    USE_REDIS = True
+else:  # in-memory store
+    sessions = MemorySessions(SESSION_TTL, SESSION_MAX)
+    USE_REDIS = False
+
+# Label for session store timings, e.g. "redis-hash" or "memory".
+SESSION_STORE = f"redis-{SESSION_BACKEND}" if USE_REDIS else "memory"
+
+# Concurrent commands on one session never overwrite each other: in memory
+# they take turns on a per-session lock; with Redis each write is a
+# compare-and-set on the session's revision, and a command that lost the race
+# is re-run on the fresh state up to ``SESSION_CAS_RETRIES`` times, sleeping a
+# random fraction of ``SESSION_CAS_BACKOFF`` seconds (doubling each attempt)
+# before it.  If every attempt loses the client gets a 409.
+SESSION_CAS_RETRIES = int(os.getenv("SESSION_CAS_RETRIES", "5"))
+SESSION_CAS_BACKOFF = float(os.getenv("SESSION_CAS_BACKOFF", "0.005"))
+SESSION_LOCKS = SessionLocks()
+
+# ``SESSION_MODE=token`` keeps session state in a signed token that doubles as
+# the session id (see ``app/tokens.py``); only states larger than
+# ``SESSION_TOKEN_MAX_BYTES`` use the store above.  Set
+# ``SESSION_TOKEN_SECRET`` so tokens survive restarts and work across workers.
+SESSION_MODE = os.getenv("SESSION_MODE", "server")
+TOKENS: SessionTokens | None = None
+if SESSION_MODE == "token":
+    _token_secret = os.getenv("SESSION_TOKEN_SECRET", "").encode()
+    if not _token_secret:
+        logging.getLogger(__name__).warning(
+            "SESSION_TOKEN_SECRET is not set; session tokens are only valid in this process"
+        )
+        _token_secret = secrets.token_bytes(32)
+    TOKENS = SessionTokens(
+        _token_secret,
+        ttl=SESSION_TTL,
+        max_bytes=int(os.getenv("SESSION_TOKEN_MAX_BYTES", "1024")),
+    )
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+# Everything below is exposed at ``GET /metrics``; see ``app/metrics.py``.
+METRICS = Registry()
+COMMAND_SECONDS = METRICS.histogram(
+    "resume_command_duration_seconds",
+    "Time spent in handle_command, by command name.",
+    ["command"],
+)
+SESSIONS_CREATED = METRICS.counter("resume_sessions_created_total", "Sessions started.")
+SESSIONS_PRUNED = METRICS.counter(
+    "resume_sessions_pruned_total", "In-memory sessions removed by the cleanup sweep."
+)
+SESSION_MISSES = METRICS.counter(
+    "resume_session_misses_total", "Requests answered with 'Invalid session.'."
+)
+SESSION_CONFLICTS = METRICS.counter(
+    "resume_session_conflicts_total",
+    "Commands whose session was saved by another command first, by outcome (retried, gave_up).",
+    ["outcome"],
+)
+SESSION_STORE_SECONDS = METRICS.histogram(
+    "resume_session_store_duration_seconds",
+    "Session load/save round trips, by store and operation.",
+    ["store", "op"],
+)
+HTTP_SECONDS = METRICS.histogram(
+    "resume_http_request_duration_seconds", "HTTP request latency, by route.", ["route"]
+)
+HTTP_RESPONSE_BYTES = METRICS.histogram(
+    "resume_http_response_size_bytes",
+    "HTTP response body size as sent, by route.",
+    ["route"],
+    buckets=SIZE_BUCKETS,
+)
 
-if redis and REDIS_URL:
-    class RedisSessions(dict):  # minimal mapping using Redis for storage
-        def __init__(self) -> None:
-            self.client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
 
-        def __getitem__(self, key: str) -> Dict[str, Any]:
-            data = self.client.get(key)
-            if data is None:
-                raise KeyError(key)
-            return json.loads(data)
+def _memory_stat(key: str) -> Callable[[], Dict[tuple, int]]:
+    # Redis keeps its own residency and expiry bookkeeping.
+    return lambda: {} if USE_REDIS else {(): sessions.stats()[key]}
 
-        def __setitem__(self, key: str, value: Dict[str, Any]) -> None:
-            self.client.setex(key, SESSION_TTL, json.dumps(value))
 
-        def get(self, key: str, default: Any = None) -> Dict[str, Any] | None:
-            try:
-                return self.__getitem__(key)
-            except KeyError:
-                return default
+METRICS.callback("resume_sessions_resident", "Sessions held in memory.", _memory_stat("resident"))
+METRICS.callback(
+    "resume_sessions_max", "Configured in-memory session limit (0 = unbounded).",
+    _memory_stat("max_sessions"),
+)
+METRICS.callback(
+    "resume_session_evictions_total", "In-memory sessions evicted to stay under the limit.",
+    _memory_stat("evictions"), kind="counter",
+)
+METRICS.callback(
+    "resume_session_expirations_total", "In-memory sessions dropped after their TTL.",
+    _memory_stat("expirations"), kind="counter",
+)
+METRICS.callback(
+    "resume_tenants_resident", "Tenant resumes currently loaded.",
+    lambda: {(): TENANTS.stats()["resident"]},
+)
+METRICS.callback(
+    "resume_tenant_evictions_total", "Tenant resumes unloaded to stay within the cache limits.",
+    lambda: {(): TENANTS.stats()["evictions"]}, kind="counter",
+)
 
-        def __delitem__(self, key: str) -> None:
-            self.client.delete(key)
+# ---------------------------------------------------------------------------
+# Profiling
+# ---------------------------------------------------------------------------
 
-        def items(self):  # pragma: no cover - only used by cleanup when memory store
-            for key in self.client.scan_iter():
-                data = self.client.get(key)
-                if data:
-                    yield key, json.loads(data)
+# ``PROFILE_COMMANDS=1`` lets ``/api/command`` run under cProfile when the
+# request sends ``X-Profile: 1`` or is picked by ``PROFILE_SAMPLE_RATE``
+# (0-1).  ``/api/admin/profiles`` lists the slowest ones and requires the
+# ``X-Admin-Token`` header to match ``PROFILE_ADMIN_TOKEN``.
+PROFILER = (
+    CommandProfiler(
+        Path(os.getenv("PROFILE_DIR", str(APP_DIR / "build" / "profiles"))),
+        sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+        keep=int(os.getenv("PROFILE_KEEP", "100")),
+    )
+    if os.getenv("PROFILE_COMMANDS", "0") == "1"
+    else None
+)
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+
+# Token buckets, each given as "<burst>:<tokens per second>": one per client
+# IP for ``/api/start``, one per client IP for commands and one per session.
+# Token-mode sessions get a new id with every command; their bucket is keyed
+# on the token's session nonce instead.  Buckets live in Redis when sessions
+# do, so all workers share them.  ``RATE_LIMIT=0`` turns admission control
+# off.
+RATE_LIMIT = os.getenv("RATE_LIMIT", "1") == "1"
+# Buckets are keyed on ``request.client.host``; behind a proxy run uvicorn
+# with ``--proxy-headers --forwarded-allow-ips <proxy>`` so it is the real
+# client for trusted proxies only.  ``1`` instead trusts the last
+# ``X-Forwarded-For`` hop from any peer, which is only safe when every
+# request passes through a proxy that sets it: a direct client could
+# otherwise pick a fresh bucket per request.
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "0") == "1"
+_LIMITS = {
+    "start_ip": BucketSpec.parse(os.getenv("RATE_LIMIT_START", "20:0.2")),
+    "command_ip": BucketSpec.parse(os.getenv("RATE_LIMIT_COMMAND_IP", "120:20")),
+    "session": BucketSpec.parse(os.getenv("RATE_LIMIT_SESSION", "30:5")),
+}
+if not RATE_LIMIT:
+    LIMITERS: Dict[str, Any] = {}
+elif ASYNC_SESSIONS:
+    LIMITERS = {n: AsyncRedisRateLimiter(_redis_client, n, spec) for n, spec in _LIMITS.items()}
+elif USE_REDIS:
+    LIMITERS = {n: RedisRateLimiter(_redis_client, n, spec) for n, spec in _LIMITS.items()}
+else:
+    LIMITERS = {n: MemoryRateLimiter(n, spec) for n, spec in _LIMITS.items()}
+
+RATE_LIMITED = METRICS.counter(
+    "resume_rate_limited_total", "Requests rejected by admission control, by bucket.", ["bucket"]
+)
+
+
+def client_ip(conn: HTTPConnection) -> str:
+    """Address used for per-client buckets."""
+
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = conn.headers.get("x-forwarded-for")
+        if forwarded:
+            return strip_port(forwarded.rsplit(",", 1)[-1].strip())
+    return conn.client.host if conn.client else "unknown"
+
+
+def strip_port(address: str) -> str:
+    """``address`` without a port: App Service forwards ``ip:port``."""
+
+    if address.startswith("["):  # [v6]:port
+        return address[1:].partition("]")[0]
+    host, sep, port = address.rpartition(":")
+    return host if sep and port.isdigit() and ":" not in host else address
+
+
+async def rate_limit_wait(bucket: str, key: str, cost: float = 1) -> float:
+    """Spend ``cost`` from ``key``'s ``bucket``; seconds to wait if rejected."""
+
+    limiter = LIMITERS.get(bucket)
+    if limiter is None:
+        return 0.0
+    cost = min(cost, limiter.spec.burst)
+    if ASYNC_SESSIONS:
+        wait = await limiter.acquire(key, cost)
+    else:
+        wait = limiter.acquire(key, cost)
+    if wait > 0:
+        RATE_LIMITED.labels(bucket).inc()
+    return wait
+
+
+async def rate_limit_refund(bucket: str, key: str, cost: float = 1) -> None:
+    """Give back what :func:`rate_limit_wait` took for an admitted ``cost``."""
+
+    limiter = LIMITERS[bucket]
+    cost = min(cost, limiter.spec.burst)
+    if ASYNC_SESSIONS:
+        await limiter.refund(key, cost)
+    else:
+        limiter.refund(key, cost)
+
+
+def session_bucket_key(session_id: str, tenant: str) -> str | None:
+    """Key of ``session_id``'s rate-limit bucket; ``None`` for invalid tokens."""
+
+    if TOKENS is not None and TOKENS.is_token(session_id):
+        nonce = TOKENS.session_key(session_id, scope=_token_scope(tenant))
+        return None if nonce is None else _session_key(nonce, tenant)
+    return _session_key(session_id, tenant)
 
-    sessions: Dict[str, Dict[str, Any]] = RedisSessions()
-    USE_REDIS = True
-else:  # in-memory store
-    sessions: Dict[str, Dict[str, Any]] = {}
-    USE_REDIS = False
+
+async def admission_wait(
+    conn: HTTPConnection, session_id: str | None = None, cost: float = 1
+) -> float:
+    """Seconds ``conn`` must wait before it may proceed; ``0`` if admitted.
+
+    Without ``session_id`` the request is a session start.  A command is
+    charged to its client IP and its session; tokens are only kept when
+    both buckets admit it.  Invalid token sessions only pay the IP bucket:
+    they are rejected right after.
+    """
+
+    ip = client_ip(conn)
+    if session_id is None:
+        return await rate_limit_wait("start_ip", ip)
+    wait = await rate_limit_wait("command_ip", ip)
+    if wait:
+        return wait
+    key = session_bucket_key(session_id, tenant_of(conn))
+    wait = await rate_limit_wait("session", key, cost) if key is not None else 0.0
+    if wait and "command_ip" in LIMITERS:
+        await rate_limit_refund("command_ip", ip)
+    return wait
+
+
+async def admit(conn: HTTPConnection, session_id: str | None = None, cost: float = 1) -> None:
+    """Raise ``429`` unless the client (and ``session_id``) may proceed."""
+
+    wait = await admission_wait(conn, session_id, cost)
+    if wait:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests; slow down.",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+
+
+def tenant_of(conn: HTTPConnection) -> str:
+    """Tenant chosen for ``conn`` by :class:`~tenants.TenantMiddleware`."""
+
+    return getattr(conn.state, "tenant", DEFAULT_TENANT)
+
+
+async def tenant_snapshot(conn: HTTPConnection) -> ResumeSnapshot | None:
+    """Current resume snapshot of ``conn``'s tenant; ``None`` if it has none."""
+
+    store = await TENANTS.get(tenant_of(conn))
+    return store.current if store is not None else None
+
+
+def _session_key(session_id: str, tenant: str) -> str:
+    # Default-tenant keys keep their historical form so existing sessions
+    # survive enabling tenants.
+    return session_id if tenant == DEFAULT_TENANT else f"{tenant}:{session_id}"
+
+
+def _token_scope(tenant: str) -> str:
+    return "" if tenant == DEFAULT_TENANT else tenant
+
+
+async def load_session(session_id: str, tenant: str = DEFAULT_TENANT) -> Dict[str, Any] | None:
+    """Return the stored state for ``session_id`` of ``tenant`` or ``None``.
+
+    Sessions saved with an older layout are migrated on the way out.
+    """
+
+    start = time.perf_counter()
+    key = _session_key(session_id, tenant)
+    if TOKENS is not None and TOKENS.is_token(session_id):
+        state = TOKENS.decode(session_id, scope=_token_scope(tenant))
+        store = "token"
+    elif ASYNC_SESSIONS:
+        state = await sessions.get(key)
+        store = SESSION_STORE
+    else:
+        state = sessions.get(key)
+        store = SESSION_STORE
+    SESSION_STORE_SECONDS.labels(store, "load").observe(time.perf_counter() - start)
+    if state is None:
+        SESSION_MISSES.inc()
+        return None
+    return migrate_session(state)
+
+
+async def save_session(
+    session_id: str | None, state: Dict[str, Any], tenant: str = DEFAULT_TENANT
+) -> str:
+    """Persist ``state`` and return the session id the client should use next.
+
+    In token mode a token session (or a new one, ``session_id=None``) gets a
+    fresh token unless the state has outgrown it; it then moves to the
+    server-side store for good under a new random id.  Otherwise the id is
+    unchanged.  Sessions of other tenants are stored under their own keys,
+    so an id is only valid on the resume that issued it.
+    """
+
+    start = time.perf_counter()
+    if TOKENS is not None and (session_id is None or TOKENS.is_token(session_id)):
+        token = TOKENS.encode(state, scope=_token_scope(tenant))
+        if token is not None:
+            SESSION_STORE_SECONDS.labels("token", "save").observe(time.perf_counter() - start)
+            return token
+        session_id = str(uuid.uuid4())
+    session_id = session_id or str(uuid.uuid4())
+    key = _session_key(session_id, tenant)
+    if ASYNC_SESSIONS:
+        await sessions.set(key, state)
+    else:
+        sessions[key] = state
+    SESSION_STORE_SECONDS.labels(SESSION_STORE, "save").observe(time.perf_counter() - start)
+    return session_id
+
+
+async def compare_and_save(
+    session_id: str, state: Dict[str, Any], expected: int, tenant: str = DEFAULT_TENANT
+) -> bool:
+    """Store ``state`` in Redis only if its stored revision is still ``expected``."""
+
+    start = time.perf_counter()
+    key = _session_key(session_id, tenant)
+    state[REVISION_FIELD] = expected + 1
+    if ASYNC_SESSIONS:
+        saved = await sessions.compare_and_set(key, state, expected)
+    else:
+        saved = sessions.compare_and_set(key, state, expected)
+    SESSION_STORE_SECONDS.labels(SESSION_STORE, "cas").observe(time.perf_counter() - start)
+    if not saved:
+        state[REVISION_FIELD] = expected
+    return saved
+
+
+async def cas_backoff(attempt: int) -> None:
+    """Sleep before retry ``attempt`` (1-based) of a lost compare-and-set."""
+
+    await asyncio.sleep(random.uniform(0, SESSION_CAS_BACKOFF * 2 ** (attempt - 1)))
+
+
+T = TypeVar("T")
+
+
+async def update_session(
+    session_id: str, tenant: str, apply: Callable[[Dict[str, Any]], T]
+) -> Tuple[T, str] | None:
+    """Run ``apply`` on the state of ``session_id`` and save it.
+
+    Returns ``apply``'s result and the session id the client should use next,
+    or ``None`` for an unknown session.  Another command saving the same
+    session meanwhile is never overwritten: see ``SESSION_CAS_RETRIES``.
+    ``apply`` may therefore run more than once and must only touch the state
+    it is given.  Token sessions live in the client, so there is nothing to
+    race on and they are saved as before.
+    """
+
+    token = TOKENS is not None and TOKENS.is_token(session_id)
+    if token or not USE_REDIS:
+        key = _session_key(session_id, tenant)
+        async with nullcontext() if token else SESSION_LOCKS.hold(key):
+            state = await load_session(session_id, tenant)
+            if state is None:
+                return None
+            result = apply(state)
+            if not token:
+                state[REVISION_FIELD] = state.get(REVISION_FIELD, 0) + 1
+            return result, await save_session(session_id, state, tenant)
+
+    for attempt in range(SESSION_CAS_RETRIES + 1):
+        if attempt:
+            await cas_backoff(attempt)
+        state = await load_session(session_id, tenant)
+        if state is None:
+            return None
+        expected = state.get(REVISION_FIELD, 0)
+        result = apply(state)
+        if await compare_and_save(session_id, state, expected, tenant):
+            if attempt:
+                SESSION_CONFLICTS.labels("retried").inc()
+            return result, session_id
+    SESSION_CONFLICTS.labels("gave_up").inc()
+    raise HTTPException(
+        status_code=409, detail="Session is busy; try again.", headers={"Retry-After": "1"}
+    )
 
 
 def prune_sessions(now: float | None = None, ttl: int | None = None) -> None:
@@ -139,16 +648,7 @@ def prune_sessions(now: float | None = None, ttl: int | None = None) -> None:
     if USE_REDIS:  # Redis handles TTL internally
         return
 
-    now = now or time.time()
-    ttl = SESSION_TTL if ttl is None else ttl
-
-    expired = [
-        sid
-        for sid, state in list(sessions.items())
-        if now - state.get("_ts", now) >= ttl
-    ]
-    for sid in expired:
-        del sessions[sid]
+    SESSIONS_PRUNED.inc(sessions.prune(now, ttl))
 
 
 async def session_cleanup_loop() -> None:
@@ -165,6 +665,17 @@ if not USE_REDIS:
         asyncio.create_task(session_cleanup_loop())
 
 
+@app.on_event("startup")
+async def _record_startup_revision() -> None:
+    await asyncio.to_thread(record_revision, STORE.current)
+
+
+if RELOAD_INTERVAL > 0:
+    @app.on_event("startup")
+    async def _watch_resume() -> None:  # pragma: no cover - behaviour tested via ResumeStore.reload
+        asyncio.create_task(STORE.watch(RELOAD_INTERVAL))
+
+
 ITEMS_PER_PAGE = 5
 
 # ---------------------------------------------------------------------------
@@ -172,10 +683,10 @@ ITEMS_PER_PAGE = 5
 # ---------------------------------------------------------------------------
 
 
-def format_overview() -> str:
+def format_overview(snapshot: ResumeSnapshot | None = None) -> str:
     """Build the overview text shown when a session starts."""
 
-    o = RESUME.get("overview", {})
+    o = (snapshot or STORE.current).data.get("overview", {})
     lines = [
         f"Name: {o.get('name')} | {o.get('title')} | {o.get('location')}",
         (
@@ -193,6 +704,7 @@ def list_section(
     *,
     expand: bool = False,
     page: int = 1,
+    snapshot: ResumeSnapshot | None = None,
 ) -> str:
     """Render a resume section as plain text.
 
@@ -200,16 +712,17 @@ def list_section(
     ``next`` and ``prev`` know what to display.  The ``section`` argument
     selects which part of the resume to show (e.g. ``"experience"`` or
     ``"projects"``).  Setting ``expand`` to ``True`` includes detailed lines for
-    each item.
+    each item.  ``snapshot`` defaults to the current resume revision.
     """
 
-    items: List[Dict[str, Any]] = RESUME.get(section, [])
+    snapshot = snapshot or STORE.current
+    items: List[Dict[str, Any]] = snapshot.data.get(section, [])
     if not isinstance(items, list):
         if section == "overview":
             state["current_section"] = section
-            state["last_items"] = {}
+            state["last_items"] = []
             state["page"] = 1
-            return format_overview()
+            return format_overview(snapshot)
         return "Unknown section."
 
     total_pages = max(1, (len(items) + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE)
@@ -220,10 +733,13 @@ def list_section(
 
     state["current_section"] = section
     state["page"] = page
-    state["last_items"] = {str(i): item for i, item in enumerate(page_items, start=start + 1)}
+    # Only indexes are kept in the session; the items themselves stay in the
+    # snapshot and are looked up again by ``resolve_item``.
+    state["last_items"] = list(range(start, start + len(page_items)))
 
+    format_date = snapshot.model.format_date
     lines: List[str] = []
-    for idx, item in state["last_items"].items():
+    for idx, item in enumerate(page_items, start=start + 1):
         if section == "experience":
             base = (
                 f"[{idx}] {item['company']} | {item['role']} | "
@@ -242,7 +758,7 @@ def list_section(
             base = f"[{idx}] {item.get('name', 'item')}"
         lines.append(base)
         if expand:
-            lines.append(render_details(section, item))
+            lines.append(render_details(section, item, snapshot))
     hint = " • type 'next' to see more" if page < total_pages else ""
     lines.append(
         f"Page {page}/{total_pages} • use 'show <id>' or <id>{hint}"
@@ -250,7 +766,32 @@ def list_section(
     return "\n".join(lines)
 
 
-def render_details(section: str, item: Dict[str, Any]) -> str:
+def resolve_item(
+    state: Dict[str, Any],
+    item_id: str,
+    snapshot: ResumeSnapshot | None = None,
+) -> Dict[str, Any] | None:
+    """Return the item shown as ``[item_id]`` in the last listing, if any."""
+
+    if not item_id.isdigit():
+        return None
+    index = int(item_id) - 1
+    if index not in state.get("last_items", []):
+        return None
+    items = (snapshot or STORE.current).data.get(state.get("current_section"))
+    if not isinstance(items, list) or not 0 <= index < len(items):
+        return None
+    return items[index]
+
+
+def render_details(
+    section: str,
+    item: Dict[str, Any],
+    snapshot: ResumeSnapshot | None = None,
+) -> str:
+    """Render the detail view of ``item`` using the snapshot's formatted dates."""
+
+    format_date = (snapshot or STORE.current).model.format_date
     if section == "experience":
         lines = [
             f"Company: {item['company']}",
@@ -298,18 +839,59 @@ def render_details(section: str, item: Dict[str, Any]) -> str:
     return ""
 
 
-def search_resume(query: str, section: str | None = None) -> List[str]:
-    query = query.lower()
-    sections = [section] if section else [k for k, v in RESUME.items() if isinstance(v, list)]
-    results: List[str] = []
-    for sec in sections:
-        items = RESUME.get(sec, [])
+# Sections included in exports, in order, with their headings.
+EXPORT_SECTIONS = (
+    ("experience", "Experience"),
+    ("projects", "Projects"),
+    ("skills", "Skills"),
+    ("education", "Education"),
+    ("certifications", "Certifications"),
+)
+
+
+def export_document(snapshot: ResumeSnapshot, mode: str = "detailed") -> Document:
+    """Collect the resume as terminal-formatted text for :mod:`export`.
+
+    ``compact`` leaves out highlight bullets and detail lists.
+    """
+
+    sections = []
+    for section, heading in EXPORT_SECTIONS:
+        items = snapshot.data.get(section)
+        if not isinstance(items, list) or not items:
+            continue
+        blocks = []
         for item in items:
-            blob = json.dumps(item).lower()
-            if query in blob:
-                label = item.get("company") or item.get("name") or str(item.get("id"))
-                results.append(f"[{sec}] {label}")
-    return results
+            text = render_details(section, item, snapshot)
+            if mode == "compact":
+                text = "\n".join(
+                    line
+                    for line in text.splitlines()
+                    if not line.startswith("- ") and line not in ("Highlights:", "Details:")
+                )
+            blocks.append(text)
+        sections.append((heading, tuple(blocks)))
+    overview = snapshot.data.get("overview", {})
+    return Document(
+        title=overview.get("name") or "Resume",
+        overview=tuple(format_overview(snapshot).splitlines()),
+        sections=tuple(sections),
+    )
+
+
+def search_resume(
+    query: str,
+    section: str | None = None,
+    snapshot: ResumeSnapshot | None = None,
+) -> List[str]:
+    """Return ranked ``[section] label`` lines for items matching ``query``.
+
+    Every word in ``query`` must match (as a whole word or a word prefix)
+    somewhere in the item's values.
+    """
+
+    index = (snapshot or STORE.current).search
+    return [f"[{sec}] {label}" for sec, label in index.search(query, section)]
 
 # ---------------------------------------------------------------------------
 # Command handlers
@@ -515,285 +1097,519 @@ def handle_secret_game(state: Dict[str, Any], command: str, args: List[str]) ->
     }
 
 
-def handle_command(state: Dict[str, Any], cmd: str) -> Dict[str, Any]:
-    """Return response dict for ``cmd`` executed in ``state``."""
+# The registry maps command names to small handler functions.  Handlers
+# return ``None`` to fall through to "Unknown command." (for example
+# ``versions`` with an unrecognised option).
+COMMANDS = CommandRegistry()
 
-    if not cmd:
-        return {"text": ""}
+PAGE_FLAGS = {"--expand": 0, "--page": 1}
 
-    parts = shlex.split(cmd)
-    command = parts[0].lower()
-    args = parts[1:]
-    args_lower = [a.lower() for a in args]
 
-    if state.get("mode") == "secret":
-        return handle_secret_game(state, command, args)
-
-    # Allow using just the numeric id to show an item
-    if command.isdigit() and not args:
-        item = state.get("last_items", {}).get(command)
-        if not item:
-            return {"text": "Unknown id."}
-        section = state.get("current_section")
-        return {"text": render_details(section, item)}
-
-    # Basic navigation -----------------------------------------------------
-    if command == "help":
-        return {
-            "text": HELP_TEXT
-            if not args
-            else COMMAND_HELP.get(args_lower[0], "No help available.")
-        }
+def _page_arg(inv: Invocation) -> int:
+    try:
+        return int(inv.flag("--page", "1"))
+    except ValueError:
+        return 1
 
-    if command == "open" and args:
-        section = args_lower[0]
-        if section == "secret":
-            state["mode"] = "secret"
-            state["secret"] = {
-                "defeated": [],
-                "equipment": [],
-                "player_hp": 30,
-                "enemy_hp": {"printer": 15, "server": 18, "mdf": 20},
-            }
-            return {
-                "text": (
-                    "Welcome to the admin arena minigame. "
-                    "Here you practice taming troublesome infrastructure before it fails. "
-                    "Your targets are the printer, server, and MDF. "
-                    "Use 'attack <target>' (or 'atk') to engage a system, manage gear with 'equipment' ('eq'), "
-                    "inspect with 'look <thing>' ('l'), and leave anytime with 'exit' ('q')."
-                )
-            }
-        expand = "--expand" in args_lower
-        page = 1
-        if "--page" in args_lower:
-            try:
-                idx = args_lower.index("--page")
-                page = int(args[idx + 1])
-            except (ValueError, IndexError):
-                pass
-        text = list_section(state, section, expand=expand, page=page)
-        state.setdefault("history", []).append(cmd)
-        return {"text": text}
-
-    if command == "show" and args:
-        item = state.get("last_items", {}).get(args[0])
-        if not item:
-            return {"text": "Unknown id."}
-        section = state.get("current_section")
-        return {"text": render_details(section, item)}
-
-    if command in {"next", "prev"}:
-        section = state.get("current_section")
-        if not section:
-            return {"text": "Nothing to paginate."}
-        page = state.get("page", 1) + (1 if command == "next" else -1)
-        text = list_section(state, section, page=page)
-        return {"text": text}
-
-    if command == "back":
-        hist = state.get("history", [])
-        if len(hist) > 1:
-            hist.pop()  # remove current
-            prev = hist.pop()
-            return handle_command(state, prev)
-        state.clear()
-        return {"text": ""}
 
-    # Discovery -----------------------------------------------------------
-    if command == "search" and args:
-        section = None
-        if "--in" in args_lower:
-            try:
-                idx = args_lower.index("--in")
-                section = args_lower[idx + 1]
-            except IndexError:
-                pass
-        query = args[0]
-        hits = search_resume(query, section)
-        if not hits:
-            return {"text": "No matches."}
-        return {"text": "\n".join(hits)}
+def _show_item(inv: Invocation, item_id: str) -> Dict[str, Any]:
+    item = resolve_item(inv.state, item_id, inv.snapshot)
+    if not item:
+        return {"text": "Unknown id."}
+    return {"text": render_details(inv.state.get("current_section"), item, inv.snapshot)}
 
-    if command == "filter" and args:
-        # Very small filter implementation: filter <section> field=value
-        sec = args_lower[0] if args_lower[0] in RESUME else state.get("current_section")
-        exprs = args[1:] if args_lower[0] in RESUME else args
-        items = RESUME.get(sec, [])
-        if not isinstance(items, list):
-            return {"text": "Unknown section."}
-        results = items
-        for expr in exprs:
-            if "=" in expr:
-                field, value = expr.split("=", 1)
-                field = field.strip()
-                value = value.strip()
-                results = [i for i in results if str(i.get(field, "")).lower() == value.lower()]
-        lines = []
-        for item in results:
-            label = item.get("company") or item.get("name")
-            lines.append(label)
-        return {"text": "Matches: " + ", ".join(lines) if lines else "No matches."}
-
-    if command == "timeline":
-        sec = "experience"
-        if "--section" in args_lower:
-            try:
-                idx = args_lower.index("--section")
-                sec = args_lower[idx + 1]
-            except IndexError:
-                pass
-        items = RESUME.get(sec, [])
-        lines = [
-            " → ".join(
-                f"{format_date(i.get('start'))} - {format_date(i.get('end'), True)} {i.get('company', i.get('name'))}"
-                for i in items
-            )
-        ]
-        return {"text": "".join(lines)}
 
-    if command == "certifications":
-        expand = "--expand" in args_lower
-        page = 1
-        if "--page" in args_lower:
-            try:
-                idx = args_lower.index("--page")
-                page = int(args[idx + 1])
-            except (ValueError, IndexError):
-                pass
-        text = list_section(state, "certifications", expand=expand, page=page)
-        state.setdefault("history", []).append(cmd)
-        return {"text": text}
-
-    if command == "skills":
-        level = None
-        tags: List[str] | None = None
-        if "--level" in args_lower:
-            try:
-                level = args[args_lower.index("--level") + 1].lower()
-            except IndexError:
-                pass
-        if "--tag" in args_lower:
-            try:
-                tags = [
-                    t.strip().lower()
-                    for t in args[args_lower.index("--tag") + 1].split(",")
-                ]
-            except IndexError:
-                pass
-        skills = RESUME.get("skills", [])
-        out = []
-        for s in skills:
-            if level and s.get("level", "").lower() != level:
-                continue
-            if tags and not {t.lower() for t in s.get("tags", [])} & set(tags):
-                continue
-            out.append(f"{s['name']} ({s.get('level')})")
-        return {"text": " • ".join(out) if out else "No skills match."}
+# Basic navigation -----------------------------------------------------------
 
-    if command == "contact":
-        o = RESUME.get("overview", {})
+
+@COMMANDS.register("help")
+def _help(inv: Invocation) -> Dict[str, Any]:
+    if not inv.parsed.words:
+        return {"text": HELP_TEXT}
+    return {"text": COMMAND_HELP.get(inv.parsed.words[0].lower(), "No help available.")}
+
+
+@COMMANDS.register("open", flags=PAGE_FLAGS, min_args=1, arg_kinds=("section",))
+def _open(inv: Invocation) -> Dict[str, Any]:
+    section = (inv.arg(0) or "").lower()
+    state = inv.state
+    if section == "secret":
+        state["mode"] = "secret"
+        state["secret"] = {
+            "defeated": [],
+            "equipment": [],
+            "player_hp": 30,
+            "enemy_hp": {"printer": 15, "server": 18, "mdf": 20},
+        }
         return {
             "text": (
-                f"Email: {o.get('email')} | Web: {o.get('web')} | "
-                f"LinkedIn: {o.get('linkedin')} | GitHub: {o.get('github')}"
+                "Welcome to the admin arena minigame. "
+                "Here you practice taming troublesome infrastructure before it fails. "
+                "Your targets are the printer, server, and MDF. "
+                "Use 'attack <target>' (or 'atk') to engage a system, manage gear with 'equipment' ('eq'), "
+                "inspect with 'look <thing>' ('l'), and leave anytime with 'exit' ('q')."
             )
         }
+    if section not in inv.snapshot.data:
+        guess = inv.snapshot.search.section_names.best(section)
+        return {"text": f"Unknown section. Did you mean '{guess}'?" if guess else "Unknown section."}
+    text = list_section(
+        state, section, expand=inv.has("--expand"), page=_page_arg(inv), snapshot=inv.snapshot
+    )
+    state.setdefault("history", []).append(inv.line)
+    return {"text": text}
 
-    if command == "copy" and args:
-        field = args_lower[0]
-        o = RESUME.get("overview", {})
-        value = o.get(field)
-        if not value:
-            return {"text": "Unknown field."}
-        return {"text": f"Copied {field}: {value}"}
 
-    if command == "share":
-        return {"text": "Public link: https://example.com/r/jordan-patel/engineering"}
+@COMMANDS.register("show", min_args=1)
+def _show(inv: Invocation) -> Dict[str, Any]:
+    return _show_item(inv, inv.parsed.words[0])
 
-    if command == "download":
-        filename = "resume.txt"
-        if "--filename" in args_lower:
-            try:
-                filename = args[args_lower.index("--filename") + 1]
-            except IndexError:
-                pass
-        return {"text": f"Download started: {filename}"}
-
-    if command == "versions":
-        versions = RESUME.get("versions", [])
-        if "--list" in args_lower or not args:
-            return {"text": " • ".join(versions) + f" • last_updated: {RESUME['meta']['last_updated']}"}
-        if "--diff" in args_lower:
-            return {"text": "Diff not implemented."}
-
-    if command == "tags":
-        tags = state.setdefault("tags", {})
-        if "--list" in args_lower:
-            listing = [f"{k}: {', '.join(v)}" for k, v in tags.items()]
-            return {"text": "\n".join(listing) if listing else "No tags."}
-        if "--add" in args_lower:
-            try:
-                idx = args_lower.index("--add")
-                id_, tag = args[idx + 1], args[idx + 2]
-                tags.setdefault(id_, []).append(tag)
-                return {"text": f"Tag '{tag}' added to {id_}."}
-            except IndexError:
-                return {"text": "Usage: tags --add <id> <tag>"}
-        if "--remove" in args_lower:
-            try:
-                idx = args_lower.index("--remove")
-                id_, tag = args[idx + 1], args[idx + 2]
-                if tag in tags.get(id_, []):
-                    tags[id_].remove(tag)
-                return {"text": f"Tag '{tag}' removed from {id_}."}
-            except IndexError:
-                return {"text": "Usage: tags --remove <id> <tag>"}
-        return {"text": "Usage: tags --list|--add|--remove"}
-
-    if command == "notes":
-        notes = state.setdefault("notes", {})
-        if "--add" in args_lower:
-            try:
-                idx = args_lower.index("--add")
-                id_, text = args[idx + 1], args[idx + 2]
-                notes.setdefault(id_, []).append(text)
-                return {"text": "Note added."}
-            except IndexError:
-                return {"text": "Usage: notes --add <id> 'text'"}
-        if "--show" in args_lower:
-            try:
-                idx = args_lower.index("--show")
-                id_ = args[idx + 1]
-                return {"text": " | ".join(notes.get(id_, [])) or "No notes."}
-            except IndexError:
-                return {"text": "Usage: notes --show <id>"}
-        return {"text": "Usage: notes --add|--show"}
-
-    if command == "print":
-        mode = "compact"
-        if "--detailed" in args:
-            mode = "detailed"
-        return {"text": f"Printing in {mode} mode..."}
-
-    if command == "theme" and args:
-        theme = args[0]
-        state["theme"] = theme
-        return {"text": f"Theme set to {theme}."}
-
-    if command == "about":
-        meta = RESUME.get("meta", {})
-        return {
-            "text": f"Resume data from {meta.get('data_source')} • last_updated: {meta.get('last_updated')}"
-        }
 
-    if command == "clear":
-        return {"text": "", "clear": True}
+@COMMANDS.register("next", "prev")
+def _paginate(inv: Invocation) -> Dict[str, Any]:
+    section = inv.state.get("current_section")
+    if not section:
+        return {"text": "Nothing to paginate."}
+    page = inv.state.get("page", 1) + (1 if inv.parsed.name == "next" else -1)
+    return {"text": list_section(inv.state, section, page=page, snapshot=inv.snapshot)}
+
+
+@COMMANDS.register("back")
+def _back(inv: Invocation) -> Dict[str, Any]:
+    hist = inv.state.get("history", [])
+    if len(hist) > 1:
+        hist.pop()  # remove current
+        prev = hist.pop()
+        return handle_command(inv.state, prev, inv.snapshot)
+    # Reset the visitor's state but keep the bookkeeping fields (timestamp,
+    # revision, schema, token nonce) the stores and tokens rely on.
+    for key in [k for k in inv.state if not k.startswith("_")]:
+        del inv.state[key]
+    return {"text": ""}
+
+
+# Discovery ------------------------------------------------------------------
+
+
+@COMMANDS.register("search", flags={"--in": 1}, min_args=1, arg_kinds=("term",))
+def _search(inv: Invocation) -> Dict[str, Any]:
+    section = inv.flag("--in")
+    query = " ".join(inv.args)
+    scope = section.lower() if section else None
+    hits = search_resume(query, scope, inv.snapshot)
+    if hits:
+        return {"text": "\n".join(hits)}
+    # Retry with misspelt words replaced by their closest indexed tokens.
+    corrected = inv.snapshot.search.correct(query)
+    hits = search_resume(corrected, scope, inv.snapshot) if corrected else []
+    if not hits:
+        return {"text": "No matches."}
+    return {"text": f"No matches for '{query}'; showing results for '{corrected}':\n" + "\n".join(hits)}
+
+
+@COMMANDS.register("filter", min_args=1)
+def _filter(inv: Invocation) -> Dict[str, Any]:
+    # filter [section] <field><op><value>... — see ``app/model.py``.
+    sections = inv.snapshot.model.sections
+    words = inv.parsed.words
+    first = words[0].lower()
+    sec = first if first in inv.snapshot.data else inv.state.get("current_section")
+    exprs = words[1:] if first in inv.snapshot.data else words
+    section = sections.get(sec)
+    if section is None:
+        return {"text": "Unknown section."}
+    try:
+        rows = section.filter(exprs)
+    except FilterError as exc:
+        return {"text": str(exc), "error": True}
+    labels = [item_label(section.items[row]) for row in rows]
+    return {"text": "Matches: " + ", ".join(labels) if labels else "No matches."}
+
+
+@COMMANDS.register("timeline", flags={"--section": 1})
+def _timeline(inv: Invocation) -> Dict[str, Any]:
+    sec = (inv.flag("--section") or "experience").lower()
+    items = inv.snapshot.data.get(sec, [])
+    format_date = inv.snapshot.model.format_date
+    lines = [
+        " → ".join(
+            f"{format_date(i.get('start'))} - {format_date(i.get('end'), True)} {i.get('company', i.get('name'))}"
+            for i in items
+        )
+    ]
+    return {"text": "".join(lines)}
+
+
+@COMMANDS.register("certifications", flags=PAGE_FLAGS)
+def _certifications(inv: Invocation) -> Dict[str, Any]:
+    text = list_section(
+        inv.state,
+        "certifications",
+        expand=inv.has("--expand"),
+        page=_page_arg(inv),
+        snapshot=inv.snapshot,
+    )
+    inv.state.setdefault("history", []).append(inv.line)
+    return {"text": text}
+
+
+@COMMANDS.register("skills", flags={"--level": 1, "--tag": 1})
+def _skills(inv: Invocation) -> Dict[str, Any]:
+    level = inv.flag("--level")
+    level = level.lower() if level else None
+    tag_arg = inv.flag("--tag")
+    tags = {t.strip().lower() for t in tag_arg.split(",")} if tag_arg else None
+    skills = inv.snapshot.model.sections.get("skills")
+    if skills is None:
+        return {"text": "No skills match."}
+    levels = skills.columns.get("level")
+    tag_sets = skills.columns.get("tags")
+    out = []
+    for row, s in enumerate(skills.items):
+        if level and (levels is None or levels.text[row] != level):
+            continue
+        if tags and (tag_sets is None or not tag_sets.elements[row] & tags):
+            continue
+        out.append(f"{s['name']} ({s.get('level')})")
+    return {"text": " • ".join(out) if out else "No skills match."}
+
+
+@COMMANDS.register("contact")
+def _contact(inv: Invocation) -> Dict[str, Any]:
+    o = inv.snapshot.data.get("overview", {})
+    return {
+        "text": (
+            f"Email: {o.get('email')} | Web: {o.get('web')} | "
+            f"LinkedIn: {o.get('linkedin')} | GitHub: {o.get('github')}"
+        )
+    }
+
+
+@COMMANDS.register("copy", min_args=1)
+def _copy(inv: Invocation) -> Dict[str, Any]:
+    field = inv.parsed.words[0].lower()
+    value = inv.snapshot.data.get("overview", {}).get(field)
+    if not value:
+        return {"text": "Unknown field."}
+    return {"text": f"Copied {field}: {value}"}
+
+
+@COMMANDS.register("share")
+def _share(inv: Invocation) -> Dict[str, Any]:
+    return {"text": "Public link: https://example.com/r/jordan-patel/engineering"}
+
+
+@COMMANDS.register("download", flags={"--filename": 1, "--format": 1})
+def _download(inv: Invocation) -> Dict[str, Any]:
+    filename = inv.flag("--filename")
+    suffix = Path(filename).suffix.lstrip(".").lower() if filename else ""
+    fmt = (inv.flag("--format") or (suffix if suffix in FORMATS else "txt")).lower()
+    if fmt not in FORMATS:
+        return {"text": f"Unknown format '{fmt}'. Use {', '.join(FORMATS)}."}
+    filename = safe_filename(filename, fmt)
+    # The client fetches the export from this URL.
+    return {
+        "text": f"Download started: {filename}",
+        "download": f"/api/export/{fmt}?filename={filename}",
+    }
+
+
+@COMMANDS.register("versions", flags={"--list": 0, "--diff": 2})
+def _versions(inv: Invocation) -> Dict[str, Any] | None:
+    resume = inv.snapshot.data
+    source = inv.snapshot.source
+    if inv.has("--diff"):
+        refs = inv.flag_values("--diff")
+        if len(refs) == 1:  # compare with the revision being served
+            refs = (refs[0], "current")
+        if not refs:
+            return {"text": "Usage: versions --diff <a> [<b>]"}
+        try:
+            old, new = (REVISIONS.resolve(source, ref) for ref in refs)
+            return {"text": REVISIONS.diff(old, new).render()}
+        except (RevisionError, OSError) as exc:
+            return {"text": str(exc) if isinstance(exc, RevisionError) else "Revision data is missing."}
+    if inv.has("--list") or not inv.parsed.words:
+        versions = resume.get("versions", [])
+        lines = [" • ".join(versions) + f" • last_updated: {resume['meta']['last_updated']}"]
+        history = REVISIONS.history(source)
+        for i, (version, recorded) in enumerate(history, start=1):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(recorded))
+            current = " (current)" if version == inv.snapshot.version else ""
+            lines.append(f"[{i}] {version} {when}{current}")
+        return {"text": "\n".join(lines)}
+    return None
+
+
+# Filesystem -----------------------------------------------------------------
+
+
+def _cwd(inv: Invocation) -> str:
+    return inv.state.get("cwd", "/")
+
+
+def _filesystem(inv: Invocation) -> FileSystem:
+    """The tree of the resume being served; tenants never see the default one."""
+
+    source = getattr(inv.snapshot, "source", DEFAULT_TENANT)
+    if source in ("", DEFAULT_TENANT):
+        return FILESYSTEM
+    return TENANTS.filesystem(source)
+
+
+def _targets(inv: Invocation, name: str) -> Tuple[List[str], List[str]]:
+    """Expand every positional argument; return (paths, error lines)."""
+
+    fs = _filesystem(inv)
+    paths: List[str] = []
+    errors: List[str] = []
+    for pattern in inv.args:
+        found = fs.expand(_cwd(inv), pattern)
+        if not found:
+            errors.append(f"{name}: {pattern}: No such file or directory")
+        paths.extend(found)
+    return paths, errors
+
+
+@COMMANDS.register("pwd")
+def _pwd(inv: Invocation) -> Dict[str, Any]:
+    return {"text": _cwd(inv)}
+
+
+@COMMANDS.register("cd")
+def _cd(inv: Invocation) -> Dict[str, Any]:
+    fs = _filesystem(inv)
+    target = fs.resolve(_cwd(inv), inv.arg(0, "/"))
+    if target is None or not fs.nodes[target].is_dir:
+        return {"text": f"cd: {inv.arg(0)}: No such directory", "error": True}
+    inv.state["cwd"] = target
+    return {"text": ""}
+
+
+@COMMANDS.register("ls")
+def _ls(inv: Invocation) -> Dict[str, Any]:
+    fs = _filesystem(inv)
+    if not inv.args:
+        return {"text": "\n".join(fs.listing(_cwd(inv)))}
+    paths, lines = _targets(inv, "ls")
+    for path in paths:
+        if len(paths) > 1 and fs.nodes[path].is_dir:
+            lines.append(f"{path}:")
+        lines.extend(fs.listing(path))
+    return {"text": "\n".join(lines)}
+
+
+@COMMANDS.register("cat", min_args=1)
+def _cat(inv: Invocation) -> Dict[str, Any]:
+    fs = _filesystem(inv)
+    paths, errors = _targets(inv, "cat")
+    out = []
+    for path in paths:
+        node = fs.nodes[path]
+        if node.is_dir:
+            errors.append(f"cat: {path}: Is a directory")
+        else:
+            out.append(node.content)
+    return {"text": "\n\n".join(out + (["\n".join(errors)] if errors else []))}
+
+
+@COMMANDS.register("tree")
+def _tree(inv: Invocation) -> Dict[str, Any]:
+    fs = _filesystem(inv)
+    if not inv.args:
+        return {"text": fs.tree(_cwd(inv))}
+    paths, lines = _targets(inv, "tree")
+    return {"text": "\n".join(lines + [fs.tree(p) for p in paths])}
+
+
+@COMMANDS.register("find", flags={"--name": 1})
+def _find(inv: Invocation) -> Dict[str, Any]:
+    fs = _filesystem(inv)
+    start = fs.resolve(_cwd(inv), inv.arg(0, "."))
+    if start is None:
+        return {"text": f"find: {inv.arg(0)}: No such file or directory", "error": True}
+    matches = fs.find(start, inv.flag("--name"))
+    return {"text": "\n".join(matches) if matches else "No matches."}
+
+
+@COMMANDS.register("grep", min_args=1, arg_kinds=("term",))
+def _grep(inv: Invocation) -> Dict[str, Any]:
+    fs = _filesystem(inv)
+    text, *patterns = inv.args
+    paths: List[str] = []
+    for pattern in patterns or ["."]:
+        found = fs.expand(_cwd(inv), pattern)
+        if not found:
+            return {"text": f"grep: {pattern}: No such file or directory", "error": True}
+        paths.extend(found)
+    hits = fs.grep(text, paths)
+    if not hits:
+        return {"text": "No matches."}
+    return {"text": "\n".join(f"{path}:{number}: {line}" for path, number, line in hits)}
+
+
+# Personal annotations -------------------------------------------------------
+
+
+@COMMANDS.register("tags", flags={"--list": 0, "--add": 2, "--remove": 2})
+def _tags(inv: Invocation) -> Dict[str, Any]:
+    tags = inv.state.setdefault("tags", {})
+    if inv.has("--list"):
+        listing = [f"{k}: {', '.join(v)}" for k, v in tags.items()]
+        return {"text": "\n".join(listing) if listing else "No tags."}
+    if inv.has("--add"):
+        values = inv.flag_values("--add")
+        if len(values) < 2:
+            return {"text": "Usage: tags --add <id> <tag>"}
+        id_, tag = values
+        tags.setdefault(id_, []).append(tag)
+        return {"text": f"Tag '{tag}' added to {id_}."}
+    if inv.has("--remove"):
+        values = inv.flag_values("--remove")
+        if len(values) < 2:
+            return {"text": "Usage: tags --remove <id> <tag>"}
+        id_, tag = values
+        if tag in tags.get(id_, []):
+            tags[id_].remove(tag)
+        return {"text": f"Tag '{tag}' removed from {id_}."}
+    return {"text": "Usage: tags --list|--add|--remove"}
+
+
+@COMMANDS.register("notes", flags={"--add": 2, "--show": 1})
+def _notes(inv: Invocation) -> Dict[str, Any]:
+    notes = inv.state.setdefault("notes", {})
+    if inv.has("--add"):
+        values = inv.flag_values("--add")
+        if len(values) < 2:
+            return {"text": "Usage: notes --add <id> 'text'"}
+        id_, text = values
+        notes.setdefault(id_, []).append(text)
+        return {"text": "Note added."}
+    if inv.has("--show"):
+        id_ = inv.flag("--show")
+        if id_ is None:
+            return {"text": "Usage: notes --show <id>"}
+        return {"text": " | ".join(notes.get(id_, [])) or "No notes."}
+    return {"text": "Usage: notes --add|--show"}
+
+
+# Miscellaneous --------------------------------------------------------------
+
+
+@COMMANDS.register("print", flags={"--detailed": 0})
+def _print(inv: Invocation) -> Dict[str, Any]:
+    mode = "detailed" if inv.has("--detailed") else "compact"
+    return {"text": f"Printing in {mode} mode...", "print": f"/api/export/html?mode={mode}&inline=1"}
+
+
+@COMMANDS.register("theme", min_args=1)
+def _theme(inv: Invocation) -> Dict[str, Any]:
+    theme = inv.parsed.words[0]
+    inv.state["theme"] = theme
+    return {"text": f"Theme set to {theme}."}
+
+
+@COMMANDS.register("about")
+def _about(inv: Invocation) -> Dict[str, Any]:
+    meta = inv.snapshot.data.get("meta", {})
+    return {
+        "text": (
+            f"Resume data from {meta.get('data_source')} • last_updated: {meta.get('last_updated')}"
+            f" • version: {inv.snapshot.version}"
+        )
+    }
+
+
+@COMMANDS.register("clear")
+def _clear(inv: Invocation) -> Dict[str, Any]:
+    return {"text": "", "clear": True}
+
+
+@COMMANDS.register("quit")
+def _quit(inv: Invocation) -> Dict[str, Any]:
+    return {"text": "Goodbye."}
+
 
-    if command == "quit":
-        return {"text": "Goodbye."}
+def did_you_mean(parsed: ParsedCommand, snapshot: ResumeSnapshot) -> str | None:
+    """A corrected command line for a command that matched nothing, if one is close.
+
+    The command name is matched against the registry.  Arguments are only
+    corrected where the command's spec declares a section or search term
+    (``arg_kinds``), and a suggestion that would not parse into a runnable
+    command is dropped.
+    """
+
+    name = parsed.name if parsed.name in COMMANDS.specs else COMMANDS.suggest(parsed.name)
+    if name is None:
+        return None
+    spec = COMMANDS.specs[name]
+    index = snapshot.search
+    known = {"section": index.section_names, "term": index.terms}
+    words, position, flag_values = [name], 0, 0
+    for word in parsed.words:
+        if flag_values:
+            flag_values -= 1
+        elif word.lower() in spec.flags:
+            flag_values = spec.flags[word.lower()]
+        else:
+            terms = known.get(spec.arg_kind(position) or "")
+            position += 1
+            if terms is not None and word.lower() not in terms:
+                word = terms.best(word.lower()) or word
+        words.append(word)
+    suggestion = shlex.join(words)
+    fixed = COMMANDS.parse(suggestion)
+    if fixed is None or len(fixed.words) < spec.min_args:
+        return None
+    if [w.lower() for w in words] == [parsed.name, *(w.lower() for w in parsed.words)]:
+        return None
+    return suggestion
+
+
+def command_label(state: Dict[str, Any], parsed: ParsedCommand | None) -> str:
+    """Name ``parsed`` for metrics and profiles from a small, fixed set."""
+
+    if parsed is None:
+        return "invalid"
+    if state.get("mode") == "secret":
+        return "secret"
+    if parsed.name.isdigit() and not parsed.words:
+        return "show"
+    return parsed.name if parsed.name in COMMANDS.specs else "unknown"
+
+
+def handle_command(
+    state: Dict[str, Any],
+    cmd: str,
+    snapshot: ResumeSnapshot | None = None,
+) -> Dict[str, Any]:
+    """Return response dict for ``cmd`` executed in ``state``.
+
+    The whole command runs against one resume ``snapshot`` (the current one
+    by default) so a concurrent hot-reload cannot mix two revisions.
+    """
+
+    if not cmd:
+        return {"text": ""}
 
-    return {"text": "Unknown command."}
+    parsed = COMMANDS.parse(cmd)
+    if parsed is None:
+        return {"text": "Invalid input."}
+
+    label = command_label(state, parsed)
+    start = time.perf_counter()
+    if label == "secret":
+        result = handle_secret_game(state, parsed.name, list(parsed.words))
+    elif parsed.name.isdigit() and not parsed.words:
+        # Allow using just the numeric id to show an item
+        result = _show_item(Invocation(state, cmd, parsed, snapshot or STORE.current), parsed.name)
+    else:
+        result = COMMANDS.dispatch(state, cmd, snapshot or STORE.current, parsed)
+        if result is None:
+            suggestion = did_you_mean(parsed, snapshot or STORE.current)
+            result = {"text": f"Unknown command. Did you mean '{suggestion}'?" if suggestion else "Unknown command."}
+    COMMAND_SECONDS.labels(label).observe(time.perf_counter() - start)
+    return result
 
 # ---------------------------------------------------------------------------
 # Help text
@@ -806,17 +1622,21 @@ HELP_TEXT = (
     "  next | prev                          — paginate through the current section\n"
     "  back                                 — return to previous view\n"
     "  search <query> [--in <section>]      — full-text search\n"
-    "  filter [section] field=value         — filter items\n"
+    "  filter [section] field=value|~|<|>   — filter items (also 'in', a..b)\n"
     "  timeline [--section <name>]          — show section timeline\n"
     "  certifications [--expand] [--page N] — list certifications\n"
     "  skills [--level L] [--tag t1,t2]     — list skills\n"
     "  contact                              — show contact info\n"
     "  copy <field>                         — copy a field\n"
     "  share                                — show public link\n"
-    "  download [--filename name]           — download resume\n"
-    "  versions [--list|--diff]             — resume versions\n"
+    "  download [--format f] [--filename n] — download resume (txt, md, html, pdf)\n"
+    "  print [--detailed]                   — print the resume\n"
+    "  versions [--list|--diff a b]         — resume revisions and what changed\n"
     "  tags --list|--add|--remove           — manage tags\n"
     "  notes --add|--show                   — manage notes\n"
+    "  ls | cd | cat | tree [path]          — browse the resume files\n"
+    "  find [path] [--name pattern]         — list files by name\n"
+    "  grep <text> [path...]                — search file contents\n"
     "Type 'help <command>' for more details."
 )
 
@@ -826,59 +1646,178 @@ COMMAND_HELP = {
     "next": "next — go to the next page of the current section.",
     "prev": "prev — go to the previous page of the current section.",
     "back": "back — return to the previous view.",
-    "search": "search <query> [--in <section>] — full-text search.",
-    "filter": "filter [section] field=value — filter items.",
+    "search": "search <words...> [--in <section>] — ranked search; every word must match (prefixes allowed).",
+    "filter": (
+        "filter [section] <expr>... — filter items; every expression must match: "
+        "field=value, field~text (contains), field>value / field<value (dates or numbers), "
+        "field in a,b, field=2019..2022 (date range), active=2015..2018 (start-end overlaps)."
+    ),
     "timeline": "timeline [--section <name>] — show a section timeline.",
     "certifications": "certifications [--expand] [--page N] — list certifications.",
     "skills": "skills [--level L] [--tag t1,t2] — list skills.",
     "contact": "contact — show contact info.",
     "copy": "copy <field> — copy a field from the overview section.",
     "share": "share — show the public resume link.",
-    "download": "download [--filename name] — download the resume.",
-    "versions": "versions [--list|--diff] — resume versions or diff.",
+    "download": (
+        "download [--format txt|md|html|pdf] [--filename name] — download the resume; "
+        "the format defaults to the file name's extension, else txt."
+    ),
+    "print": "print [--detailed] — open a printable copy; compact leaves out highlights.",
+    "versions": (
+        "versions [--list] — list recorded resume revisions. "
+        "versions --diff <a> [<b>] — added, removed and changed items between two revisions "
+        "(a version, its [n] from the list, or current~N; b defaults to current)."
+    ),
     "tags": "tags --list|--add <id> <tag>|--remove <id> <tag> — manage tags.",
     "notes": "notes --add <id> 'text'|--show <id> — manage notes.",
+    "ls": "ls [path...] — list a directory; globs such as 'projects/*lab*' are expanded.",
+    "cd": "cd [path] — change directory ('..' goes up, no argument returns to /).",
+    "pwd": "pwd — print the current directory.",
+    "cat": "cat <path...> — print files.",
+    "tree": "tree [path] — show the directory tree.",
+    "find": "find [path] [--name pattern] — list files below path whose name matches.",
+    "grep": "grep <text> [path...] — case-insensitive search of file contents.",
 }
 
+# ---------------------------------------------------------------------------
+# Completion
+# ---------------------------------------------------------------------------
+
+# What a positional argument of each command completes to.
+COMPLETE_ARGS = {
+    "open": "sections",
+    "filter": "sections",
+    "show": "ids",
+    "help": "commands",
+    "search": "skills",
+    "copy": "fields",
+}
+# What each value of a flag completes to, keyed by flag or (command, flag).
+COMPLETE_FLAGS: Dict[Any, Tuple[str | None, ...]] = {
+    "--in": ("sections",),
+    "--section": ("sections",),
+    "--level": ("levels",),
+    "--tag": ("tags",),
+    "--format": ("formats",),
+    ("tags", "--add"): ("ids", "tags"),
+    ("tags", "--remove"): ("ids", "tags"),
+    ("notes", "--add"): ("ids", None),
+    ("notes", "--show"): ("ids",),
+}
+
+
+@lru_cache(maxsize=1)
+def command_tries() -> Tuple[Trie, Dict[str, Trie], Trie]:
+    """Tries over command names, each command's flags and export formats.
+
+    Commands are all registered at import, so these are built once.
+    """
+
+    names = Trie(set(COMMAND_HELP) | set(COMMANDS.specs))
+    flags = {name: Trie(spec.flags) for name, spec in COMMANDS.specs.items()}
+    return names, flags, Trie(FORMATS)
+
+
+def _completion_kind(words: List[str]) -> Tuple[str | None, str | None]:
+    """``(kind, command)`` of the word following ``words``."""
+
+    if not words:
+        return "commands", None
+    name = words[0].lower()
+    spec = COMMANDS.specs.get(name)
+    arity = spec.flags if spec else {}
+    flag, taken = None, 0
+    for word in words[1:]:
+        if flag is not None:
+            taken += 1
+            if taken == arity[flag]:
+                flag = None
+            continue
+        if arity.get(word.lower()):
+            flag, taken = word.lower(), 0
+    if flag is not None:
+        kinds = COMPLETE_FLAGS.get((name, flag)) or COMPLETE_FLAGS.get(flag, ())
+        return (kinds[taken] if taken < len(kinds) else None), name
+    return COMPLETE_ARGS.get(name), name
+
+
+def complete_line(line: str, state: Dict[str, Any], snapshot: ResumeSnapshot) -> Dict[str, Any]:
+    """Completions for the last (possibly empty) word of ``line``."""
+
+    words = line.split()
+    if not line or line[-1].isspace():
+        words.append("")
+    word = words[-1]
+    kind, command = _completion_kind(words[:-1])
+    names, flags, formats = command_tries()
+    if word.startswith("--") and command in flags:
+        options = flags[command].complete(word)
+    elif kind == "commands":
+        options = names.complete(word)
+    elif kind == "formats":
+        options = formats.complete(word)
+    elif kind == "ids":
+        ids = [str(i + 1) for i in state.get("last_items", [])]
+        options = [i for i in ids if i.startswith(word)][:MAX_COMPLETIONS]
+    elif kind is not None:
+        options = snapshot.completions.complete(kind, word)
+    else:
+        options = []
+    common = os.path.commonprefix(options) if options else ""
+    return {"word": word, "completions": options, "common": common}
+
 # ---------------------------------------------------------------------------
 # HTTP routes
 # ---------------------------------------------------------------------------
 
-@app.get("/", response_class=FileResponse)
-def index() -> FileResponse:
-    return FileResponse(STATIC_DIR / "index.html")
+@app.get("/", response_class=HTMLResponse)
+def index(request: Request) -> Response:
+    return ASSETS.page("index.html", request.headers)
 
 
-@app.get("/projects", response_class=FileResponse)
-def projects() -> FileResponse:
-    return FileResponse(STATIC_DIR / "projects.html")
+@app.get("/projects", response_class=HTMLResponse)
+def projects(request: Request) -> Response:
+    return ASSETS.page("projects.html", request.headers)
 
 
-@app.get("/education", response_class=FileResponse)
-def education() -> FileResponse:
-    return FileResponse(STATIC_DIR / "education.html")
+@app.get("/education", response_class=HTMLResponse)
+def education(request: Request) -> Response:
+    return ASSETS.page("education.html", request.headers)
 
 
-@app.get("/about", response_class=FileResponse)
-def about() -> FileResponse:
-    return FileResponse(STATIC_DIR / "about.html")
+@app.get("/about", response_class=HTMLResponse)
+def about(request: Request) -> Response:
+    return ASSETS.page("about.html", request.headers)
 
 
-@app.get("/resume", response_class=FileResponse)
-def resume() -> FileResponse:
-    return FileResponse(STATIC_DIR / "resume.html")
+@app.get("/resume", response_class=HTMLResponse)
+def resume(request: Request) -> Response:
+    return ASSETS.page("resume.html", request.headers)
 
 
 @app.get("/api/resume")
-def get_resume() -> Dict[str, Any]:
-    return RESUME
+async def get_resume(request: Request) -> Response:
+    """Serve the resume from bytes encoded once per data version.
+
+    Clients revalidate with ``If-None-Match`` and receive ``304`` while the
+    data is unchanged; ``Accept-Encoding`` selects a precompressed variant.
+    """
+
+    snapshot = await tenant_snapshot(request)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Unknown resume.")
+    return snapshot.resume_body.respond(request.headers)
 
 
 @app.get("/api/start")
-def start() -> Dict[str, Any]:
+async def start(request: Request) -> Dict[str, Any]:
     """Start a new CLI session."""
-    session_id = str(uuid.uuid4())
-    sessions[session_id] = {"_ts": time.time()}
+    await admit(request)
+    snapshot = await tenant_snapshot(request)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Unknown resume.")
+    session_id = await save_session(None, new_session(), tenant_of(request))
+    SESSIONS_CREATED.inc()
     ascii_art = (
         "Welcome to the interactive resume terminal!\n"
         "This website showcases my experience, projects, and skills in a hands-on format\n"
@@ -889,19 +1828,306 @@ def start() -> Dict[str, Any]:
     welcome = (
         "Welcome to the interactive resume terminal.\n"
         + "Type 'help' for commands or 'open overview' to begin.\n"
-        + f"Last updated: {RESUME['meta']['last_updated']}"
+        + f"Last updated: {snapshot.data['meta']['last_updated']}"
+    )
+    return {
+        "session_id": session_id,
+        "ascii_art": ascii_art,
+        "text": welcome,
+        "data_version": snapshot.version,
+    }
+
+
+@app.get("/api/export/{fmt}")
+async def export(
+    fmt: str,
+    request: Request,
+    mode: str = "detailed",
+    filename: str | None = None,
+    inline: bool = False,
+) -> Response:
+    """Stream the resume as ``txt``, ``md``, ``html`` or ``pdf``.
+
+    Each (format, mode, resume version) is rendered once and then served
+    from the export cache.
+    """
+
+    if fmt not in FORMATS or mode not in MODES:
+        raise HTTPException(status_code=404)
+    snapshot = await tenant_snapshot(request)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Unknown resume.")
+    return EXPORTS.response(
+        request.headers,
+        version=snapshot.version,
+        fmt=fmt,
+        mode=mode,
+        document=lambda: export_document(snapshot, mode),
+        filename=safe_filename(filename, fmt),
+        inline=inline,
     )
-    return {"session_id": session_id, "ascii_art": ascii_art, "text": welcome}
+
+
+@app.get("/api/complete")
+async def complete(request: Request, line: str = "", session_id: str | None = None) -> Dict[str, Any]:
+    """Tab completion for the partial command ``line``.
+
+    The session is optional; it only supplies the item ids of the last
+    listing.  Everything else comes from tries built once per resume revision.
+    """
+
+    if len(line) > MAX_COMMAND_LENGTH:
+        return {"word": "", "completions": [], "common": ""}
+    snapshot = await tenant_snapshot(request)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Unknown resume.")
+    state = await load_session(session_id, tenant_of(request)) if session_id else None
+    return complete_line(line, state or {}, snapshot)
 
 
 @app.post("/api/command")
-async def command(payload: CommandRequest) -> Dict[str, Any]:
+async def command(payload: CommandRequest, request: Request) -> Dict[str, Any]:
     session_id = payload.session_id
     cmd = payload.command.strip()
-    state = sessions.get(session_id)
-    if state is None:
+    await admit(request, session_id)
+    snapshot = await tenant_snapshot(request)
+    if snapshot is None:
         return {"text": "Invalid session."}
-    state["_ts"] = time.time()
-    result = handle_command(state, cmd)
-    sessions[session_id] = state
+    profile = PROFILER and cmd and PROFILER.wanted(request.headers.get("x-profile"))
+    captured: List[ProfileCapture] = []
+
+    def apply(state: Dict[str, Any]) -> Dict[str, Any]:
+        state["_ts"] = time.time()
+        if profile:
+            label = command_label(state, COMMANDS.parse(cmd))
+            mode = state.get("mode") or "terminal"
+            result, capture = PROFILER.capture(label, mode, handle_command, state, cmd, snapshot)
+            captured[:] = [capture]  # only the attempt that was saved counts
+            return result
+        return handle_command(state, cmd, snapshot)
+
+    outcome = await update_session(session_id, tenant_of(request), apply)
+    if captured:
+        # Profile files are written after the session, off the event loop.
+        await asyncio.to_thread(PROFILER.save, captured[0])
+    if outcome is None:
+        return {"text": "Invalid session."}
+    result, new_id = outcome
+    if new_id != session_id:
+        result["session_id"] = new_id
     return result
+
+
+@app.post("/api/batch")
+async def batch(payload: BatchRequest, request: Request) -> Dict[str, Any]:
+    """Run several commands in order against one session.
+
+    The session is loaded and stored once for the whole batch and every
+    command sees the same resume snapshot, which makes scripted tours and
+    replays cost one round trip instead of one per command.  Each command
+    still counts against the session's rate limit.  A batch that loses a
+    write race is re-run as a whole, so it never interleaves with another
+    command.
+    """
+
+    await admit(request, payload.session_id, cost=len(payload.commands))
+    snapshot = await tenant_snapshot(request)
+    if snapshot is None:
+        return {"text": "Invalid session.", "results": []}
+
+    def apply(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        state["_ts"] = time.time()
+        return [handle_command(state, cmd.strip(), snapshot) for cmd in payload.commands]
+
+    outcome = await update_session(payload.session_id, tenant_of(request), apply)
+    if outcome is None:
+        return {"text": "Invalid session.", "results": []}
+    results, new_id = outcome
+    if new_id != payload.session_id:
+        return {"results": results, "session_id": new_id}
+    return {"results": results}
+
+
+# Pause between streamed lines of multi-line output (e.g. combat logs).
+WS_LINE_DELAY = float(os.getenv("WS_LINE_DELAY", "0.3"))
+# With Redis, socket sessions are written back after this many commands (and
+# on disconnect) rather than after every command.
+WS_FLUSH_EVERY = int(os.getenv("WS_FLUSH_EVERY", "20"))
+
+
+async def flush_socket_session(
+    session_id: str,
+    tenant: str,
+    state: Dict[str, Any],
+    pending: List[str],
+    snapshot: ResumeSnapshot,
+) -> Dict[str, Any]:
+    """Write a socket's batched ``state`` back to Redis and return it.
+
+    ``pending`` lists the commands run on ``state`` since it was loaded or
+    last written.  If another request saved the session in between, those
+    commands are replayed on the fresh state (their output is not sent
+    again) and the write is retried, as in :func:`update_session`.
+    ``pending`` is emptied once written; when every attempt loses it is kept
+    for the next flush.  A session that expired meanwhile is written anew:
+    this socket holds the only copy.
+    """
+
+    for attempt in range(SESSION_CAS_RETRIES + 1):
+        if attempt:
+            await cas_backoff(attempt)
+            fresh = await load_session(session_id, tenant)
+            if fresh is None:
+                await save_session(session_id, state, tenant)
+                pending.clear()
+                return state
+            state = fresh
+            for cmd in pending:
+                handle_command(state, cmd, snapshot)
+        if await compare_and_save(session_id, state, state.get(REVISION_FIELD, 0), tenant):
+            if attempt:
+                SESSION_CONFLICTS.labels("retried").inc()
+            pending.clear()
+            return state
+    SESSION_CONFLICTS.labels("gave_up").inc()
+    return state
+
+
+@app.websocket("/ws/terminal")
+async def terminal_socket(websocket: WebSocket, session_id: str) -> None:
+    """Interactive terminal transport bound to one session.
+
+    The client sends ``{"command": "..."}`` messages.  Commands producing
+    ``lines`` are streamed as ``{"type": "line"}`` messages, paced by
+    ``WS_LINE_DELAY``; every command ends with a ``{"type": "result"}``
+    message carrying the usual response fields.  The session is loaded once
+    and kept in this worker for the life of the connection.
+    """
+
+    await websocket.accept()
+    tenant = tenant_of(websocket)
+    snapshot = await tenant_snapshot(websocket)
+    state = await load_session(session_id, tenant) if snapshot is not None else None
+    if state is None:
+        await websocket.send_json({"type": "result", "text": "Invalid session.", "error": True})
+        await websocket.close(code=1008)
+        return
+
+    pending: List[str] = []  # commands not yet written to Redis
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                message = None
+            if not isinstance(message, dict):
+                await websocket.send_json({"type": "result", "text": "Invalid input.", "error": True})
+                continue
+            cmd = str(message.get("command", "")).strip()
+            if len(cmd) > MAX_COMMAND_LENGTH:
+                await websocket.send_json({"type": "result", "text": "Invalid input.", "error": True})
+                continue
+            wait = await admission_wait(websocket, session_id)
+            if wait:
+                await websocket.send_json(
+                    {
+                        "type": "result",
+                        "text": f"Too many requests; retry in {math.ceil(wait)}s.",
+                        "error": True,
+                        "retry_after": math.ceil(wait),
+                    }
+                )
+                continue
+            state["_ts"] = time.time()
+            # Follow hot-reloads of the tenant's resume between commands.
+            snapshot = (await tenant_snapshot(websocket)) or snapshot
+            result = handle_command(state, cmd, snapshot)
+            lines = result.pop("lines", None)
+            if lines:
+                for i, line in enumerate(lines):
+                    if i and WS_LINE_DELAY:
+                        await asyncio.sleep(WS_LINE_DELAY)
+                    await websocket.send_json(
+                        {"type": "line", "text": line, "error": bool(result.get("error"))}
+                    )
+                result["streamed"] = True
+            if TOKENS is not None:
+                # The client holds token sessions; hand it the new one.
+                new_id = await save_session(session_id, state, tenant)
+                if new_id != session_id:
+                    session_id = result["session_id"] = new_id
+                await websocket.send_json({"type": "result", **result})
+                continue
+            await websocket.send_json({"type": "result", **result})
+
+            if not USE_REDIS:
+                # The in-memory store holds this very dict, so saving is free
+                # and keeps its last-access order current.
+                state[REVISION_FIELD] = state.get(REVISION_FIELD, 0) + 1
+                await save_session(session_id, state, tenant)
+                continue
+            # Redis writes are batched.
+            pending.append(cmd)
+            if len(pending) >= WS_FLUSH_EVERY:
+                state = await flush_socket_session(session_id, tenant, state, pending, snapshot)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if pending:
+            await flush_socket_session(session_id, tenant, state, pending, snapshot)
+            if pending:
+                logging.getLogger(__name__).warning(
+                    "Dropped %d socket commands of a contended session", len(pending)
+                )
+
+
+@app.get("/api/admin/profiles")
+def admin_profiles(request: Request, limit: int = 10) -> Dict[str, Any]:
+    """List the slowest recently profiled commands with stack summaries."""
+
+    if PROFILER is None or not PROFILE_ADMIN_TOKEN:
+        raise HTTPException(status_code=404)
+    token = request.headers.get("x-admin-token", "")
+    if not secrets.compare_digest(token.encode(), PROFILE_ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403)
+    return {"profiles": [r.as_dict() for r in PROFILER.slowest(max(1, min(limit, 100)))]}
+
+
+@app.get("/api/stats")
+def stats() -> Dict[str, Any]:
+    """Report session store counters for monitoring."""
+
+    tenants = {"tenants": TENANTS.stats()} if TENANT_MODE != "off" else {}
+    if USE_REDIS:  # resident count and expiry are Redis' business
+        return {"backend": "redis", **tenants}
+    return {"backend": "memory", **sessions.stats(), **tenants}
+
+
+@app.get("/metrics")
+def metrics() -> Response:
+    """Expose counters and histograms in the Prometheus text format."""
+
+    return Response(METRICS.render(), media_type=CONTENT_TYPE)
+
+
+# Requests are labelled by route; anything unknown (404s, probes) shares one
+# label so stray URLs cannot grow the number of series.
+_ROUTE_LABELS = frozenset(getattr(route, "path", "") for route in app.routes) - {"/static"}
+
+
+def _route_label(path: str) -> str:
+    if path in _ROUTE_LABELS:
+        return path
+    if path.startswith("/static/"):
+        return "/static"
+    return "other"
+
+
+app.add_middleware(
+    MetricsMiddleware, duration=HTTP_SECONDS, size=HTTP_RESPONSE_BYTES, label=_route_label
+)
+# Added last so it runs first: routes and metrics see the unprefixed path.
+if TENANT_MODE != "off":
+    app.add_middleware(
+        TenantMiddleware, mode=TENANT_MODE, host_suffix=os.getenv("TENANT_HOST_SUFFIX", "")
+    )
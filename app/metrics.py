@@ -0,0 +1,288 @@
+"""Dependency-free metrics in the Prometheus text exposition format."""
+
+from __future__ import annotations
+
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; tuned for sub-millisecond command handlers up to slow Redis calls.
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+# Bytes; from an empty 304 to the full resume document.
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+class Metric:
+    """Base class holding one child per combination of label values.
+
+    A metric without ``labelnames`` is its own (only) child, so
+    ``counter.inc()`` works directly.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "Metric"] = {}
+        self._reset()
+
+    def _reset(self) -> None:  # pragma: no cover - overridden
+        pass
+
+    def _child(self) -> "Metric":
+        child = type(self).__new__(type(self))
+        child.name, child.help, child.labelnames, child._children = self.name, self.help, (), {}
+        return child
+
+    def labels(self, *values: str) -> "Metric":
+        """Return the child for ``values``, one per label name."""
+
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._child()
+            child._reset()
+            self._children[values] = child
+        return child
+
+    def _own_samples(self) -> Iterable[Sample]:  # pragma: no cover - overridden
+        return ()
+
+    def samples(self) -> Iterable[Sample]:
+        if not self.labelnames:
+            yield from self._own_samples()
+            return
+        for values, child in list(self._children.items()):
+            base = dict(zip(self.labelnames, values))
+            for name, labels, value in child._own_samples():
+                yield name, {**base, **labels}, value
+
+
+class Counter(Metric):
+    """A monotonically increasing value."""
+
+    kind = "counter"
+
+    def _reset(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def _own_samples(self) -> Iterable[Sample]:
+        yield self.name, {}, self.value
+
+
+class Gauge(Metric):
+    """A value that can go up and down."""
+
+    kind = "gauge"
+
+    def _reset(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def _own_samples(self) -> Iterable[Sample]:
+        yield self.name, {}, self.value
+
+
+class Histogram(Metric):
+    """Observations counted into fixed upper-bound ``buckets``."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _child(self) -> "Metric":
+        child = super()._child()
+        child.buckets = self.buckets
+        return child
+
+    def _reset(self) -> None:
+        # One slot per bucket plus the implicit +Inf bucket.
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def _own_samples(self) -> Iterable[Sample]:
+        total = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            total += count
+            yield self.name + "_bucket", {"le": _format_value(bound)}, total
+        yield self.name + "_sum", {}, self.sum
+        yield self.name + "_count", {}, total
+
+
+class CallbackMetric(Metric):
+    """A counter or gauge whose samples are produced when scraped.
+
+    ``callback`` returns ``{label values: value}``; with no label names the
+    key is the empty tuple.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        callback: Callable[[], Dict[Tuple[str, ...], float]],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge",
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def _reset(self) -> None:
+        pass
+
+    def samples(self) -> Iterable[Sample]:
+        for values, value in self.callback().items():
+            yield self.name, dict(zip(self.labelnames, values)), value
+
+
+class Registry:
+    """A named collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"duplicate metric {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def callback(
+        self,
+        name: str,
+        help: str,
+        callback: Callable[[], Dict[Tuple[str, ...], float]],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge",
+    ) -> CallbackMetric:
+        return self.register(CallbackMetric(name, help, callback, labelnames, kind))
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text format."""
+
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            help_text = metric.help.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {metric.name} {help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing HTTP requests and sizing their response bodies.
+
+    ``label`` maps a request path to a bounded set of route labels so that
+    arbitrary URLs cannot create unbounded series.  Sizes are the bytes sent,
+    i.e. after any content-encoding.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        duration: Histogram,
+        size: Histogram,
+        label: Callable[[str], str],
+    ) -> None:
+        self.app = app
+        self.duration = duration
+        self.size = size
+        self.label = label
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sent = 0
+
+        async def counting_send(message: Message) -> None:
+            nonlocal sent
+            if message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, counting_send)
+        finally:
+            # Route paths exclude any mount prefix (e.g. a tenant's /t/<name>).
+            path, root = scope["path"], scope.get("root_path", "")
+            label = self.label(path[len(root) :] if root and path.startswith(root) else path)
+            self.duration.labels(label).observe(time.perf_counter() - start)
+            self.size.labels(label).observe(sent)
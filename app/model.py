@@ -0,0 +1,231 @@
+"""Columnar, typed model of the resume's list sections."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Sequence, Tuple
+
+try:
+    from .utils import format_date
+except ImportError:  # pragma: no cover - fallback for script execution
+    from utils import format_date
+
+DATE_RE = re.compile(r"^(\d{4})(?:-(\d{2}))?(?:-(\d{2}))?$")
+# Comparison operators, longest first so ``>=`` wins over ``>``.
+OPERATORS = (">=", "<=", "=", ">", "<", "~")
+# A missing ``end`` means the role is ongoing.
+OPEN_ENDED = {"end"}
+FOREVER = 99991231
+
+Predicate = Callable[[int], bool]
+
+
+class FilterError(ValueError):
+    """Raised for filter expressions that cannot be compiled."""
+
+
+def date_bounds(value: Any) -> Tuple[int, int] | None:
+    """Return the first and last ``YYYYMMDD`` day covered by ``value``.
+
+    ``"2021"`` covers 20210101-20211231, ``"2021-05"`` 20210501-20210531
+    (every month is treated as 31 days long, which is harmless for ordering).
+    """
+
+    match = DATE_RE.match(str(value).strip()) if value is not None else None
+    if not match:
+        return None
+    year, month, day = match.groups()
+    low_month, high_month = (int(month), int(month)) if month else (1, 12)
+    low_day, high_day = (int(day), int(day)) if day else (1, 31)
+    base = int(year) * 10000
+    return base + low_month * 100 + low_day, base + high_month * 100 + high_day
+
+
+def _number(value: Any) -> float | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class Column:
+    """All values of one field of a section, one entry per item."""
+
+    name: str
+    text: Tuple[str, ...]
+    elements: Tuple[FrozenSet[str], ...]
+    numbers: Tuple[float | None, ...]
+    dates: Tuple[int | None, ...]
+
+    @classmethod
+    def build(cls, name: str, values: Sequence[Any]) -> "Column":
+        text, elements, numbers, dates = [], [], [], []
+        for value in values:
+            if isinstance(value, list):
+                parts = [str(v).lower() for v in value]
+                text.append(", ".join(parts))
+                elements.append(frozenset(parts))
+            else:
+                lowered = "" if value is None else str(value).lower()
+                text.append(lowered)
+                elements.append(frozenset([lowered]) if lowered else frozenset())
+            numbers.append(_number(value))
+            bounds = date_bounds(value)
+            dates.append(bounds[0] if bounds else None)
+        return cls(name, tuple(text), tuple(elements), tuple(numbers), tuple(dates))
+
+
+@dataclass(frozen=True)
+class SectionModel:
+    """One list section of the resume compiled into columns."""
+
+    name: str
+    items: Tuple[Any, ...]
+    columns: Mapping[str, Column]
+
+    @classmethod
+    def build(cls, name: str, items: Sequence[Any]) -> "SectionModel":
+        rows = [item if isinstance(item, dict) else {"name": item} for item in items]
+        fields = dict.fromkeys(field for row in rows for field in row)
+        columns = {f: Column.build(f, [row.get(f) for row in rows]) for f in fields}
+        return cls(name, tuple(items), columns)
+
+    def _column(self, field: str) -> Column:
+        column = self.columns.get(field)
+        if column is None:
+            raise FilterError(f"Unknown field '{field}'.")
+        return column
+
+    def _date(self, column: Column, row: int) -> int | None:
+        date = column.dates[row]
+        if date is None and column.name in OPEN_ENDED and column.text[row] == "":
+            return FOREVER
+        return date
+
+    def compile(self, field: str, op: str, value: str) -> Predicate:
+        """Return a predicate over row indexes for ``field <op> value``."""
+
+        value = value.strip()
+        if not value.replace(",", "").strip():  # would compare against "" and match everything
+            clause = f"{field} in" if op == "in" else f"{field}{op}"
+            raise FilterError(f"Missing value after '{clause}'.")
+        lowered = value.lower()
+        if field == "active":
+            return self._active(value)
+        column = self._column(field)
+
+        if op == "in":
+            wanted = frozenset(v.strip().lower() for v in value.split(",") if v.strip())
+            return lambda row: bool(column.elements[row] & wanted)
+        if op == "~":
+            return lambda row: lowered in column.text[row]
+        if op == "=" and ".." in value:
+            low, high = self._range(value)
+            return lambda row: (d := self._date(column, row)) is not None and low <= d <= high
+        if op == "=":
+            return lambda row: lowered == column.text[row] or lowered in column.elements[row]
+
+        bounds = date_bounds(value)
+        if bounds is not None and any(d is not None for d in column.dates):
+            limit = {">": bounds[1], ">=": bounds[0], "<": bounds[0], "<=": bounds[1]}[op]
+            keys: Sequence[Any] = [self._date(column, row) for row in range(len(self.items))]
+        elif (number := _number(value)) is not None:
+            limit, keys = number, column.numbers
+        else:
+            limit, keys = lowered, [t or None for t in column.text]
+        compare = {
+            ">": lambda a: a > limit,
+            ">=": lambda a: a >= limit,
+            "<": lambda a: a < limit,
+            "<=": lambda a: a <= limit,
+        }[op]
+        return lambda row: keys[row] is not None and compare(keys[row])
+
+    @staticmethod
+    def _range(value: str) -> Tuple[int, int]:
+        start, _, end = value.partition("..")
+        low = date_bounds(start) if start else (0, 0)
+        high = date_bounds(end) if end else (FOREVER, FOREVER)
+        if low is None or high is None:
+            raise FilterError(f"Invalid date range '{value}'.")
+        return low[0], high[1]
+
+    def _active(self, value: str) -> Predicate:
+        """Items whose ``start``-``end`` span overlaps ``value``."""
+
+        low, high = self._range(value if ".." in value else f"{value}..{value}")
+        start = self._column("start")
+        end = self.columns.get("end")
+
+        def overlaps(row: int) -> bool:
+            begin = start.dates[row]
+            if begin is None:
+                return False
+            finish = self._date(end, row) if end is not None else begin
+            return begin <= high and (finish or begin) >= low
+
+        return overlaps
+
+    def filter(self, expressions: Sequence[str]) -> List[int]:
+        """Indexes of the items matching every expression (AND)."""
+
+        predicates = [self.compile(*clause) for clause in parse_filter(expressions)]
+        return [row for row in range(len(self.items)) if all(p(row) for p in predicates)]
+
+
+def parse_filter(words: Sequence[str]) -> List[Tuple[str, str, str]]:
+    """Split filter words into ``(field, operator, value)`` clauses.
+
+    ``field in a,b`` spans three words; every other clause is one word such
+    as ``level=advanced`` or ``start>=2020-01``.
+    """
+
+    clauses = []
+    i = 0
+    while i < len(words):
+        word = words[i]
+        if i + 2 < len(words) and words[i + 1].lower() == "in":
+            clauses.append((word.lower(), "in", words[i + 2]))
+            i += 3
+            continue
+        for op in OPERATORS:
+            field, sep, value = word.partition(op)
+            if sep and field and not any(o in field for o in OPERATORS):
+                clauses.append((field.strip().lower(), op, value))
+                break
+        else:
+            raise FilterError(f"Cannot parse '{word}'; use field=value, ~, <, >, in or a..b.")
+        i += 1
+    return clauses
+
+
+class ResumeModel:
+    """Every list section of one resume revision, compiled."""
+
+    def __init__(self, data: Mapping[str, Any]) -> None:
+        self.sections: Dict[str, SectionModel] = {
+            name: SectionModel.build(name, items)
+            for name, items in data.items()
+            if isinstance(items, list)
+        }
+        # Display strings for every date value, long and short form.
+        self.dates: Dict[Tuple[Any, bool], str] = {}
+        for section in self.sections.values():
+            for row in section.items:
+                if not isinstance(row, dict):
+                    continue
+                for value in row.values():
+                    if isinstance(value, str) and DATE_RE.match(value):
+                        self.dates[(value, False)] = format_date(value)
+                        self.dates[(value, True)] = format_date(value, True)
+        self.dates[(None, False)] = self.dates[(None, True)] = format_date(None)
+
+    def format_date(self, value: str | None, short: bool = False) -> str:
+        """Pre-formatted :func:`~utils.format_date` for ``value``."""
+
+        text = self.dates.get((value, short))
+        return text if text is not None else format_date(value, short)
@@ -0,0 +1,148 @@
+"""Opt-in cProfile capture for terminal commands."""
+
+from __future__ import annotations
+
+import cProfile
+import logging
+import pstats
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Functions listed per profile in the admin summary.
+STACK_DEPTH = 8
+
+
+@dataclass(frozen=True)
+class ProfileRecord:
+    """Summary of one profiled command."""
+
+    command: str
+    mode: str
+    duration_ms: float
+    started_at: float
+    path: str | None
+    # (function, calls, cumulative ms), most expensive first
+    stack: Tuple[Tuple[str, int, float], ...]
+
+    def as_dict(self) -> dict:
+        return {
+            "command": self.command,
+            "mode": self.mode,
+            "duration_ms": round(self.duration_ms, 3),
+            "started_at": self.started_at,
+            "path": self.path,
+            "stack": [
+                {"function": fn, "calls": calls, "cumulative_ms": round(ms, 3)}
+                for fn, calls, ms in self.stack
+            ],
+        }
+
+
+def _summarise(profile: cProfile.Profile, depth: int = STACK_DEPTH) -> Tuple[Tuple[str, int, float], ...]:
+    """Return the ``depth`` entries of ``profile`` with most cumulative time."""
+
+    stats = pstats.Stats(profile).stats  # type: ignore[attr-defined]
+    rows = []
+    for (filename, line, func), (_, calls, _, cumulative, _) in stats.items():
+        if func == "<method 'disable' of '_lsprof.Profiler' objects>":
+            continue
+        where = func if filename == "~" else f"{Path(filename).name}:{line}({func})"
+        rows.append((where, calls, cumulative * 1000))
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return tuple(rows[:depth])
+
+
+@dataclass(frozen=True)
+class ProfileCapture:
+    """A finished profile that has not been saved yet."""
+
+    profile: cProfile.Profile
+    command: str
+    mode: str
+    duration_ms: float
+    started_at: float
+
+
+class CommandProfiler:
+    """Decide which commands to profile and keep their results.
+
+    The newest ``keep`` profiles are kept on disk and summarised in memory,
+    so ``/api/admin/profiles`` lists the slowest without reading files.
+    """
+
+    def __init__(self, directory: Path, *, sample_rate: float = 0.0, keep: int = 100) -> None:
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.records: Deque[ProfileRecord] = deque(maxlen=keep)
+
+    def wanted(self, header: str | None) -> bool:
+        """Whether to profile a request with the given ``X-Profile`` value."""
+
+        if header and header.strip().lower() in {"1", "true", "yes", "on"}:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def capture(
+        self, command: str, mode: str, fn: Callable[..., Any], *args: Any
+    ) -> Tuple[Any, ProfileCapture]:
+        """Call ``fn(*args)`` under cProfile; return its result and the profile.
+
+        Nothing is written: pass the capture to :meth:`save`.
+        """
+
+        profile = cProfile.Profile()
+        started_at = time.time()
+        start = time.perf_counter()
+        result = profile.runcall(fn, *args)
+        duration_ms = (time.perf_counter() - start) * 1000
+        return result, ProfileCapture(profile, command, mode, duration_ms, started_at)
+
+    def run(self, command: str, mode: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Call ``fn(*args)`` under cProfile and save the profile right away."""
+
+        result, captured = self.capture(command, mode, fn, *args)
+        self.save(captured)
+        return result
+
+    def save(self, captured: ProfileCapture) -> ProfileRecord:
+        """Write ``captured`` to disk, drop the oldest profile and record it.
+
+        Blocking file IO: run it off the event loop.
+        """
+
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(captured.started_at))
+        micros = int(captured.started_at * 1e6) % 1000000
+        name = f"{stamp}{micros:06d}-{captured.command}-{captured.mode}.prof"
+        path: str | None = str(self.directory / name)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            captured.profile.dump_stats(path)
+        except OSError as exc:
+            logger.warning("Could not write profile %s: %s", name, exc)
+            path = None
+
+        if len(self.records) == self.records.maxlen:
+            oldest = self.records[0]
+            if oldest.path:
+                Path(oldest.path).unlink(missing_ok=True)
+        record = ProfileRecord(
+            captured.command,
+            captured.mode,
+            captured.duration_ms,
+            captured.started_at,
+            path,
+            _summarise(captured.profile),
+        )
+        self.records.append(record)
+        return record
+
+    def slowest(self, limit: int = 10) -> List[ProfileRecord]:
+        """Return up to ``limit`` retained profiles, slowest first."""
+
+        return sorted(self.records, key=lambda r: r.duration_ms, reverse=True)[:limit]
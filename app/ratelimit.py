@@ -0,0 +1,142 @@
+"""Token-bucket admission control, in process or shared through Redis."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, List
+
+# KEYS[1] bucket; ARGV rate, burst, cost.  Returns the wait in seconds as a
+# string (Lua numbers would be truncated to integers).
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= cost then
+  tokens = tokens - cost
+else
+  wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+# KEYS[1] bucket; ARGV burst, amount.  Gives back tokens spent by ``acquire``.
+REFUND_LUA = """
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens then
+  tokens = math.min(tonumber(ARGV[1]), tokens + tonumber(ARGV[2]))
+  redis.call('HSET', KEYS[1], 'tokens', tostring(tokens))
+end
+return 0
+"""
+
+
+@dataclass(frozen=True)
+class BucketSpec:
+    """Capacity and refill rate of one kind of bucket.
+
+    A request spends ``cost`` tokens or is told how many seconds until enough
+    have refilled (sent back as ``Retry-After``).
+    """
+
+    burst: float
+    rate: float
+
+    @classmethod
+    def parse(cls, text: str) -> "BucketSpec":
+        """Parse ``"<burst>:<tokens per second>"``, e.g. ``"20:0.5"``."""
+
+        burst, _, rate = text.partition(":")
+        spec = cls(float(burst), float(rate))
+        if spec.burst <= 0 or spec.rate <= 0:
+            raise ValueError(f"invalid rate limit {text!r}")
+        return spec
+
+
+class MemoryRateLimiter:
+    """Process-local token buckets, keeping the ``max_keys`` most recently used."""
+
+    def __init__(self, name: str, spec: BucketSpec, max_keys: int = 10000) -> None:
+        self.name = name
+        self.spec = spec
+        self.max_keys = max_keys
+        # key -> [tokens, last refill], least recently used first
+        self.buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def acquire(self, key: str, cost: float = 1, now: float | None = None) -> float:
+        """Spend ``cost`` tokens from ``key``'s bucket.
+
+        Returns ``0`` when admitted, otherwise the seconds to wait.
+        """
+
+        now = time.monotonic() if now is None else now
+        burst, rate = self.spec.burst, self.spec.rate
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [burst, now]
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+            bucket[0] = min(burst, bucket[0] + max(0.0, now - bucket[1]) * rate)
+            bucket[1] = now
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return 0.0
+        return (cost - bucket[0]) / rate
+
+    def refund(self, key: str, cost: float = 1) -> None:
+        """Give back ``cost`` tokens taken from ``key``'s bucket.
+
+    For requests that a later bucket rejected, so throttled retries do not
+    drain the budgets that admitted them.
+    """
+
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            bucket[0] = min(self.spec.burst, bucket[0] + cost)
+
+
+class RedisRateLimiter:
+    """Token buckets shared through Redis, one hash per key.
+
+    :data:`TOKEN_BUCKET_LUA` refills and spends atomically on the server's
+    clock, and idle buckets expire once they would be full again.
+    """
+
+    def __init__(self, client: Any, name: str, spec: BucketSpec) -> None:
+        self.name = name
+        self.spec = spec
+        self.script = client.register_script(TOKEN_BUCKET_LUA)
+        self.refund_script = client.register_script(REFUND_LUA)
+
+    def _key(self, key: str) -> str:
+        return f"ratelimit:{self.name}:{key}"
+
+    def acquire(self, key: str, cost: float = 1) -> float:
+        wait = self.script(keys=[self._key(key)], args=[self.spec.rate, self.spec.burst, cost])
+        return float(wait)
+
+    def refund(self, key: str, cost: float = 1) -> None:
+        self.refund_script(keys=[self._key(key)], args=[self.spec.burst, cost])
+
+
+class AsyncRedisRateLimiter(RedisRateLimiter):
+    """:class:`RedisRateLimiter` for a ``redis.asyncio`` client."""
+
+    async def acquire(self, key: str, cost: float = 1) -> float:  # type: ignore[override]
+        wait = await self.script(keys=[self._key(key)], args=[self.spec.rate, self.spec.burst, cost])
+        return float(wait)
+
+    async def refund(self, key: str, cost: float = 1) -> None:  # type: ignore[override]
+        await self.refund_script(keys=[self._key(key)], args=[self.spec.burst, cost])
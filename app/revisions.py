@@ -0,0 +1,283 @@
+"""Revision history of resume data and structural diffs between revisions."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# {"objects": {section: sha}, "sections": {section: [[item key, sha], ...]}};
+# sections that are not lists (overview, meta) are stored as one object.
+Manifest = Dict[str, Any]
+
+
+def _canonical(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _writable(directory: Path) -> bool:
+    """Whether ``directory`` is, or could be created as, a writable directory."""
+
+    path = directory
+    while not path.exists():
+        if path.parent == path:
+            return False
+        path = path.parent
+    return path.is_dir() and os.access(path, os.W_OK | os.X_OK)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        tmp.replace(path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def item_key(item: Any, blob: str) -> str:
+    """Identity of ``item`` within its section."""
+
+    if isinstance(item, dict):
+        if item.get("id") is not None:
+            return f"id:{item['id']}"
+        for field in ("name", "company", "institution", "title"):
+            if item.get(field):
+                return f"{field}:{item[field]}"
+    elif isinstance(item, (str, int, float)):
+        return f"value:{item}"
+    return f"sha:{blob[:12]}"
+
+
+def item_label(item: Any) -> str:
+    """Short human description of ``item`` for diff output."""
+
+    if not isinstance(item, dict):
+        return str(item)
+    for first, second in (("company", "role"), ("institution", "degree"), ("name", "issuer")):
+        if item.get(first):
+            return f"{item[first]} | {item[second]}" if item.get(second) else str(item[first])
+    return str(item.get("title") or item.get("id") or "item")
+
+
+@dataclass(frozen=True)
+class SectionDiff:
+    """Changes to one section; entries are ``(label, changed fields)``."""
+
+    section: str
+    added: Tuple[str, ...]
+    removed: Tuple[str, ...]
+    changed: Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+@dataclass(frozen=True)
+class RevisionDiff:
+    old: str
+    new: str
+    sections: Tuple[SectionDiff, ...]
+
+    def render(self) -> str:
+        if not self.sections:
+            return f"No differences between {self.old} and {self.new}."
+        lines = [f"Diff {self.old} -> {self.new}"]
+        for sd in self.sections:
+            lines.append(f"{sd.section}: +{len(sd.added)} ~{len(sd.changed)} -{len(sd.removed)}")
+            lines.extend(f"  + {label}" for label in sd.added)
+            lines.extend(f"  ~ {label} ({', '.join(fields)})" for label, fields in sd.changed)
+            lines.extend(f"  - {label}" for label in sd.removed)
+        return "\n".join(lines)
+
+
+class RevisionError(ValueError):
+    """Raised for version references that match no recorded revision."""
+
+
+class RevisionStore:
+    """Content-addressed, item-deduplicated history of resume revisions.
+
+    Layout under ``directory``::
+
+        objects/<sha[:2]>/<sha>.json    one canonical-JSON blob per item
+        manifests/<version>.json        section -> [(item key, blob sha), ...]
+        history/<source>.jsonl          versions in the order they were served
+
+    A revision that edits one bullet adds one blob and a manifest.  Files are
+    written to a private temporary name and renamed into place, so several
+    workers can share the directory; a read-only one is only read.
+    Manifests never change, so diffs are memoised.
+    """
+
+    def __init__(self, directory: Path, *, diff_cache_size: int = 256) -> None:
+        self.directory = Path(directory)
+        self.writable = _writable(self.directory)
+        self.histories: Dict[str, List[Tuple[str, float]]] = {}
+        self.manifest = lru_cache(maxsize=64)(self._manifest)
+        self.blob = lru_cache(maxsize=1024)(self._blob)
+        self.diff = lru_cache(maxsize=diff_cache_size)(self._diff)
+
+    # -- storage -----------------------------------------------------------
+
+    def _object_path(self, sha: str) -> Path:
+        return self.directory / "objects" / sha[:2] / f"{sha}.json"
+
+    def _manifest_path(self, version: str) -> Path:
+        return self.directory / "manifests" / f"{version}.json"
+
+    def _history_path(self, source: str) -> Path:
+        return self.directory / "history" / f"{source}.jsonl"
+
+    def _put(self, value: Any) -> str:
+        raw = _canonical(value)
+        sha = hashlib.sha256(raw).hexdigest()
+        path = self._object_path(sha)
+        if not path.exists():
+            _write_atomic(path, raw)
+        return sha
+
+    def _blob(self, sha: str) -> Any:
+        return json.loads(self._object_path(sha).read_bytes())
+
+    def _manifest(self, version: str) -> Manifest:
+        return json.loads(self._manifest_path(version).read_bytes())
+
+    def history(self, source: str) -> List[Tuple[str, float]]:
+        """``(version, recorded at)`` of ``source``, oldest first."""
+
+        if source not in self.histories:
+            self.histories[source] = self._read_history(source)
+        return self.histories[source]
+
+    def _read_history(self, source: str) -> List[Tuple[str, float]]:
+        entries: List[Tuple[str, float]] = []
+        try:
+            for line in self._history_path(source).read_text().splitlines():
+                record = json.loads(line)
+                entries.append((record["version"], record["recorded"]))
+        except (OSError, ValueError, KeyError):
+            pass
+        return entries
+
+    def record(self, source: str, version: str, data: Dict[str, Any]) -> bool:
+        """Store revision ``version`` of ``source``; ``True`` if it was new.
+
+        Already-known revisions cost nothing, and nothing is written to a
+        read-only store.  Storage errors are logged and never propagate:
+        history is an extra, not a reason to fail a load.
+        """
+
+        history = self.history(source)
+        if (history and history[-1][0] == version) or not self.writable:
+            return False
+        try:
+            if not self._manifest_path(version).exists():
+                manifest: Manifest = {"objects": {}, "sections": {}}
+                for name, value in data.items():
+                    if isinstance(value, list):
+                        entries, seen = [], set()
+                        for item in value:
+                            sha = self._put(item)
+                            key = item_key(item, sha)
+                            while key in seen:  # duplicate identities stay distinct
+                                key += "'"
+                            seen.add(key)
+                            entries.append([key, sha])
+                        manifest["sections"][name] = entries
+                    else:
+                        manifest["objects"][name] = self._put(value)
+                _write_atomic(self._manifest_path(version), _canonical(manifest))
+            # Another worker may have recorded revisions since we last looked.
+            history = self.histories[source] = self._read_history(source)
+            if history and history[-1][0] == version:
+                return False
+            updated = [*history, (version, time.time())]
+            lines = (json.dumps({"version": v, "recorded": t}) + "\n" for v, t in updated)
+            _write_atomic(self._history_path(source), "".join(lines).encode())
+        except OSError as exc:
+            logger.warning("Could not record resume revision %s: %s", version, exc)
+            return False
+        self.histories[source] = updated
+        return True
+
+    # -- lookup and diff ---------------------------------------------------
+
+    def resolve(self, source: str, ref: str) -> str:
+        """Version named by ``ref`` in ``source``'s history.
+
+        ``ref`` is a version (or a unique prefix of at least four
+        characters), its 1-based position in ``versions --list``,
+        ``current``, or ``current~N`` for N revisions before the current one.
+        """
+
+        versions = [version for version, _ in self.history(source)]
+        ref = ref.strip().lower()
+        if not versions:
+            raise RevisionError("No revisions recorded yet.")
+        base, _, back = ref.partition("~")
+        if base in ("current", "head"):
+            if back and not back.isdigit():
+                raise RevisionError(f"Cannot parse '{ref}'; use current~N.")
+            steps = int(back or 0)
+            if steps >= len(versions):
+                count = len(versions)
+                raise RevisionError(f"Only {count} revision{'s' if count != 1 else ''} recorded.")
+            return versions[-1 - steps]
+        if ref.isdigit() and len(ref) < 4:
+            index = int(ref)
+            if not 1 <= index <= len(versions):
+                raise RevisionError(f"No revision [{ref}]; see 'versions --list'.")
+            return versions[index - 1]
+        matches = {v for v in versions if v.startswith(ref)} if len(ref) >= 4 else set()
+        if len(matches) != 1:
+            raise RevisionError(f"Unknown or ambiguous version '{ref}'.")
+        return matches.pop()
+
+    def _diff(self, old: str, new: str) -> RevisionDiff:
+        a, b = self.manifest(old), self.manifest(new)
+        sections: List[SectionDiff] = []
+        for name in sorted(set(a["objects"]) | set(b["objects"])):
+            before, after = a["objects"].get(name), b["objects"].get(name)
+            if before == after:
+                continue
+            if before is None or after is None:
+                added, removed = ((name,), ()) if before is None else ((), (name,))
+                sections.append(SectionDiff(name, added, removed, ()))
+                continue
+            fields = _changed_fields(self.blob(before), self.blob(after))
+            sections.append(SectionDiff(name, (), (), ((name, fields),)))
+        for name in sorted(set(a["sections"]) | set(b["sections"])):
+            before_items = dict(map(tuple, a["sections"].get(name, [])))
+            after_items = dict(map(tuple, b["sections"].get(name, [])))
+            if before_items == after_items:
+                continue
+            added = tuple(
+                item_label(self.blob(sha)) for key, sha in after_items.items() if key not in before_items
+            )
+            removed = tuple(
+                item_label(self.blob(sha)) for key, sha in before_items.items() if key not in after_items
+            )
+            changed = tuple(
+                (item_label(self.blob(sha)), _changed_fields(self.blob(before_items[key]), self.blob(sha)))
+                for key, sha in after_items.items()
+                if key in before_items and before_items[key] != sha
+            )
+            if added or removed or changed:
+                sections.append(SectionDiff(name, added, removed, changed))
+        return RevisionDiff(old, new, tuple(sections))
+
+
+def _changed_fields(before: Any, after: Any) -> Tuple[str, ...]:
+    if not isinstance(before, dict) or not isinstance(after, dict):
+        return ("value",)
+    return tuple(
+        field for field in sorted(set(before) | set(after)) if before.get(field) != after.get(field)
+    )
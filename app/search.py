@@ -0,0 +1,164 @@
+"""Inverted index over resume values backing the ``search`` command."""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Tuple
+
+try:
+    from .fuzzy import TrigramIndex
+except ImportError:  # pragma: no cover - fallback for script execution
+    from fuzzy import TrigramIndex
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+# Matches in headline fields should outrank a passing mention in a bullet.
+FIELD_WEIGHTS: Dict[str, float] = {
+    "name": 3.0,
+    "company": 3.0,
+    "role": 3.0,
+    "degree": 3.0,
+    "institution": 3.0,
+    "issuer": 2.0,
+    "tech": 2.0,
+    "tags": 2.0,
+    "level": 1.5,
+}
+DEFAULT_WEIGHT = 1.0
+
+# Fields that carry no searchable meaning.
+SKIP_FIELDS = {"id"}
+
+# A prefix match is worth less than typing the whole word.
+PREFIX_FACTOR = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    """Split ``text`` into lowercase search tokens."""
+
+    return TOKEN_RE.findall(text.lower())
+
+
+def _field_values(value: Any) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield str(value)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _field_values(v)
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _field_values(v)
+
+
+def item_label(item: Any) -> str:
+    """Return the label used when listing ``item`` in search results."""
+
+    if isinstance(item, dict):
+        for field in ("company", "name", "institution", "degree", "title"):
+            if item.get(field):
+                return str(item[field])
+        return str(item.get("id"))
+    return str(item)
+
+
+class SearchIndex:
+    """Weighted inverted index over the list sections of a resume.
+
+    Documents are numbered in resume order and each section owns a contiguous
+    range of document ids, which keeps ``--in <section>`` scoping to a simple
+    range check.  The sorted vocabulary allows prefix lookups with
+    :func:`bisect.bisect_left` rather than a scan over every token.
+    """
+
+    def __init__(self, resume: Dict[str, Any]) -> None:
+        self.docs: List[Tuple[str, str]] = []
+        self.sections: Dict[str, range] = {}
+        self.postings: Dict[str, Dict[int, float]] = {}
+
+        for section, items in resume.items():
+            if not isinstance(items, list):
+                continue
+            first = len(self.docs)
+            for item in items:
+                doc_id = len(self.docs)
+                self.docs.append((section, item_label(item)))
+                fields = item.items() if isinstance(item, dict) else [("", item)]
+                for field, value in fields:
+                    if field in SKIP_FIELDS:
+                        continue
+                    weight = FIELD_WEIGHTS.get(field, DEFAULT_WEIGHT)
+                    for text in _field_values(value):
+                        for token in tokenize(text):
+                            scores = self.postings.setdefault(token, {})
+                            if scores.get(doc_id, 0.0) < weight:
+                                scores[doc_id] = weight
+            self.sections[section] = range(first, len(self.docs))
+
+        self.vocabulary: List[str] = sorted(self.postings)
+        # Typo lookups: every indexed token and section name, and the
+        # top-level keys alone for section arguments.
+        self.terms = TrigramIndex([*self.vocabulary, *resume])
+        self.section_names = TrigramIndex(resume)
+
+    def _term_scores(self, term: str) -> Dict[int, float]:
+        """Return document scores for ``term`` including prefix matches."""
+
+        scores: Dict[int, float] = dict(self.postings.get(term, {}))
+        pos = bisect_left(self.vocabulary, term)
+        vocab = self.vocabulary
+        while pos < len(vocab) and vocab[pos].startswith(term):
+            token = vocab[pos]
+            pos += 1
+            if token == term:
+                continue
+            for doc_id, weight in self.postings[token].items():
+                partial = weight * PREFIX_FACTOR
+                if scores.get(doc_id, 0.0) < partial:
+                    scores[doc_id] = partial
+        return scores
+
+    def correct(self, query: str) -> str | None:
+        """``query`` with unmatched terms replaced by their closest known token.
+
+        ``None`` when every term already matches or nothing close is known.
+        """
+
+        changed = False
+        words = []
+        for term in tokenize(query):
+            fixed = None if self._term_scores(term) else self.terms.best(term)
+            changed = changed or fixed is not None
+            words.append(fixed or term)
+        return " ".join(words) if changed else None
+
+    def search(self, query: str, section: str | None = None) -> List[Tuple[str, str]]:
+        """Return ``(section, label)`` pairs matching every term of ``query``.
+
+        Each term matches whole tokens or token prefixes.  Results are ranked
+        by the summed field weight of the matches, ties keeping resume order.
+        """
+
+        terms = tokenize(query)
+        if not terms:
+            return []
+        scope = self.sections.get(section) if section else None
+        if section and scope is None:
+            return []
+
+        totals: Dict[int, float] | None = None
+        # Start from the most selective term so the intersection stays small.
+        for scores in sorted((self._term_scores(t) for t in set(terms)), key=len):
+            if totals is None:
+                totals = {
+                    d: s for d, s in scores.items() if scope is None or d in scope
+                }
+            else:
+                totals = {d: totals[d] + s for d, s in scores.items() if d in totals}
+            if not totals:
+                return []
+
+        ranked = sorted(totals.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [self.docs[doc_id] for doc_id, _ in ranked]
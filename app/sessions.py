@@ -0,0 +1,458 @@
+"""Session storage backends."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
+
+# Timestamp maintained by the web layer for in-memory expiry.  Redis expires
+# keys itself, so the hash backend stores it once at creation and never
+# rewrites it.
+TIMESTAMP_FIELD = "_ts"
+
+# Layout version of the session dictionary, stored under ``SCHEMA_FIELD``.
+#
+# 1 (implicit, no field): ``last_items`` maps display ids to full copies of
+#   the listed resume items.
+# 2: ``last_items`` is a list of indexes into ``current_section`` that are
+#   resolved against the resume snapshot when needed.
+SCHEMA_VERSION = 2
+SCHEMA_FIELD = "_v"
+
+# Number of saves a session has seen; missing means 0.  The Redis stores'
+# ``compare_and_set`` only writes while the stored value matches the one
+# loaded, so concurrent commands on one session are retried instead of lost;
+# the memory store holds live dicts and uses ``SessionLocks`` instead.
+REVISION_FIELD = "_rev"
+
+# KEYS[1] session; ARGV expected revision, JSON state, TTL.  Returns 1 when
+# written, 0 when the session changed or disappeared since it was loaded.
+JSON_CAS_LUA = """
+local current = redis.call('GET', KEYS[1])
+if not current then return 0 end
+if (cjson.decode(current)['_rev'] or 0) ~= tonumber(ARGV[1]) then return 0 end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# KEYS[1] session hash; ARGV expected revision (JSON encoded), TTL, number of
+# changed fields N, N field/value pairs, then the fields to delete.
+HASH_CAS_LUA = """
+local rev = redis.call('HGET', KEYS[1], '_rev')
+if not rev then
+  if redis.call('EXISTS', KEYS[1]) == 0 then return 0 end
+  rev = '0'
+end
+if rev ~= ARGV[1] then return 0 end
+local n = tonumber(ARGV[3])
+if n > 0 then redis.call('HSET', KEYS[1], unpack(ARGV, 4, 3 + 2 * n)) end
+if #ARGV > 3 + 2 * n then redis.call('HDEL', KEYS[1], unpack(ARGV, 4 + 2 * n)) end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+def new_session(now: float | None = None) -> Dict[str, Any]:
+    """Return the initial state of a freshly started session."""
+
+    return {TIMESTAMP_FIELD: now or time.time(), SCHEMA_FIELD: SCHEMA_VERSION}
+
+
+def migrate_session(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Upgrade ``state`` in place to :data:`SCHEMA_VERSION` and return it.
+
+    Sessions written before versioning embedded whole resume items in
+    ``last_items``.  Their display ids were ``index + 1`` of the listed
+    section, so the references can be recovered without the copies.
+    """
+
+    version = state.get(SCHEMA_FIELD, 1)
+    if version >= SCHEMA_VERSION:
+        return state
+    if version < 2:
+        last = state.get("last_items")
+        if isinstance(last, dict):
+            state["last_items"] = sorted(int(k) - 1 for k in last if str(k).isdigit())
+    state[SCHEMA_FIELD] = SCHEMA_VERSION
+    return state
+
+
+class MemorySessions(OrderedDict):
+    """In-process session store ordered by last access.
+
+    Every write moves the session to the end, so the front of the mapping is
+    always the least recently used session.  :meth:`prune` therefore stops at
+    the first session that is still fresh instead of walking the whole store,
+    and the ``max_sessions`` cap evicts from the front in O(1).  ``get`` also
+    drops a session that has outlived ``ttl`` so expiry is exact even between
+    sweeps.
+
+    The access time is the session's ``_ts`` value (set by the web layer on
+    every command); a state written without one is stamped with the time of
+    the write, and one that lost it is treated as expired.
+    """
+
+    def __init__(self, ttl: int, max_sessions: int = 0) -> None:
+        super().__init__()
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.evictions = 0
+        self.expirations = 0
+
+    def __setitem__(self, key: str, value: Dict[str, Any]) -> None:
+        if key in self:
+            self.move_to_end(key)
+        elif self.max_sessions and len(self) >= self.max_sessions:
+            self.popitem(last=False)
+            self.evictions += 1
+        value.setdefault(TIMESTAMP_FIELD, time.time())
+        super().__setitem__(key, value)
+
+    def _expired(self, state: Dict[str, Any], now: float, ttl: int) -> bool:
+        return now - state.get(TIMESTAMP_FIELD, 0) >= ttl
+
+    def get(self, key: str, default: Any = None) -> Dict[str, Any] | None:
+        state = super().get(key)
+        if state is None:
+            return default
+        if self._expired(state, time.time(), self.ttl):
+            del self[key]
+            self.expirations += 1
+            return default
+        return state
+
+    def prune(self, now: float | None = None, ttl: int | None = None) -> int:
+        """Drop expired sessions from the front and return how many went."""
+
+        now = now or time.time()
+        ttl = self.ttl if ttl is None else ttl
+        removed = 0
+        while self:
+            key, state = next(iter(self.items()))
+            if not self._expired(state, now, ttl):
+                break
+            del self[key]
+            removed += 1
+        self.expirations += removed
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters describing the store."""
+
+        return {
+            "resident": len(self),
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SessionLocks:
+    """Per-session :class:`asyncio.Lock` objects that exist only while in use.
+
+    A lock is created by the first request for a session and dropped when
+    the last one waiting on it is done, so idle sessions cost nothing.
+    """
+
+    def __init__(self) -> None:
+        self.locks: Dict[str, Tuple[asyncio.Lock, List[int]]] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[None]:
+        lock, users = self.locks.setdefault(key, (asyncio.Lock(), [0]))
+        users[0] += 1
+        try:
+            async with lock:
+                yield
+        finally:
+            users[0] -= 1
+            if not users[0]:
+                del self.locks[key]
+
+    def __len__(self) -> int:
+        return len(self.locks)
+
+
+class RedisSessions(dict):  # minimal mapping using Redis for storage
+    """Store each session as one JSON string under its session id."""
+
+    def __init__(self, client: Any, ttl: int) -> None:
+        self.client = client
+        self.ttl = ttl
+
+    def __getitem__(self, key: str) -> Dict[str, Any]:
+        data = self.client.get(key)
+        if data is None:
+            raise KeyError(key)
+        return json.loads(data)
+
+    def __setitem__(self, key: str, value: Dict[str, Any]) -> None:
+        self.client.setex(key, self.ttl, json.dumps(value))
+
+    def compare_and_set(self, key: str, value: Dict[str, Any], expected: int) -> bool:
+        """Write ``value`` only if the stored revision is still ``expected``."""
+
+        script = _script(self, JSON_CAS_LUA)
+        return bool(script(keys=[key], args=[expected, json.dumps(value), self.ttl]))
+
+    def get(self, key: str, default: Any = None) -> Dict[str, Any] | None:
+        try:
+            return self.__getitem__(key)
+        except KeyError:
+            return default
+
+    def __delitem__(self, key: str) -> None:
+        self.client.delete(key)
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:  # pragma: no cover - only used by cleanup when memory store
+        for key in self.client.scan_iter():
+            data = self.client.get(key)
+            if data:
+                yield key, json.loads(data)
+
+
+class HashSession(dict):
+    """Session state loaded from a Redis hash.
+
+    ``loaded`` remembers the encoded value of every field as it was read so
+    that :meth:`RedisHashSessions.__setitem__` can send only the difference.
+    """
+
+    def __init__(self, data: Dict[str, Any], loaded: Dict[str, str]) -> None:
+        super().__init__(data)
+        self.loaded = loaded
+
+
+def _hash_changes(
+    encoded: Dict[str, str], loaded: Dict[str, str]
+) -> Tuple[Dict[str, str], List[str]]:
+    """Return the ``(changed, removed)`` fields between two hash states."""
+
+    changed = {
+        f: v
+        for f, v in encoded.items()
+        if f != TIMESTAMP_FIELD and loaded.get(f) != v
+    }
+    # Never delete the timestamp: it keeps the hash non-empty (Redis drops
+    # empty hashes) even after commands that clear the whole state.
+    removed = [f for f in loaded if f not in encoded and f != TIMESTAMP_FIELD]
+    return changed, removed
+
+
+def _mark_saved(value: Dict[str, Any], changed: Dict[str, str], removed: List[str]) -> None:
+    if isinstance(value, HashSession):
+        value.loaded.update(changed)
+        for f in removed:
+            value.loaded.pop(f, None)
+
+
+def _script(store: Any, source: str) -> Any:
+    # Registered on first use: stores are also built around clients that
+    # never run a compare-and-set.
+    if getattr(store, "_cas", None) is None:
+        store._cas = store.client.register_script(source)
+    return store._cas
+
+
+def _hash_cas_args(
+    value: Dict[str, Any], expected: int, ttl: int
+) -> Tuple[List[Any], Dict[str, str], List[str]]:
+    """Arguments of :data:`HASH_CAS_LUA` plus the ``(changed, removed)`` fields."""
+
+    encoded = {f: json.dumps(v) for f, v in value.items()}
+    loaded = getattr(value, "loaded", None)
+    if loaded is None:
+        changed, removed = encoded, []
+    else:
+        changed, removed = _hash_changes(encoded, loaded)
+    args: List[Any] = [json.dumps(expected), ttl, len(changed)]
+    for field, encoded_value in changed.items():
+        args += [field, encoded_value]
+    return args + removed, changed, removed
+
+
+class RedisHashSessions(dict):
+    """Store each session as a Redis hash with partial field updates.
+
+    Field values are individually JSON encoded.  On write the encoded fields
+    are compared with what was loaded: only changed fields are sent with
+    ``HSET``, fields that disappeared are removed with ``HDEL`` and the TTL
+    is refreshed with ``EXPIRE`` in the same pipeline.  When nothing changed
+    the write is just the ``EXPIRE``.
+    """
+
+    KEY_PREFIX = "session:"
+
+    def __init__(self, client: Any, ttl: int) -> None:
+        self.client = client
+        self.ttl = ttl
+
+    def _key(self, key: str) -> str:
+        return self.KEY_PREFIX + key
+
+    def __getitem__(self, key: str) -> HashSession:
+        raw: Dict[str, str] = self.client.hgetall(self._key(key))
+        if not raw:
+            raise KeyError(key)
+        return HashSession({f: json.loads(v) for f, v in raw.items()}, raw)
+
+    def get(self, key: str, default: Any = None) -> HashSession | None:
+        try:
+            return self.__getitem__(key)
+        except KeyError:
+            return default
+
+    def __setitem__(self, key: str, value: Dict[str, Any]) -> None:
+        rkey = self._key(key)
+        loaded = getattr(value, "loaded", None)
+        encoded = {f: json.dumps(v) for f, v in value.items()}
+
+        if loaded is None:  # new session: write everything
+            pipe = self.client.pipeline(transaction=False)
+            pipe.delete(rkey)
+            if encoded:
+                pipe.hset(rkey, mapping=encoded)
+            pipe.expire(rkey, self.ttl)
+            pipe.execute()
+            return
+
+        changed, removed = _hash_changes(encoded, loaded)
+        if not changed and not removed:
+            self.client.expire(rkey, self.ttl)
+            return
+
+        pipe = self.client.pipeline(transaction=False)
+        if changed:
+            pipe.hset(rkey, mapping=changed)
+        if removed:
+            pipe.hdel(rkey, *removed)
+        pipe.expire(rkey, self.ttl)
+        pipe.execute()
+        _mark_saved(value, changed, removed)
+
+    def compare_and_set(self, key: str, value: Dict[str, Any], expected: int) -> bool:
+        """Write the changed fields only if the stored revision is still ``expected``."""
+
+        args, changed, removed = _hash_cas_args(value, expected, self.ttl)
+        if not _script(self, HASH_CAS_LUA)(keys=[self._key(key)], args=args):
+            return False
+        _mark_saved(value, changed, removed)
+        return True
+
+    def __delitem__(self, key: str) -> None:
+        self.client.delete(self._key(key))
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and bool(self.client.exists(self._key(key)))
+
+
+class AsyncRedisSessions:
+    """Awaitable JSON-blob session store built on ``redis.asyncio``.
+
+    ``get``, ``set`` and ``delete`` are coroutines, for the async routes.
+    """
+
+    def __init__(self, client: Any, ttl: int) -> None:
+        self.client = client
+        self.ttl = ttl
+
+    async def get(self, key: str) -> Dict[str, Any] | None:
+        data = await self.client.get(key)
+        return None if data is None else json.loads(data)
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        await self.client.setex(key, self.ttl, json.dumps(value))
+
+    async def compare_and_set(self, key: str, value: Dict[str, Any], expected: int) -> bool:
+        script = _script(self, JSON_CAS_LUA)
+        return bool(await script(keys=[key], args=[expected, json.dumps(value), self.ttl]))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(key)
+
+
+class AsyncRedisHashSessions:
+    """Awaitable counterpart of :class:`RedisHashSessions`."""
+
+    KEY_PREFIX = RedisHashSessions.KEY_PREFIX
+
+    def __init__(self, client: Any, ttl: int) -> None:
+        self.client = client
+        self.ttl = ttl
+
+    def _key(self, key: str) -> str:
+        return self.KEY_PREFIX + key
+
+    async def get(self, key: str) -> HashSession | None:
+        raw: Dict[str, str] = await self.client.hgetall(self._key(key))
+        if not raw:
+            return None
+        return HashSession({f: json.loads(v) for f, v in raw.items()}, raw)
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        rkey = self._key(key)
+        loaded = getattr(value, "loaded", None)
+        encoded = {f: json.dumps(v) for f, v in value.items()}
+
+        if loaded is None:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.delete(rkey)
+                if encoded:
+                    pipe.hset(rkey, mapping=encoded)
+                pipe.expire(rkey, self.ttl)
+                await pipe.execute()
+            return
+
+        changed, removed = _hash_changes(encoded, loaded)
+        if not changed and not removed:
+            await self.client.expire(rkey, self.ttl)
+            return
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            if changed:
+                pipe.hset(rkey, mapping=changed)
+            if removed:
+                pipe.hdel(rkey, *removed)
+            pipe.expire(rkey, self.ttl)
+            await pipe.execute()
+        _mark_saved(value, changed, removed)
+
+    async def compare_and_set(self, key: str, value: Dict[str, Any], expected: int) -> bool:
+        args, changed, removed = _hash_cas_args(value, expected, self.ttl)
+        if not await _script(self, HASH_CAS_LUA)(keys=[self._key(key)], args=args):
+            return False
+        _mark_saved(value, changed, removed)
+        return True
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self._key(key))
+
+
+def async_redis_client(
+    url: str,
+    *,
+    max_connections: int,
+    timeout: float,
+) -> Any:
+    """Return a ``redis.asyncio`` client with a bounded connection pool.
+
+    ``timeout`` bounds connecting, every socket read/write and the wait for
+    a free pooled connection, so a slow Redis surfaces as an error instead
+    of piling up requests.
+    """
+
+    import redis.asyncio as aioredis
+
+    pool = aioredis.BlockingConnectionPool.from_url(
+        url,
+        max_connections=max_connections,
+        timeout=timeout,
+        socket_timeout=timeout,
+        socket_connect_timeout=timeout,
+        decode_responses=True,
+    )
+    return aioredis.Redis(connection_pool=pool)
@@ -0,0 +1,162 @@
+"""Versioned resume snapshots with background hot-reload."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from functools import cached_property, partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+try:
+    from .buildinfo import content_version
+    from .complete import ResumeCompletions
+    from .encoding import EncodedBody
+    from .model import ResumeModel
+    from .search import SearchIndex
+except ImportError:  # pragma: no cover - fallback for script execution
+    from buildinfo import content_version
+    from complete import ResumeCompletions
+    from encoding import EncodedBody
+    from model import ResumeModel
+    from search import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ResumeSnapshot:
+    """Immutable view of one revision of the resume and its derived state."""
+
+    version: str
+    data: Dict[str, Any]
+    search: SearchIndex
+    model: ResumeModel
+    # Name of the store the revision belongs to (the tenant, or "default").
+    source: str = ""
+    loaded_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_bytes(
+        cls,
+        raw: bytes,
+        *,
+        last_updated: Callable[[str], str] | None = None,
+        source: str = "",
+    ) -> "ResumeSnapshot":
+        """Parse ``raw`` JSON and build all derived structures.
+
+        The version is a short content hash so that every worker serving the
+        same file reports the same value.  ``last_updated`` maps that version
+        to the date stored in ``meta.last_updated``.
+        """
+
+        data: Dict[str, Any] = json.loads(raw)
+        version = content_version(raw)
+        if last_updated is not None:
+            data.setdefault("meta", {})["last_updated"] = last_updated(version)
+        return cls(
+            version=version,
+            data=data,
+            search=SearchIndex(data),
+            model=ResumeModel(data),
+            source=source,
+        )
+
+    @cached_property
+    def resume_body(self) -> EncodedBody:
+        """``data`` serialised and compressed once for ``/api/resume``."""
+
+        return EncodedBody.from_json(self.data)
+
+    @cached_property
+    def completions(self) -> ResumeCompletions:
+        """Tab-completion tries, built on first use."""
+
+        return ResumeCompletions(self.data)
+
+
+class ResumeStore:
+    """Hold the current snapshot for ``path`` and reload it when it changes.
+
+    Change detection uses the file's ``(st_mtime_ns, st_size)`` pair, which
+    costs one ``stat`` per poll; the file is only read and parsed when that
+    pair moves, and a new snapshot is only built when the content hash
+    actually differs.  ``on_load`` is called with every snapshot that becomes
+    current, including the first unless it is assigned after construction.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        last_updated: Callable[[Path, str], str] | None = None,
+        name: str | None = None,
+        on_load: Callable[[ResumeSnapshot], None] | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.name = name or self.path.stem
+        self._last_updated = last_updated
+        self.on_load = on_load
+        self._stamp = self._stat()
+        self.current = self._build(self.path.read_bytes())
+        self._loaded(self.current)
+
+    def _stat(self) -> Tuple[int, int]:
+        st = self.path.stat()
+        return st.st_mtime_ns, st.st_size
+
+    def _build(self, raw: bytes) -> ResumeSnapshot:
+        stamp = partial(self._last_updated, self.path) if self._last_updated else None
+        return ResumeSnapshot.from_bytes(raw, last_updated=stamp, source=self.name)
+
+    def _loaded(self, snapshot: ResumeSnapshot) -> None:
+        if self.on_load is None:
+            return
+        try:
+            self.on_load(snapshot)
+        except Exception:  # pragma: no cover - a hook must never break loading
+            logger.exception("on_load hook failed for resume %s", snapshot.version)
+
+    def reload(self, *, force: bool = False) -> bool:
+        """Rebuild the snapshot if the file changed; return ``True`` on swap.
+
+        A file that fails to parse (for example while an editor is halfway
+        through writing it) leaves the current snapshot in place; the next
+        poll will try again.
+        """
+
+        try:
+            stamp = self._stat()
+        except OSError:
+            return False
+        if stamp == self._stamp and not force:
+            return False
+        try:
+            raw = self.path.read_bytes()
+            if content_version(raw) == self.current.version and not force:
+                self._stamp = stamp
+                return False
+            snapshot = self._build(raw)
+        except (OSError, ValueError) as exc:
+            logger.warning("Keeping resume %s; reload failed: %s", self.current.version, exc)
+            return False
+        self._stamp = stamp
+        self.current = snapshot
+        self._loaded(snapshot)
+        logger.info("Loaded resume version %s from %s", snapshot.version, self.path)
+        return True
+
+    async def watch(self, interval: float) -> None:
+        """Poll for changes every ``interval`` seconds.
+
+        Parsing and indexing run in a worker thread so a large resume never
+        stalls the event loop.
+        """
+
+        while True:  # pragma: no cover - simple infinite loop
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.reload)
@@ -1,6 +1,13 @@
-async function fetchResume() {
-  const res = await fetch('/api/resume');
-  return await res.json();
+// Page loaders share one request; the browser revalidates it with its ETag
+let resumePromise;
+// Path prefix of the resume being viewed when tenants are served under /t/<name>
+const BASE = (location.pathname.match(/^\/t\/[^/]+/) || [''])[0];
+
+function fetchResume() {
+  if (!resumePromise) {
+    resumePromise = fetch(`${BASE}/api/resume`).then(res => res.json());
+  }
+  return resumePromise;
 }
 
 function stripScheme(url) {
@@ -1,9 +1,12 @@
-let sessionId; // current CLI session identifier returned by the backend
+let sessionId; // current CLI session identifier; token sessions are replaced by responses
+let socket; // WebSocket bound to the session; HTTP is used when unavailable
 const terminal = document.getElementById('terminal');
 const form = document.getElementById('command-form');
 const input = document.getElementById('command');
 const history = [];
 let historyIndex = -1;
+// Path prefix of the resume being viewed when tenants are served under /t/<name>
+const BASE = (location.pathname.match(/^\/t\/[^/]+/) || [''])[0];
 
 // Escape HTML special characters so user content cannot inject markup
 function escapeHtml(text) {
@@ -42,18 +45,81 @@ function print(text, cls = 'output') {
 
 // Start a new CLI session and show the welcome message
 async function start() {
-  const res = await fetch('/api/start');
+  const res = await fetch(`${BASE}/api/start`);
   const data = await res.json();
+  if (!res.ok) {
+    print(data.detail || 'Could not start a session.', 'error');
+    return;
+  }
   sessionId = data.session_id;
   if (data.ascii_art) {
     print(data.ascii_art, 'ascii');
   }
   print(data.text);
+  connectSocket();
+}
+
+// Fetch exports produced by the download and print commands
+function runExport(data) {
+  if (data.download) {
+    const link = document.createElement('a');
+    link.href = BASE + data.download;
+    link.download = '';
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
+  }
+  if (data.print) {
+    const win = window.open(BASE + data.print, '_blank');
+    if (win) {
+      win.addEventListener('load', () => win.print());
+    }
+  }
+}
+
+// Open a WebSocket for the session so output can be streamed by the server
+function connectSocket() {
+  if (!('WebSocket' in window)) {
+    return;
+  }
+  const scheme = location.protocol === 'https:' ? 'wss:' : 'ws:';
+  const url = `${scheme}//${location.host}${BASE}/ws/terminal?session_id=${encodeURIComponent(sessionId)}`;
+  const ws = new WebSocket(url);
+  ws.addEventListener('open', () => {
+    socket = ws;
+  });
+  ws.addEventListener('close', () => {
+    if (socket === ws) {
+      socket = undefined;
+    }
+  });
+  ws.addEventListener('message', e => {
+    const msg = JSON.parse(e.data);
+    if (msg.type === 'line') {
+      print(msg.text, msg.error ? 'error' : 'output');
+      return;
+    }
+    if (msg.session_id) {
+      sessionId = msg.session_id;
+    }
+    if (msg.clear) {
+      terminal.textContent = '';
+    }
+    if (!msg.streamed) {
+      print(msg.text, msg.error ? 'error' : 'output');
+    }
+    runExport(msg);
+  });
 }
 
 // Send a command string to the backend API and render the response
 async function sendCommand(cmd) {
-  const res = await fetch('/api/command', {
+  if (socket && socket.readyState === WebSocket.OPEN) {
+    print('$ ' + cmd, 'input');
+    socket.send(JSON.stringify({ command: cmd }));
+    return;
+  }
+  const res = await fetch(`${BASE}/api/command`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify({ session_id: sessionId, command: cmd })
@@ -61,12 +127,16 @@ async function sendCommand(cmd) {
   const data = await res.json();
   print('$ ' + cmd, 'input');
   if (!res.ok) {
+    // Validation errors list their problems; 429s carry a plain message.
     const msg = Array.isArray(data.detail)
       ? data.detail.map(d => d.msg).join(' ')
-      : 'Invalid input.';
+      : typeof data.detail === 'string' ? data.detail : 'Invalid input.';
     print(msg, 'error');
     return;
   }
+  if (data.session_id) {
+    sessionId = data.session_id;
+  }
   if (data.clear) {
     terminal.textContent = '';
   }
@@ -77,6 +147,7 @@ async function sendCommand(cmd) {
   } else {
     print(data.text, data.error ? 'error' : 'output');
   }
+  runExport(data);
 }
 
 // Handle manual command entry
@@ -91,8 +162,36 @@ form.addEventListener('submit', e => {
   sendCommand(cmd);
 });
 
+// Complete the last word of the input; several candidates are listed
+async function completeInput() {
+  const line = input.value;
+  const params = new URLSearchParams({ line });
+  if (sessionId) {
+    params.set('session_id', sessionId);
+  }
+  const res = await fetch(`${BASE}/api/complete?${params}`);
+  if (!res.ok) {
+    return;
+  }
+  const data = await res.json();
+  if (input.value !== line || !data.completions.length) {
+    return;
+  }
+  const head = line.slice(0, line.length - data.word.length);
+  if (data.completions.length === 1) {
+    input.value = head + data.completions[0] + ' ';
+  } else if (data.common.length > data.word.length) {
+    input.value = head + data.common;
+  } else {
+    print(data.completions.join('  '));
+  }
+}
+
 input.addEventListener('keydown', e => {
-  if (e.key === 'ArrowUp') {
+  if (e.key === 'Tab') {
+    e.preventDefault();
+    completeInput();
+  } else if (e.key === 'ArrowUp') {
     if (historyIndex > 0) {
       historyIndex--;
       input.value = history[historyIndex];
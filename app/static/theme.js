@@ -1,3 +1,14 @@
+// Keep site navigation on the same resume when tenants are served under /t/<name>
+(function () {
+  const base = (location.pathname.match(/^\/t\/[^/]+/) || [''])[0];
+  if (!base) {
+    return;
+  }
+  document.querySelectorAll('nav a[href^="/"]').forEach(link => {
+    link.setAttribute('href', base + link.getAttribute('href'));
+  });
+})();
+
 (function () {
   const storageKey = 'preferred-theme';
   const toggle = document.getElementById('theme-toggle');
@@ -0,0 +1,207 @@
+"""Multi-tenant resume hosting: per-tenant stores and request routing."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    from .snapshot import ResumeSnapshot, ResumeStore
+    from .vfs import FileSystem
+except ImportError:  # pragma: no cover - fallback for script execution
+    from snapshot import ResumeSnapshot, ResumeStore
+    from vfs import FileSystem
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+TENANT_RE = re.compile(r"^[a-z0-9](?:[a-z0-9-]{0,62})$")
+PATH_PREFIX = "/t/"
+# Tree behind ``ls``/``cat``/``grep`` for tenants without a
+# ``<tenant>.filesystem.json``.
+EMPTY_FILESYSTEM = FileSystem({"type": "dir", "children": {}})
+
+
+@dataclass
+class _Entry:
+    store: ResumeStore
+    filesystem: FileSystem
+    size: int
+    checked: float
+
+
+class TenantStores:
+    """Lazily loaded, LRU-bounded ``ResumeStore`` per tenant.
+
+    ``directory/<tenant>.json`` is loaded on first use.  Residency is bounded
+    by count and by the combined file size, and instead of a watcher per
+    tenant a store re-checks its file when used after ``reload_interval``.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        default: ResumeStore,
+        *,
+        max_tenants: int = 128,
+        max_bytes: int = 64 * 1024 * 1024,
+        reload_interval: float = 2.0,
+        last_updated: Callable[[Path, str], str] | None = None,
+        on_load: Callable[[ResumeSnapshot], None] | None = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.default = default
+        self.max_tenants = max_tenants
+        self.max_bytes = max_bytes
+        self.reload_interval = reload_interval
+        self.last_updated = last_updated
+        self.on_load = on_load
+        self.stores: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.resident_bytes = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def path_for(self, tenant: str) -> Path | None:
+        """JSON file of ``tenant``; ``None`` for names that are not allowed."""
+
+        if not TENANT_RE.match(tenant):
+            return None
+        return self.directory / f"{tenant}.json"
+
+    async def _cached(self, tenant: str) -> ResumeStore | None:
+        entry = self.stores.get(tenant)
+        if entry is None:
+            return None
+        self.stores.move_to_end(tenant)
+        now = time.monotonic()
+        if self.reload_interval > 0 and now - entry.checked >= self.reload_interval:
+            # Marked first so concurrent requests keep the current snapshot
+            # instead of starting more reloads.
+            entry.checked = now
+            await asyncio.to_thread(entry.store.reload)
+        return entry.store
+
+    def _load(self, tenant: str, path: Path) -> Tuple[ResumeStore, FileSystem, int] | None:
+        if not path.is_file():
+            return None
+        try:
+            size = path.stat().st_size
+            store = ResumeStore(
+                path, last_updated=self.last_updated, name=tenant, on_load=self.on_load
+            )
+        except (OSError, ValueError) as exc:
+            logger.warning("Cannot load resume for tenant %s: %s", tenant, exc)
+            return None
+        fs_path = path.with_name(f"{tenant}.filesystem.json")
+        if not fs_path.is_file():
+            return store, EMPTY_FILESYSTEM, size
+        try:
+            return store, FileSystem.load(fs_path), size + fs_path.stat().st_size
+        except (OSError, ValueError) as exc:
+            logger.warning("Cannot load filesystem for tenant %s: %s", tenant, exc)
+            return store, EMPTY_FILESYSTEM, size
+
+    def _insert(
+        self, tenant: str, store: ResumeStore, filesystem: FileSystem, size: int
+    ) -> ResumeStore:
+        if tenant in self.stores:  # loaded concurrently; keep the first
+            return self.stores[tenant].store
+        self.stores[tenant] = _Entry(store, filesystem, size, time.monotonic())
+        self.resident_bytes += size
+        self.loads += 1
+        while len(self.stores) > 1 and (
+            len(self.stores) > self.max_tenants or self.resident_bytes > self.max_bytes
+        ):
+            _, evicted = self.stores.popitem(last=False)
+            self.resident_bytes -= evicted.size
+            self.evictions += 1
+        return store
+
+    async def get(self, tenant: str) -> ResumeStore | None:
+        """Return the store for ``tenant``, loading it off the event loop.
+
+        ``None`` when the tenant has no resume.
+        """
+
+        if tenant == DEFAULT_TENANT:
+            return self.default
+        store = await self._cached(tenant)
+        if store is not None:
+            return store
+        path = self.path_for(tenant)
+        if path is None:
+            return None
+        loaded = await asyncio.to_thread(self._load, tenant, path)
+        if loaded is None:
+            return None
+        return self._insert(tenant, *loaded)
+
+    def filesystem(self, tenant: str) -> FileSystem:
+        """The loaded ``<tenant>.filesystem.json`` tree, else an empty one.
+
+        Never the default tree: another owner's files must not show up on a
+        tenant's terminal.
+        """
+
+        entry = self.stores.get(tenant)
+        return entry.filesystem if entry is not None else EMPTY_FILESYSTEM
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "resident": len(self.stores),
+            "resident_bytes": self.resident_bytes,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
+
+
+class TenantMiddleware:
+    """Put the request's tenant in ``scope["state"]["tenant"]``.
+
+    ``mode="host"`` takes the tenant from the host name with ``host_suffix``
+    removed; ``mode="path"`` takes it from a ``/t/<tenant>`` prefix, which
+    becomes the ``root_path`` so the app's routes match unchanged.
+    """
+
+    def __init__(self, app: ASGIApp, *, mode: str, host_suffix: str = "") -> None:
+        self.app = app
+        self.mode = mode
+        self.host_suffix = host_suffix.lower()
+
+    def _from_host(self, scope: Scope) -> str:
+        for name, value in scope.get("headers", ()):
+            if name == b"host":
+                host = value.decode("latin-1").split(":", 1)[0].lower()
+                if self.host_suffix and host.endswith(self.host_suffix):
+                    return host[: -len(self.host_suffix)] or DEFAULT_TENANT
+                return DEFAULT_TENANT
+        return DEFAULT_TENANT
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        tenant = DEFAULT_TENANT
+        if self.mode == "host":
+            tenant = self._from_host(scope)
+        elif self.mode == "path":
+            root = scope.get("root_path", "")
+            path = scope["path"][len(root) :] if scope["path"].startswith(root) else scope["path"]
+            if path.startswith(PATH_PREFIX):
+                name = path[len(PATH_PREFIX) :].split("/", 1)[0]
+                # Names that are not valid tenants fall through to a 404.
+                if TENANT_RE.match(name):
+                    tenant = name
+                    scope = dict(scope, root_path=root + PATH_PREFIX + name)
+        state: Dict[str, Any] = dict(scope.get("state") or {})
+        state["tenant"] = tenant
+        scope = dict(scope, state=state)
+        await self.app(scope, receive, send)
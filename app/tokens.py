@@ -0,0 +1,108 @@
+"""Stateless, signed session tokens for ``SESSION_MODE=token``."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import secrets
+import time
+import zlib
+from typing import Any, Dict
+
+try:
+    from .sessions import TIMESTAMP_FIELD
+except ImportError:  # pragma: no cover - fallback for script execution
+    from sessions import TIMESTAMP_FIELD
+
+PREFIX = "t."
+# Bytes of the HMAC kept in the token; 128 bits is plenty against forgery.
+SIGNATURE_BYTES = 16
+# Refuse to inflate payloads beyond this, whatever the signature says.
+MAX_STATE_BYTES = 64 * 1024
+# Session nonce added to token states by ``encode``.
+NONCE_FIELD = "_n"
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class SessionTokens:
+    """Encode session state into signed tokens and back.
+
+    A token is the state as compact JSON, zlib-compressed, base64url-encoded
+    and signed with HMAC-SHA256 over the ``scope`` (the tenant) and payload::
+
+        t.<payload>.<signature>
+
+    States that would exceed ``max_bytes`` are not encoded; the caller keeps
+    them server-side.  Tokens expire ``ttl`` seconds after the state's
+    ``_ts``.  ``NONCE_FIELD`` stays the same for the life of the session, so
+    per-session rate limits can key on it while the token changes.
+    """
+
+    def __init__(self, secret: bytes, *, ttl: int, max_bytes: int = 1024) -> None:
+        self.secret = secret
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def is_token(session_id: str) -> bool:
+        return session_id.startswith(PREFIX)
+
+    def _sign(self, payload: str, scope: str = "") -> str:
+        message = f"{scope}:{payload}" if scope else payload
+        digest = hmac.new(self.secret, message.encode("ascii"), hashlib.sha256).digest()
+        return _b64encode(digest[:SIGNATURE_BYTES])
+
+    def encode(self, state: Dict[str, Any], scope: str = "") -> str | None:
+        """Return the token for ``state``; ``None`` if it exceeds ``max_bytes``.
+
+        A state without a session nonce gets one.
+        """
+
+        state.setdefault(NONCE_FIELD, secrets.token_urlsafe(9))
+        raw = json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        payload = _b64encode(zlib.compress(raw, 9))
+        token = f"{PREFIX}{payload}.{self._sign(payload, scope)}"
+        return token if len(token) <= self.max_bytes else None
+
+    def decode(
+        self, token: str, now: float | None = None, scope: str = ""
+    ) -> Dict[str, Any] | None:
+        """Return the state in ``token``; ``None`` if forged, corrupt or expired."""
+
+        if not self.is_token(token):
+            return None
+        payload, _, signature = token[len(PREFIX) :].partition(".")
+        if not token.isascii() or not hmac.compare_digest(signature, self._sign(payload, scope)):
+            return None
+        try:
+            inflater = zlib.decompressobj()
+            raw = inflater.decompress(_b64decode(payload), MAX_STATE_BYTES)
+            if inflater.unconsumed_tail:
+                return None
+            state = json.loads(raw)
+        except (binascii.Error, zlib.error, ValueError):
+            return None
+        if not isinstance(state, dict):
+            return None
+        now = now or time.time()
+        if now - state.get(TIMESTAMP_FIELD, 0) >= self.ttl:
+            return None
+        return state
+
+    def session_key(self, token: str, scope: str = "") -> str | None:
+        """Stable identifier of ``token``'s session; ``None`` for invalid tokens."""
+
+        state = self.decode(token, scope=scope)
+        if state is None:
+            return None
+        return f"{PREFIX}{state.get(NONCE_FIELD) or token}"
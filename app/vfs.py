@@ -0,0 +1,197 @@
+"""Read-only virtual filesystem backed by ``app/filesystem.json``."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+ROOT = "/"
+GLOB_CHARS = frozenset("*?[")
+
+
+@dataclass(frozen=True)
+class Node:
+    """One file or directory."""
+
+    path: str
+    name: str
+    parent: str | None
+    is_dir: bool
+    content: str = ""
+    # Child names, sorted; empty for files.
+    children: Tuple[str, ...] = ()
+
+
+def join(parent: str, name: str) -> str:
+    return parent + name if parent == ROOT else f"{parent}/{name}"
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class FileSystem:
+    """Flat, indexed view of a nested ``children``/``content`` tree.
+
+    Resolving a path is one dictionary lookup per component, globs only
+    expand against the children reached so far, ``find`` reads the files
+    precomputed per directory and ``grep`` narrows candidates with a trigram
+    index before scanning lines.  The tree is immutable, so sessions only
+    keep their ``cwd``.
+    """
+
+    def __init__(self, tree: Dict[str, Any]) -> None:
+        self.nodes: Dict[str, Node] = {}
+        self._add(tree, ROOT, "", None)
+        # Every file path in depth-first, name-sorted order for ``find``.
+        self.files: Tuple[str, ...] = tuple(
+            sorted(path for path, node in self.nodes.items() if not node.is_dir)
+        )
+        # Directory -> every file below it, in ``files`` order, for ``find``.
+        below: Dict[str, List[str]] = {path: [] for path, node in self.nodes.items() if node.is_dir}
+        for path in self.files:
+            parent = self.nodes[path].parent
+            while parent is not None:
+                below[parent].append(path)
+                parent = self.nodes[parent].parent
+        self.descendants: Dict[str, Tuple[str, ...]] = {k: tuple(v) for k, v in below.items()}
+        # Lowercased lines per file and trigram -> files for ``grep``.
+        self.lines: Dict[str, Tuple[str, ...]] = {}
+        self.lowered: Dict[str, Tuple[str, ...]] = {}
+        self.trigram_index: Dict[str, Set[str]] = {}
+        for path in self.files:
+            content = self.nodes[path].content
+            self.lines[path] = tuple(content.splitlines())
+            self.lowered[path] = tuple(line.lower() for line in self.lines[path])
+            for gram in trigrams(content.lower()):
+                self.trigram_index.setdefault(gram, set()).add(path)
+        self.tree = lru_cache(maxsize=64)(self._tree)
+
+    @classmethod
+    def load(cls, path: Path) -> "FileSystem":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def _add(self, raw: Dict[str, Any], path: str, name: str, parent: str | None) -> None:
+        children = raw.get("children")
+        is_dir = raw.get("type") == "dir" or children is not None
+        names = tuple(sorted(children or {})) if is_dir else ()
+        self.nodes[path] = Node(path, name, parent, is_dir, str(raw.get("content", "")), names)
+        for child in names:
+            self._add(children[child], join(path, child), child, path)
+
+    # -- path resolution -------------------------------------------------
+
+    def resolve(self, cwd: str, path: str) -> str | None:
+        """Return the absolute path of ``path`` relative to ``cwd``.
+
+        ``None`` when any component does not exist or a file is used as a
+        directory.
+        """
+
+        current = ROOT if path.startswith("/") else cwd
+        if current not in self.nodes:
+            current = ROOT
+        for part in path.split("/"):
+            if part in ("", "."):
+                continue
+            node = self.nodes[current]
+            if part == "..":
+                current = node.parent or ROOT
+                continue
+            if not node.is_dir:
+                return None
+            current = join(current, part)
+            if current not in self.nodes:
+                return None
+        return current
+
+    def expand(self, cwd: str, pattern: str) -> List[str]:
+        """Resolve ``pattern``, expanding glob components; sorted matches."""
+
+        if not GLOB_CHARS.intersection(pattern):
+            found = self.resolve(cwd, pattern)
+            return [found] if found else []
+        current = [ROOT if pattern.startswith("/") else (cwd if cwd in self.nodes else ROOT)]
+        for part in pattern.split("/"):
+            if part in ("", "."):
+                continue
+            nxt: List[str] = []
+            for path in current:
+                node = self.nodes[path]
+                if part == "..":
+                    nxt.append(node.parent or ROOT)
+                elif not node.is_dir:
+                    continue
+                elif GLOB_CHARS.intersection(part):
+                    nxt.extend(
+                        join(path, name)
+                        for name in node.children
+                        if fnmatchcase(name, part) and (part.startswith(".") or not name.startswith("."))
+                    )
+                elif join(path, part) in self.nodes:
+                    nxt.append(join(path, part))
+            current = list(dict.fromkeys(nxt))
+            if not current:
+                break
+        return sorted(current)
+
+    # -- commands --------------------------------------------------------
+
+    def listing(self, path: str) -> List[str]:
+        """Names in directory ``path`` with ``/`` after subdirectories."""
+
+        node = self.nodes[path]
+        if not node.is_dir:
+            return [node.name]
+        return [
+            name + "/" if self.nodes[join(path, name)].is_dir else name for name in node.children
+        ]
+
+    def _tree(self, path: str) -> str:
+        lines = [path]
+
+        def walk(dir_path: str, prefix: str) -> None:
+            names = self.nodes[dir_path].children
+            for i, name in enumerate(names):
+                last = i == len(names) - 1
+                child = self.nodes[join(dir_path, name)]
+                lines.append(f"{prefix}{'└── ' if last else '├── '}{name}{'/' if child.is_dir else ''}")
+                if child.is_dir:
+                    walk(child.path, prefix + ("    " if last else "│   "))
+
+        if self.nodes[path].is_dir:
+            walk(path, "")
+        return "\n".join(lines)
+
+    def find(self, start: str, pattern: str | None = None) -> List[str]:
+        """Files under ``start`` whose name matches ``pattern`` (glob or substring)."""
+
+        matches = self.descendants.get(start) or ((start,) if start in self.lines else ())
+        if not pattern:
+            return list(matches)
+        pattern = pattern.lower()
+        if not GLOB_CHARS.intersection(pattern):
+            return [p for p in matches if pattern in self.nodes[p].name.lower()]
+        return [p for p in matches if fnmatchcase(self.nodes[p].name.lower(), pattern)]
+
+    def grep(self, text: str, paths: Iterable[str]) -> List[Tuple[str, int, str]]:
+        """Case-insensitive substring search; ``(path, line number, line)``."""
+
+        needle = text.lower()
+        files: Set[str] = set()
+        for path in paths:
+            files.update(self.find(path) if self.nodes[path].is_dir else [path])
+        for gram in trigrams(needle):
+            files &= self.trigram_index.get(gram, set())
+            if not files:
+                return []
+        return [
+            (path, number, self.lines[path][number - 1])
+            for path in sorted(files)
+            for number, line in enumerate(self.lowered[path], 1)
+            if needle in line
+        ]
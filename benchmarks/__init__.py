@@ -0,0 +1,4 @@
+"""Performance benchmarks for the resume backend.
+
+Each module can be run directly, e.g. ``python -m benchmarks.startup``.
+"""
@@ -0,0 +1,131 @@
+"""Per-command dispatch microbenchmark.
+
+Runs every terminal command through ``handle_command`` and reports the mean
+time per call, plus the cost of the parsing/dispatch layer on its own::
+
+    python -m benchmarks.dispatch
+    python -m benchmarks.dispatch --iterations 20000 --json out.json
+
+The "legacy" column re-creates the old if-chain front end (``shlex.split``,
+``args_lower``, a linear walk over the command names and one ``list.index``
+scan per flag) so the two dispatch strategies can be compared side by side
+on the same machine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shlex
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.main import handle_command  # noqa: E402
+
+# One representative invocation per command, in the order of the old chain.
+COMMANDS: List[str] = [
+    "help",
+    "help open",
+    "open experience --expand --page 2",
+    "show 6",
+    "6",
+    "next",
+    "prev",
+    "search azure --in projects",
+    "filter skills level=expert",
+    "timeline --section projects",
+    "certifications --expand --page 2",
+    "skills --level expert --tag cloud,security",
+    "contact",
+    "copy email",
+    "share",
+    "download --filename cv.txt",
+    "versions --list",
+    "tags --add 1 favourite",
+    "notes --show 1",
+    "print --detailed",
+    "theme dark",
+    "about",
+    "clear",
+    "quit",
+    "bogus",
+]
+
+_LEGACY_CHAIN = [
+    "help", "open", "show", "next", "prev", "back", "search", "filter",
+    "timeline", "certifications", "skills", "contact", "copy", "share",
+    "download", "versions", "tags", "notes", "print", "theme", "about",
+    "clear", "quit",
+]
+_LEGACY_FLAGS = ["--expand", "--page", "--in", "--section", "--level", "--tag",
+                 "--filename", "--list", "--diff", "--add", "--remove", "--show"]
+
+
+def legacy_front_end(cmd: str) -> str:
+    """Parse ``cmd`` the way the original if-chain did and return its name."""
+
+    parts = shlex.split(cmd)
+    command = parts[0].lower()
+    args_lower = [a.lower() for a in parts[1:]]
+    for name in _LEGACY_CHAIN:
+        if command == name:
+            break
+    for flag in _LEGACY_FLAGS:
+        if flag in args_lower:
+            args_lower.index(flag)
+    return command
+
+
+def _time(fn: Callable[[], object], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def run(iterations: int) -> Dict[str, Dict[str, float]]:
+    """Return per-command timings in microseconds."""
+
+    try:
+        from app.main import COMMANDS as registry
+    except ImportError:  # measuring a tree without the registry
+        registry = None
+
+    results: Dict[str, Dict[str, float]] = {}
+    for cmd in COMMANDS:
+        state: Dict[str, object] = {}
+        handle_command(state, "open experience")
+        row = {
+            "handle_command_us": _time(lambda: handle_command(dict(state), cmd), iterations),
+            "legacy_front_end_us": _time(lambda: legacy_front_end(cmd), iterations),
+        }
+        if registry is not None:
+            row["registry_front_end_us"] = _time(lambda: registry.parse(cmd), iterations)
+        results[cmd] = row
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--json", type=Path, help="also write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+    columns = sorted({k for row in results.values() for k in row})
+    print(f"{'command':<44}" + "".join(f"{c:>24}" for c in columns))
+    for cmd, row in results.items():
+        print(f"{cmd:<44}" + "".join(f"{row.get(c, float('nan')):>24.2f}" for c in columns))
+    totals = {c: sum(row.get(c, 0.0) for row in results.values()) for c in columns}
+    print(f"{'TOTAL':<44}" + "".join(f"{totals[c]:>24.2f}" for c in columns))
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
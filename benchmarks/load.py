@@ -0,0 +1,288 @@
+"""Load-testing suite for the start, command, search and resume endpoints.
+
+Replays real visitor flows against the app and records throughput and
+latency percentiles per scenario::
+
+    python -m benchmarks.load                       # in-process + uvicorn, memory sessions
+    python -m benchmarks.load --backend memory --backend redis-hash
+    python -m benchmarks.load --out before.json
+    python -m benchmarks.load --out after.json --compare before.json
+
+Two transports are measured:
+
+``inprocess``
+    requests go straight into the ASGI ``app`` through
+    ``httpx.ASGITransport``, isolating application cost;
+``uvicorn``
+    a real ``uvicorn`` server is started on a local port, adding HTTP
+    parsing and socket overhead.
+
+Session backends are chosen from the environment at import time, so every
+(transport, backend) pair runs against a fresh process.  Redis backends use
+``BENCH_REDIS_URL`` (default ``redis://localhost:6379/15``, flushed before
+each run) and are skipped when no server answers.
+
+The JSON written with ``--out`` records the git commit so results from
+different commits can be compared with ``--compare``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.common import summarize
+
+ROOT = Path(__file__).resolve().parents[1]
+REDIS_URL = os.getenv("BENCH_REDIS_URL", "redis://localhost:6379/15")
+
+BACKENDS: Dict[str, Dict[str, str]] = {
+    "memory": {},
+    "token": {"SESSION_MODE": "token", "SESSION_TOKEN_SECRET": "bench"},
+    "redis-json": {"SESSION_REDIS_URL": REDIS_URL, "SESSION_BACKEND": "json"},
+    "redis-hash": {"SESSION_REDIS_URL": REDIS_URL, "SESSION_BACKEND": "hash"},
+    "redis-async-hash": {
+        "SESSION_REDIS_URL": REDIS_URL,
+        "SESSION_BACKEND": "hash",
+        "SESSION_REDIS_ASYNC": "1",
+    },
+}
+
+# Each step is (method, target): "GET" fetches a path, "CMD" posts a
+# terminal command for the scenario's session.
+Step = Tuple[str, str]
+SCENARIOS: Dict[str, List[Step]] = {
+    "browse": [
+        ("GET", "/api/start"),
+        ("CMD", "open experience"),
+        ("CMD", "next"),
+        ("CMD", "show 2"),
+        ("CMD", "search azure"),
+    ],
+    "secret-game": [
+        ("GET", "/api/start"),
+        ("CMD", "open secret"),
+        ("CMD", "look printer"),
+        ("CMD", "attack printer"),
+        ("CMD", "attack server"),
+        ("CMD", "attack mdf"),
+        ("CMD", "eq"),
+        ("CMD", "exit"),
+    ],
+    "search": [
+        ("GET", "/api/start"),
+        ("CMD", "search azure"),
+        ("CMD", "search kube --in skills"),
+        ("CMD", "search network security"),
+    ],
+    "resume": [("GET", "/api/resume")],
+}
+
+# Settings that keep background work, pacing and admission control (every
+# virtual user shares one IP) out of the measurements.
+BASE_ENV = {"RESUME_RELOAD_INTERVAL": "0", "WS_LINE_DELAY": "0", "RATE_LIMIT": "0"}
+
+
+async def _run_flow(client: Any, steps: List[Step], latencies: List[float], errors: List[int]) -> None:
+    session_id = None
+    for method, target in steps:
+        t0 = time.perf_counter()
+        if method == "GET":
+            resp = await client.get(target)
+        else:
+            resp = await client.post(
+                "/api/command", json={"session_id": session_id, "command": target}
+            )
+        latencies.append((time.perf_counter() - t0) * 1000)
+        failed = resp.status_code >= 400
+        if method == "CMD" and not failed:
+            body = resp.json()
+            failed = body.get("text") == "Invalid session."
+            # Token sessions hand back a new id whenever the state changes.
+            session_id = body.get("session_id", session_id)
+        if failed:
+            errors.append(resp.status_code)
+        if target == "/api/start":
+            session_id = resp.json()["session_id"]
+
+
+async def drive(client: Any, concurrency: int, iterations: int) -> Dict[str, Dict[str, float]]:
+    """Run every scenario with ``concurrency`` virtual users."""
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, steps in SCENARIOS.items():
+        latencies: List[float] = []
+        errors: List[int] = []
+
+        async def user() -> None:
+            for _ in range(iterations):
+                await _run_flow(client, steps, latencies, errors)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        results[name] = {**summarize(latencies, time.perf_counter() - t0), "errors": len(errors)}
+    return results
+
+
+async def _inprocess(concurrency: int, iterations: int) -> Dict[str, Dict[str, float]]:
+    import httpx
+
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return await drive(client, concurrency, iterations)
+
+
+async def _over_http(base_url: str, concurrency: int, iterations: int) -> Dict[str, Dict[str, float]]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        return await drive(client, concurrency, iterations)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_uvicorn(env: Dict[str, str], concurrency: int, iterations: int) -> Dict[str, Dict[str, float]]:
+    """Start a uvicorn server with ``env`` and drive it over HTTP."""
+
+    import httpx
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(base_url + "/api/stats", timeout=1)
+                break
+            except httpx.TransportError:
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn failed to start")
+                time.sleep(0.1)
+        return asyncio.run(_over_http(base_url, concurrency, iterations))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def run_inprocess(env: Dict[str, str], concurrency: int, iterations: int) -> Dict[str, Dict[str, float]]:
+    """Drive the ASGI app in a child process configured by ``env``."""
+
+    out = subprocess.check_output(
+        [
+            sys.executable, "-m", "benchmarks.load", "--worker",
+            "--concurrency", str(concurrency), "--iterations", str(iterations),
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+def redis_available() -> bool:
+    import redis
+
+    try:
+        redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5).flushdb()
+    except redis.RedisError:
+        return False
+    return True
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.decode().strip()
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print p99 and RPS changes of ``current`` relative to ``baseline``."""
+
+    print(f"\ncompared with {baseline.get('commit') or 'baseline'}:")
+    for run, scenarios in current["results"].items():
+        for name, r in scenarios.items():
+            base = baseline.get("results", {}).get(run, {}).get(name)
+            if not base:
+                continue
+            rps = (r["rps"] / base["rps"] - 1) * 100 if base["rps"] else 0.0
+            p99 = (r["p99_ms"] / base["p99_ms"] - 1) * 100 if base["p99_ms"] else 0.0
+            print(f"  {run:<28} {name:<12} rps {rps:+6.1f}%  p99 {p99:+6.1f}%")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", action="append", choices=sorted(BACKENDS))
+    parser.add_argument("--transport", action="append", choices=["inprocess", "uvicorn"])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=20, help="flows per virtual user")
+    parser.add_argument("--out", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--compare", type=Path, help="earlier --out file to diff against")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(_inprocess(args.concurrency, args.iterations))))
+        return 0
+
+    backends = args.backend or ["memory", "redis-hash"]
+    transports = args.transport or ["inprocess", "uvicorn"]
+    results: Dict[str, Any] = {}
+    skipped: List[str] = []
+    for backend in backends:
+        if backend.startswith("redis") and not redis_available():
+            skipped.append(backend)
+            continue
+        env = dict(os.environ, **BASE_ENV, **BACKENDS[backend])
+        for transport in transports:
+            if backend.startswith("redis"):
+                redis_available()  # flush between runs
+            runner = run_inprocess if transport == "inprocess" else run_uvicorn
+            run = f"{transport}/{backend}"
+            results[run] = runner(env, args.concurrency, args.iterations)
+            for name, r in results[run].items():
+                print(
+                    f"{run:<28} {name:<12} rps={r['rps']:8.0f}  p50={r['p50_ms']:7.2f}ms  "
+                    f"p95={r['p95_ms']:7.2f}ms  p99={r['p99_ms']:7.2f}ms  errors={r['errors']}"
+                )
+    if skipped:
+        print(f"skipped (redis-server not reachable at {REDIS_URL}): {', '.join(skipped)}", file=sys.stderr)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "concurrency": args.concurrency,
+        "iterations": args.iterations,
+        "results": results,
+    }
+    args.out.write_text(json.dumps(report, indent=2))
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text()))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
@@ -0,0 +1,133 @@
+"""Latency of ``/api/command`` under concurrency with sync vs async Redis.
+
+Requires a local ``redis-server``; the database given by ``BENCH_REDIS_URL``
+(default ``redis://localhost:6379/15``) is flushed before each run::
+
+    redis-server --save '' --port 6379 &
+    python -m benchmarks.redis_latency --concurrency 64 --requests 4000
+
+Every backend runs in its own interpreter because the session store is
+chosen from the environment when ``app.main`` is imported.  Requests are
+driven in-process through ``httpx.ASGITransport``, so the numbers isolate
+the cost of the session store from network and server overhead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.common import summarize
+
+ROOT = Path(__file__).resolve().parents[1]
+REDIS_URL = os.getenv("BENCH_REDIS_URL", "redis://localhost:6379/15")
+
+CONFIGS: Dict[str, Dict[str, str]] = {
+    "sync-json": {"SESSION_BACKEND": "json", "SESSION_REDIS_ASYNC": "0"},
+    "sync-hash": {"SESSION_BACKEND": "hash", "SESSION_REDIS_ASYNC": "0"},
+    "async-json": {"SESSION_BACKEND": "json", "SESSION_REDIS_ASYNC": "1"},
+    "async-hash": {"SESSION_BACKEND": "hash", "SESSION_REDIS_ASYNC": "1"},
+}
+
+COMMANDS = ["open experience", "next", "show 6", "help", "search azure", "contact"]
+
+
+async def _drive(concurrency: int, requests: int) -> Dict[str, float]:
+    import httpx
+
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        session_ids = [
+            (await client.get("/api/start")).json()["session_id"] for _ in range(concurrency)
+        ]
+        latencies: List[float] = []
+        per_worker = requests // concurrency
+
+        async def worker(sid: str) -> None:
+            for i in range(per_worker):
+                body = {"session_id": sid, "command": COMMANDS[i % len(COMMANDS)]}
+                t0 = time.perf_counter()
+                resp = await client.post("/api/command", json=body)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                resp.raise_for_status()
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(sid) for sid in session_ids))
+        elapsed = time.perf_counter() - t0
+
+    return summarize(latencies, elapsed)
+
+
+def run_worker(concurrency: int, requests: int) -> None:
+    """Entry point of the per-backend child process."""
+
+    result = asyncio.run(_drive(concurrency, requests))
+    print(json.dumps(result))
+
+
+def redis_available() -> bool:
+    import redis
+
+    try:
+        client = redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5)
+        client.flushdb()
+    except redis.RedisError:
+        return False
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.concurrency, args.requests)
+        return 0
+
+    if not redis_available():
+        print(f"redis-server not reachable at {REDIS_URL}", file=sys.stderr)
+        return 2
+
+    results = {}
+    for name, overrides in CONFIGS.items():
+        redis_available()  # flush between runs
+        env = dict(
+            os.environ,
+            SESSION_REDIS_URL=REDIS_URL,
+            RESUME_RELOAD_INTERVAL="0",
+            RATE_LIMIT="0",
+            **overrides,
+        )
+        out = subprocess.check_output(
+            [
+                sys.executable, "-m", "benchmarks.redis_latency", "--worker",
+                "--concurrency", str(args.concurrency),
+                "--requests", str(args.requests),
+            ],
+            cwd=ROOT,
+            env=env,
+        )
+        results[name] = json.loads(out.decode().strip().splitlines()[-1])
+        r = results[name]
+        print(
+            f"{name:<11} rps={r['rps']:8.0f}  p50={r['p50_ms']:6.2f}ms  "
+            f"p95={r['p95_ms']:6.2f}ms  p99={r['p99_ms']:6.2f}ms"
+        )
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
@@ -0,0 +1,161 @@
+"""Throughput cost of versioned (compare-and-set) session writes.
+
+Concurrent clients add notes through ``/api/command``, either all to one
+session (``contended``) or each to its own (``spread``).  Every run is
+repeated with the unversioned load/apply/save the routes used before, so the
+report shows what the protection costs and what it prevents::
+
+    python -m benchmarks.session_cas --concurrency 32 --requests 2000
+
+The memory store always runs; the Redis stores run when ``BENCH_REDIS_URL``
+(default ``redis://localhost:6379/15``, flushed) is reachable.  As in
+``benchmarks.redis_latency`` every store runs in its own interpreter and
+requests go in-process through ``httpx.ASGITransport``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.common import summarize
+from benchmarks.redis_latency import REDIS_URL, redis_available
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CONFIGS: Dict[str, Dict[str, str]] = {
+    "memory": {},
+    "redis-json": {"SESSION_BACKEND": "json", "SESSION_REDIS_ASYNC": "0"},
+    "redis-hash": {"SESSION_BACKEND": "hash", "SESSION_REDIS_ASYNC": "0"},
+    "redis-async-hash": {"SESSION_BACKEND": "hash", "SESSION_REDIS_ASYNC": "1"},
+}
+
+
+def _unversioned(main: Any) -> Any:
+    """The routes' session handling before compare-and-set: last writer wins."""
+
+    async def update_session(session_id, tenant, apply):
+        state = await main.load_session(session_id, tenant)
+        if state is None:
+            return None
+        result = apply(state)
+        return result, await main.save_session(session_id, state, tenant)
+
+    return update_session
+
+
+async def _drive(concurrency: int, requests: int, contended: bool) -> Dict[str, float]:
+    import httpx
+
+    from app import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        count = 1 if contended else concurrency
+        session_ids = [(await client.get("/api/start")).json()["session_id"] for _ in range(count)]
+        latencies: List[float] = []
+        added: Dict[str, int] = {sid: 0 for sid in session_ids}
+        rejected = 0
+        per_worker = requests // concurrency
+
+        async def worker(w: int) -> None:
+            nonlocal rejected
+            sid = session_ids[w % count]
+            for i in range(per_worker):
+                body = {"session_id": sid, "command": f"notes --add 1 w{w}-{i}"}
+                t0 = time.perf_counter()
+                resp = await client.post("/api/command", json=body)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                if resp.status_code == 409:
+                    rejected += 1
+                else:
+                    resp.raise_for_status()
+                    added[sid] += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(w) for w in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+
+        lost = 0
+        for sid, expected in added.items():
+            state = await main.load_session(sid)
+            lost += expected - len(state.get("notes", {}).get("1", []))
+
+    conflicts = main.SESSION_CONFLICTS
+    return {
+        **summarize(latencies, elapsed),
+        "lost": lost,
+        "rejected": rejected,
+        "retried": conflicts.labels("retried").value,
+    }
+
+
+def run_worker(concurrency: int, requests: int, contended: bool, versioned: bool) -> None:
+    """Entry point of the per-store child process."""
+
+    from app import main
+
+    if not versioned:
+        main.update_session = _unversioned(main)
+    result = asyncio.run(_drive(concurrency, requests, contended))
+    print(json.dumps(result))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--contended", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--unversioned", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.concurrency, args.requests, args.contended, not args.unversioned)
+        return 0
+
+    have_redis = redis_available()
+    if not have_redis:
+        print(f"redis-server not reachable at {REDIS_URL}; memory store only", file=sys.stderr)
+
+    results: Dict[str, Any] = {}
+    for name, overrides in CONFIGS.items():
+        if name != "memory" and not have_redis:
+            continue
+        env = dict(os.environ, RESUME_RELOAD_INTERVAL="0", RATE_LIMIT="0", **overrides)
+        if name != "memory":
+            env["SESSION_REDIS_URL"] = REDIS_URL
+        for workload in ("contended", "spread"):
+            for mode in ("versioned", "unversioned"):
+                if name != "memory":
+                    redis_available()  # flush between runs
+                cmd = [
+                    sys.executable, "-m", "benchmarks.session_cas", "--worker",
+                    "--concurrency", str(args.concurrency),
+                    "--requests", str(args.requests),
+                ]
+                if workload == "contended":
+                    cmd.append("--contended")
+                if mode == "unversioned":
+                    cmd.append("--unversioned")
+                out = subprocess.check_output(cmd, cwd=ROOT, env=env)
+                r = json.loads(out.decode().strip().splitlines()[-1])
+                results[f"{name}/{workload}/{mode}"] = r
+                print(
+                    f"{name:<16} {workload:<9} {mode:<11} rps={r['rps']:7.0f}  "
+                    f"p95={r['p95_ms']:6.2f}ms  lost={r['lost']:<5} "
+                    f"retried={r['retried']:<5.0f} rejected={r['rejected']}"
+                )
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
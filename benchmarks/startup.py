@@ -0,0 +1,84 @@
+"""Startup-time benchmark with a regression budget.
+
+Measures, in fresh interpreter processes, how long ``import app.main`` takes
+and how long it takes until the first ``/api/start`` response is produced.
+The median of several runs is compared against a budget::
+
+    python -m benchmarks.startup            # exits non-zero when over budget
+    STARTUP_BUDGET_IMPORT_MS=800 python -m benchmarks.startup
+
+``tests/test_startup_budget.py`` runs the same check as part of the suite.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parents[1]
+
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_IMPORT_MS", "1500"))
+FIRST_RESPONSE_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_FIRST_RESPONSE_MS", "2500"))
+
+# Executed in a child process so every run pays the full cold-start cost.
+_PROBE = """
+import json, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(app.main.app)
+assert client.get("/api/start").status_code == 200
+t2 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "first_response_ms": (t2 - t0) * 1000}))
+"""
+
+
+def probe() -> Dict[str, float]:
+    """Run one cold start in a subprocess and return its timings."""
+
+    env = dict(os.environ, RESUME_RELOAD_INTERVAL="0")
+    out = subprocess.check_output([sys.executable, "-c", _PROBE], cwd=ROOT, env=env)
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+
+def measure(runs: int = 5) -> Dict[str, float]:
+    """Return the median timings of ``runs`` cold starts."""
+
+    samples = [probe() for _ in range(runs)]
+    return {
+        key: statistics.median(s[key] for s in samples)
+        for key in ("import_ms", "first_response_ms")
+    }
+
+
+def over_budget(result: Dict[str, float]) -> Dict[str, str]:
+    """Return a description of every metric in ``result`` over its budget."""
+
+    budgets = {
+        "import_ms": IMPORT_BUDGET_MS,
+        "first_response_ms": FIRST_RESPONSE_BUDGET_MS,
+    }
+    return {
+        key: f"{result[key]:.0f} ms > {budget:.0f} ms"
+        for key, budget in budgets.items()
+        if result[key] > budget
+    }
+
+
+def main() -> int:
+    result = measure()
+    print(json.dumps(result, indent=2))
+    failures = over_budget(result)
+    for key, msg in failures.items():
+        print(f"over budget: {key} {msg}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    raise SystemExit(main())
@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+import pytest
+
+# Keep revision history recorded by the suite out of the source tree.
+os.environ.setdefault("REVISIONS_DIR", tempfile.mkdtemp(prefix="revisions-"))
+
+
+@pytest.fixture
+def scripting_redis():
+    """A Redis client that runs Lua: ``fakeredis[lua]``, else ``TEST_REDIS_URL``.
+
+    The test is skipped when neither is available.  A real server's database
+    is flushed before and after the test.
+    """
+
+    try:
+        import fakeredis
+        import lupa  # noqa: F401 - fakeredis needs it for EVALSHA
+    except ImportError:
+        fakeredis = None
+    if fakeredis is not None:
+        yield fakeredis.FakeRedis(decode_responses=True)
+        return
+
+    url = os.getenv("TEST_REDIS_URL")
+    if not url:
+        pytest.skip("needs fakeredis[lua] or TEST_REDIS_URL")
+    import redis
+
+    client = redis.Redis.from_url(url, decode_responses=True)
+    try:
+        client.flushdb()
+    except redis.RedisError as exc:
+        pytest.skip(f"Redis at {url} unavailable: {exc}")
+    yield client
+    client.flushdb()
@@ -0,0 +1,110 @@
+import re
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+
+from app.assets import AssetPipeline
+from app.main import STATIC_DIR, app, sessions
+
+client = TestClient(app)
+
+
+def test_batch_runs_commands_in_order_with_one_session_write(monkeypatch):
+    session_id = client.get("/api/start").json()["session_id"]
+    writes = []
+    original = type(sessions).__setitem__
+    monkeypatch.setattr(
+        type(sessions),
+        "__setitem__",
+        lambda self, k, v: (writes.append(k), original(self, k, v)),
+    )
+
+    resp = client.post(
+        "/api/batch",
+        json={"session_id": session_id, "commands": ["open experience", "next", "show 6"]},
+    )
+
+    results = resp.json()["results"]
+    assert [r["text"].splitlines()[0][:3] for r in results[:2]] == ["[1]", "[6]"]
+    assert results[2]["text"].startswith("Company:")
+    assert writes == [session_id]
+
+
+def test_batch_rejects_oversized_batches():
+    resp = client.post("/api/batch", json={"session_id": "x", "commands": ["help"] * 51})
+    assert resp.status_code == 422
+
+
+def test_websocket_streams_lines_then_result(monkeypatch):
+    monkeypatch.setattr("app.main.WS_LINE_DELAY", 0)
+    session_id = client.get("/api/start").json()["session_id"]
+
+    with client.websocket_connect(f"/ws/terminal?session_id={session_id}") as ws:
+        ws.send_json({"command": "open experience"})
+        assert ws.receive_json()["text"].startswith("[1]")
+
+        ws.send_json({"command": "open secret"})
+        ws.receive_json()
+        ws.send_json({"command": "attack printer"})
+        messages = []
+        while not messages or messages[-1]["type"] != "result":
+            messages.append(ws.receive_json())
+
+    assert len(messages) > 2
+    assert {m["type"] for m in messages[:-1]} == {"line"}
+    assert messages[-1]["streamed"] is True
+    assert sessions.get(session_id)["secret"]["enemy_hp"]["printer"] < 15
+
+
+def test_resume_is_served_precompressed_with_etag_revalidation():
+    plain = client.get("/api/resume", headers={"Accept-Encoding": "identity"})
+    assert plain.headers.get("content-encoding") is None
+    assert plain.json()["overview"]["name"]
+
+    gz = client.get("/api/resume", headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["content-encoding"] == "gzip"
+    assert gz.json() == plain.json()
+
+    cached = client.get(
+        "/api/resume",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]},
+    )
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_html_references_fingerprinted_immutable_assets():
+    page = client.get("/")
+    assert page.headers["etag"]
+    match = re.search(r'/static/(style\.[0-9a-f]{10}\.css)', page.text)
+    assert match
+
+    asset = client.get(f"/static/{match.group(1)}", headers={"Accept-Encoding": "gzip"})
+    assert asset.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert asset.headers["content-encoding"] == "gzip"
+    assert "body" in asset.text
+
+    # Unfingerprinted names keep working for old links.
+    assert client.get("/static/style.css").status_code == 200
+
+
+def test_assets_are_prepared_once_on_first_use_not_at_construction(tmp_path, monkeypatch):
+    pipeline = AssetPipeline(STATIC_DIR, tmp_path / "build")
+    assert not (tmp_path / "build").exists()
+
+    builds = []
+    original = AssetPipeline.build
+    monkeypatch.setattr(AssetPipeline, "build", lambda self, s=None: (builds.append(1), original(self, s)))
+    threads = [threading.Thread(target=pipeline.page, args=("index.html", {})) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert builds == [1]
+    assert (tmp_path / "build" / "manifest.json").exists()
+    assert pipeline.assets["style.css"] in pipeline.page("index.html", {}).body.decode()
@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.commands import CommandRegistry
+
+
+def test_registry_parses_flags_in_one_pass_and_caches():
+    registry = CommandRegistry()
+
+    @registry.register("open", flags={"--expand": 0, "--page": 1}, min_args=1)
+    def _open(inv):
+        return {"text": f"{inv.arg(0)} {inv.has('--expand')} {inv.flag('--page')}"}
+
+    parsed = registry.parse("OPEN --Page 2 Projects --expand")
+    assert parsed.name == "open"
+    assert parsed.positional == ("Projects",)
+    assert dict(parsed.flags) == {"--page": ("2",), "--expand": ()}
+    assert registry.parse("OPEN --Page 2 Projects --expand") is parsed
+
+    assert registry.dispatch({}, "open projects --page 3", None) == {"text": "projects False 3"}
+    assert registry.dispatch({}, "open", None) is None  # below min_args
+    assert registry.dispatch({}, "missing", None) is None
+    assert registry.parse("open 'unbalanced") is None
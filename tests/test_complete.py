@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.complete import Trie
+
+
+def test_trie_returns_sorted_completions_case_insensitively():
+    trie = Trie(["Azure", "'Active Directory'", "Autopilot", "Bash"], limit=2)
+    assert trie.complete("a") == ["'Active Directory'", "Autopilot"]
+    assert trie.complete("AZ") == ["Azure"]
+    assert trie.complete("'act") == ["'Active Directory'"]
+    assert trie.complete("z") == []
+
+
+def test_complete_endpoint_covers_commands_flags_sections_ids_and_values():
+    client = TestClient(main.app)
+    session_id = client.get("/api/start").json()["session_id"]
+    client.post("/api/command", json={"session_id": session_id, "command": "open projects"})
+
+    def complete(line):
+        return client.get("/api/complete", params={"line": line, "session_id": session_id}).json()
+
+    assert complete("op")["completions"] == ["open"]
+    assert complete("open cert")["completions"] == ["certifications"]
+    assert "meta" not in complete("open ")["completions"]
+    assert complete("open projects --e")["completions"] == ["--expand"]
+    assert complete("show ")["completions"] == ["1", "2", "3", "4", "5"]
+    assert complete("download --format p")["completions"] == ["pdf"]
+    assert "proficient" in complete("skills --level ")["completions"]
+    assert "cloud" in complete("tags --add 2 cl")["completions"]
+    assert complete("help vers")["common"] == "versions"
+    # Without a session everything but item ids still completes.
+    assert client.get("/api/complete", params={"line": "show "}).json()["completions"] == []
+    assert client.get("/api/complete", params={"line": "sea"}).json()["completions"] == ["search"]
@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.export import ExportCache, write_pdf
+from app.sessions import new_session
+
+
+def test_exports_stream_once_then_come_from_the_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "EXPORTS", ExportCache(tmp_path))
+    client = TestClient(main.app)
+    version = main.STORE.current.version
+
+    first = client.get("/api/export/md?filename=cv")
+    assert first.headers["content-disposition"] == 'attachment; filename="cv.md"'
+    assert first.text.startswith("# ")
+    assert "## Experience" in first.text
+    assert (tmp_path / f"{version}-detailed.md").read_text() == first.text
+
+    again = client.get("/api/export/md")
+    assert again.text == first.text
+    assert (main.EXPORTS.hits, main.EXPORTS.misses) == (1, 1)
+    assert client.get("/api/export/md", headers={"if-none-match": again.headers["etag"]}).status_code == 304
+    assert client.get("/api/export/docx").status_code == 404
+
+    compact = client.get("/api/export/txt?mode=compact").text
+    detailed = client.get("/api/export/txt").text
+    assert "Highlights:" in detailed and "Highlights:" not in compact
+
+
+def test_pdf_cross_reference_points_at_every_object():
+    pdf = b"".join(write_pdf(main.export_document(main.STORE.current)))
+    assert pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n")
+    start = int(pdf.rsplit(b"startxref\n", 1)[1].split(b"\n")[0])
+    lines = pdf[start:].split(b"\n")
+    count = int(lines[1].split()[1])
+    for number, entry in enumerate(lines[3 : 2 + count], start=1):
+        assert pdf[int(entry[:10]) :].startswith(b"%d 0 obj" % number)
+
+
+def test_download_command_points_at_the_export():
+    result = main.handle_command(new_session(), "download --filename 'my cv.pdf'")
+    assert result["text"] == "Download started: my_cv.pdf"
+    assert result["download"] == "/api/export/pdf?filename=my_cv.pdf"
+    assert main.handle_command(new_session(), "download")["download"].endswith("resume.txt")
+    assert main.handle_command(new_session(), "download --format doc")["text"].startswith("Unknown format")
@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import app.main as main
+from app.fuzzy import TrigramIndex, edit_distance
+from app.sessions import new_session
+
+
+def test_trigram_index_ranks_close_terms_and_ignores_distant_ones():
+    index = TrigramIndex(["open", "opinion", "experience", "expertise", "network", "network+"])
+    assert index.best("opne") == "open"
+    assert index.best("experiance") == "experience"
+    assert index.suggest("netwrok") == ["network", "network+"]
+    assert index.best("xyzzy") is None
+    assert index.best("open") is None  # already known, nothing to correct
+    assert "Network" in index
+
+
+def test_edit_distance_counts_transpositions_and_stops_at_the_limit():
+    assert edit_distance("opne", "open", 2) == 1
+    assert edit_distance("kitten", "sitting", 5) == 3
+    assert edit_distance("kitten", "sitting", 1) == 2
+    assert edit_distance("", "abc", 3) == 3
+
+
+def test_typos_get_suggestions_and_search_falls_back_to_corrections():
+    run = lambda cmd: main.handle_command(new_session(), cmd)["text"]
+
+    assert run("opne experiance") == "Unknown command. Did you mean 'open experience'?"
+    assert run("open experiance") == "Unknown section. Did you mean 'experience'?"
+    assert run("xyzzy") == "Unknown command."
+    text = run("search azrue")
+    assert text.startswith("No matches for 'azrue'; showing results for 'azure':")
+    assert "Azure" in text
+    assert run("search qqqqqq") == "No matches."
+
+
+def test_only_section_and_search_arguments_are_corrected():
+    run = lambda cmd: main.handle_command(new_session(), cmd)["text"]
+
+    # Valid commands with free-text arguments are left alone.
+    assert run("versions foo") == "Unknown command."
+    assert run("versions experiance") == "Unknown command."
+    assert run("open") == "Unknown command."
+    # Flags and their values keep their place; only typed arguments change.
+    assert run("opne experiance --page 2") == "Unknown command. Did you mean 'open experience --page 2'?"
+    assert run("serach --in experiance azrue") == "Unknown command. Did you mean 'search --in experiance azure'?"
+    assert run("thme experiance") == "Unknown command. Did you mean 'theme experiance'?"
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.metrics import Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    hist = registry.histogram("latency_seconds", "Latency.", ["command"], buckets=[0.1, 1])
+    for value in (0.05, 0.5, 0.5, 5):
+        hist.labels("open").observe(value)
+    registry.counter("hits_total", "Hits.").inc(3)
+
+    text = registry.render()
+
+    assert 'latency_seconds_bucket{command="open",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{command="open",le="1"} 3' in text
+    assert 'latency_seconds_bucket{command="open",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{command="open"} 4' in text
+    assert "# TYPE hits_total counter\nhits_total 3\n" in text
+
+
+def test_metrics_endpoint_reports_commands_and_session_misses():
+    client = TestClient(app)
+    session_id = client.get("/api/start").json()["session_id"]
+    client.post("/api/command", json={"session_id": session_id, "command": "open experience"})
+    client.post("/api/command", json={"session_id": session_id, "command": "frobnicate"})
+    client.post("/api/command", json={"session_id": "missing", "command": "help"})
+
+    resp = client.get("/metrics")
+
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    assert 'resume_command_duration_seconds_count{command="open"}' in text
+    assert 'resume_command_duration_seconds_count{command="unknown"}' in text
+    assert 'command="frobnicate"' not in text
+    misses = [l for l in text.splitlines() if l.startswith("resume_session_misses_total ")]
+    assert misses and float(misses[0].split()[1]) >= 1
+    assert 'resume_http_response_size_bytes_count{route="/api/command"}' in text
+    assert "resume_sessions_resident " in text
@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+import app.main as main
+from app.model import FilterError, ResumeModel, date_bounds
+from app.sessions import new_session
+
+DATA = {
+    "experience": [
+        {"company": "Acme", "start": "2015-03", "end": "2018-06", "tech": ["Azure", "Intune"]},
+        {"company": "Globex", "start": "2018-07", "end": None, "tech": ["AWS"]},
+        {"company": "Initech", "start": "2010", "end": "2014-12", "tech": []},
+    ],
+    "skills": [
+        {"name": "Azure", "level": "Advanced", "tags": ["cloud"]},
+        {"name": "Teams", "level": "intermediate", "tags": ["collab", "cloud"]},
+    ],
+}
+
+
+def _companies(model, *exprs):
+    section = model.sections["experience"]
+    return [section.items[row]["company"] for row in section.filter(exprs)]
+
+
+def test_date_bounds_cover_partial_dates():
+    assert date_bounds("2021") == (20210101, 20211231)
+    assert date_bounds("2021-05") == (20210501, 20210531)
+    assert date_bounds("soon") is None
+
+
+def test_filter_operators_use_typed_columns():
+    model = ResumeModel(DATA)
+
+    assert _companies(model, "start>2015") == ["Globex"]
+    assert _companies(model, "start>=2015", "tech~azure") == ["Acme"]
+    assert _companies(model, "end>2020") == ["Globex"]  # no end means ongoing
+    assert _companies(model, "start=2010..2015-12") == ["Acme", "Initech"]
+    assert _companies(model, "active=2016..2017") == ["Acme"]
+    assert _companies(model, "tech", "in", "aws,intune") == ["Acme", "Globex"]
+    skills = model.sections["skills"]
+    assert skills.filter(["level=advanced", "tags=cloud"]) == [0]
+
+    with pytest.raises(FilterError):
+        _companies(model, "salary>10")
+    with pytest.raises(FilterError):
+        _companies(model, "nonsense")
+    for empty in (["start>"], ["tech~ "], ["tech", "in", ","]):
+        with pytest.raises(FilterError, match="Missing value"):
+            _companies(model, *empty)
+
+
+def test_dates_are_formatted_once_at_compile_time():
+    model = ResumeModel(DATA)
+
+    assert model.dates[("2018-06", True)] == "06/01/18"
+    assert model.format_date(None) == "Present"
+    assert model.format_date("2015-03") == "03/01/2015"
+
+
+def test_filter_command_labels_items_of_any_section_and_reports_bad_specs():
+    run = lambda cmd, state=None: main.handle_command(state or new_session(), cmd)
+
+    assert run("filter education year>2015")["text"] == (
+        "Matches: Western Governors University, ACI Learning"
+    )
+    assert run("filter education year>2030")["text"] == "No matches."
+    assert run("filter education salary>1") == {"text": "Unknown field 'salary'.", "error": True}
+    assert run("filter certifications start=2020..soon")["error"] is True
+    assert run("filter nosuch year>1")["text"] == "Unknown section."
+    assert run("filter experience start>") == {"text": "Missing value after 'start>'.", "error": True}
+    # Without a section the current listing is filtered.
+    state = new_session()
+    run("open education", state)
+    assert run("filter year<2000", state)["text"] == "No matches."
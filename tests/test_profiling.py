@@ -0,0 +1,72 @@
+import pstats
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.profiling import CommandProfiler
+
+
+def test_profiler_writes_named_profiles_and_keeps_the_newest(tmp_path):
+    profiler = CommandProfiler(tmp_path, keep=2)
+
+    for n in (10, 2000, 50):
+        assert profiler.run("search", "terminal", sum, range(n)) == sum(range(n))
+
+    files = sorted(tmp_path.iterdir())
+    assert len(files) == 2
+    assert all(f.name.endswith("-search-terminal.prof") for f in files)
+    pstats.Stats(str(files[0]))  # loadable
+    assert {r.path for r in profiler.slowest()} == {str(f) for f in files}
+    assert profiler.slowest()[0].stack
+
+
+def test_profiles_endpoint_requires_token_and_lists_slowest(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "PROFILER", CommandProfiler(tmp_path))
+    monkeypatch.setattr(main, "PROFILE_ADMIN_TOKEN", "s3cret")
+    client = TestClient(main.app)
+    session_id = client.get("/api/start").json()["session_id"]
+
+    client.post(
+        "/api/command",
+        json={"session_id": session_id, "command": "open experience"},
+        headers={"X-Profile": "1"},
+    )
+    client.post("/api/command", json={"session_id": session_id, "command": "next"})
+
+    assert client.get("/api/admin/profiles").status_code == 403
+    resp = client.get("/api/admin/profiles", headers={"X-Admin-Token": "s3cret"})
+    profiles = resp.json()["profiles"]
+    assert [(p["command"], p["mode"]) for p in profiles] == [("open", "terminal")]
+    assert any("handle_command" in frame["function"] for frame in profiles[0]["stack"])
+    assert list(tmp_path.glob("*-open-terminal.prof"))
+
+
+def test_commands_are_profiled_in_line_but_saved_in_a_worker_thread(tmp_path, monkeypatch):
+    profiler = CommandProfiler(tmp_path)
+    result, captured = profiler.capture("search", "terminal", sum, range(10))
+    assert result == 45 and not list(tmp_path.iterdir()) and not profiler.records
+
+    ran_on, saved_on = [], []
+    capture, save = profiler.capture, profiler.save
+    monkeypatch.setattr(
+        profiler, "capture", lambda *a: (ran_on.append(threading.current_thread()), capture(*a))[1]
+    )
+    monkeypatch.setattr(
+        profiler, "save", lambda c: (saved_on.append(threading.current_thread()), save(c))[1]
+    )
+    monkeypatch.setattr(main, "PROFILER", profiler)
+    client = TestClient(main.app)
+    session_id = client.get("/api/start").json()["session_id"]
+    client.post(
+        "/api/command",
+        json={"session_id": session_id, "command": "help"},
+        headers={"X-Profile": "1"},
+    )
+
+    assert len(saved_on) == 1 and saved_on[0] is not ran_on[0]  # not the event loop
+    assert [r.command for r in profiler.records] == ["help"]
@@ -0,0 +1,134 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.ratelimit import BucketSpec, MemoryRateLimiter, RedisRateLimiter
+from app.tokens import SessionTokens
+
+
+def test_token_bucket_spends_refills_and_reports_wait():
+    limiter = MemoryRateLimiter("ip", BucketSpec(burst=2, rate=0.5), max_keys=2)
+
+    assert limiter.acquire("a", now=0) == 0
+    assert limiter.acquire("a", now=0) == 0
+    assert limiter.acquire("a", now=0) == 2.0
+    assert limiter.acquire("a", now=1) == 1.0
+    assert limiter.acquire("a", now=2) == 0
+
+    limiter.acquire("b", now=2)
+    limiter.acquire("c", now=2)
+    assert list(limiter.buckets) == ["b", "c"]
+
+
+
+def test_redis_bucket_and_refund_scripts_run_against_redis(scripting_redis):
+    limiter = RedisRateLimiter(scripting_redis, "ip", BucketSpec(burst=2, rate=0.001))
+    key = "ratelimit:ip:a"
+
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == pytest.approx(1000, rel=0.01)
+    assert 0 < scripting_redis.pttl(key) <= 2000 * 1000 + 1000
+
+    limiter.refund("a")
+    assert limiter.acquire("a") == 0
+    limiter.refund("a", 5)
+    assert float(scripting_redis.hget(key, "tokens")) == pytest.approx(2)
+
+    limiter.refund("unseen")
+    assert not scripting_redis.exists("ratelimit:ip:unseen")
+
+def test_start_is_rejected_with_retry_after_once_the_bucket_is_empty(monkeypatch):
+    monkeypatch.setattr(
+        main,
+        "LIMITERS",
+        {
+            "start_ip": MemoryRateLimiter("start_ip", BucketSpec(burst=2, rate=0.1)),
+            "session": MemoryRateLimiter("session", BucketSpec(burst=1, rate=0.1)),
+        },
+    )
+    client = TestClient(main.app)
+
+    session_id = client.get("/api/start").json()["session_id"]
+    assert client.get("/api/start").status_code == 200
+    resp = client.get("/api/start")
+
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "10"
+    command = {"session_id": session_id, "command": "help"}
+    assert client.post("/api/command", json=command).status_code == 200
+    assert client.post("/api/command", json=command).status_code == 429
+    assert 'resume_rate_limited_total{bucket="start_ip"}' in client.get("/metrics").text
+
+
+def _limiters(**specs):
+    return {name: MemoryRateLimiter(name, BucketSpec(*spec)) for name, spec in specs.items()}
+
+
+def test_forwarded_for_is_ignored_unless_trusted(monkeypatch):
+    monkeypatch.setattr(main, "LIMITERS", _limiters(start_ip=(1, 0.01)))
+    client = TestClient(main.app)
+
+    assert client.get("/api/start", headers={"X-Forwarded-For": "203.0.113.1"}).status_code == 200
+    assert client.get("/api/start", headers={"X-Forwarded-For": "203.0.113.2"}).status_code == 429
+
+
+def test_clients_behind_one_proxy_get_their_own_buckets(monkeypatch):
+    monkeypatch.setattr(main, "LIMITERS", _limiters(start_ip=(1, 0.01)))
+    monkeypatch.setattr(main, "RATE_LIMIT_TRUST_FORWARDED", True)
+    client = TestClient(main.app)  # every request comes from the same peer
+    alice = {"X-Forwarded-For": "203.0.113.7, 10.0.0.1:51234"}
+    bob = {"X-Forwarded-For": "198.51.100.2:40000"}
+
+    assert client.get("/api/start", headers=alice).status_code == 200
+    assert client.get("/api/start", headers=bob).status_code == 200
+    assert client.get("/api/start", headers=bob).status_code == 429
+    # App Service adds the client's port; a new connection is still the same client.
+    assert client.get("/api/start", headers={"X-Forwarded-For": "198.51.100.2:40001"}).status_code == 429
+    assert main.strip_port("[2001:db8::1]:443") == "2001:db8::1"
+    assert main.strip_port("2001:db8::1") == "2001:db8::1"
+
+
+def test_session_rejections_refund_the_ip_bucket(monkeypatch):
+    limiters = _limiters(command_ip=(3, 0.01), session=(1, 0.01))
+    monkeypatch.setattr(main, "LIMITERS", limiters)
+    client = TestClient(main.app)
+    session_id = client.get("/api/start").json()["session_id"]
+    command = {"session_id": session_id, "command": "help"}
+
+    assert client.post("/api/command", json=command).status_code == 200
+    for _ in range(5):
+        assert client.post("/api/command", json=command).status_code == 429
+    (tokens, _), = limiters["command_ip"].buckets.values()
+    assert 1.9 < tokens < 2.1  # only the admitted command was charged
+
+
+def test_token_sessions_share_one_bucket_across_tokens(monkeypatch):
+    monkeypatch.setattr(main, "TOKENS", SessionTokens(b"secret", ttl=3600))
+    monkeypatch.setattr(main, "LIMITERS", _limiters(session=(2, 0.01)))
+    client = TestClient(main.app)
+    token = client.get("/api/start").json()["session_id"]
+
+    for _ in range(2):
+        resp = client.post("/api/command", json={"session_id": token, "command": "open projects"})
+        token = resp.json().get("session_id", token)
+    resp = client.post("/api/command", json={"session_id": token, "command": "next"})
+    assert resp.status_code == 429
+    assert len(main.LIMITERS["session"].buckets) == 1
+
+
+def test_websocket_commands_pay_the_ip_bucket(monkeypatch):
+    monkeypatch.setattr(main, "LIMITERS", _limiters(command_ip=(2, 0.01)))
+    client = TestClient(main.app)
+    session_id = client.get("/api/start").json()["session_id"]
+
+    with client.websocket_connect(f"/ws/terminal?session_id={session_id}") as ws:
+        ws.send_json({"command": "help"})
+        assert not ws.receive_json().get("error")
+    assert client.post("/api/command", json={"session_id": session_id, "command": "help"}).status_code == 200
+    assert client.post("/api/command", json={"session_id": session_id, "command": "help"}).status_code == 429
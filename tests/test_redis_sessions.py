@@ -0,0 +1,172 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.sessions import REVISION_FIELD, AsyncRedisHashSessions, RedisHashSessions, RedisSessions
+
+
+class RecordingRedis:
+    """Just enough of the redis-py client to observe what gets written."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.calls = []
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hset(self, key, mapping):
+        self.calls.append(("hset", key, sorted(mapping)))
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    def hdel(self, key, *fields):
+        self.calls.append(("hdel", key, sorted(fields)))
+        for f in fields:
+            self.hashes.get(key, {}).pop(f, None)
+
+    def expire(self, key, ttl):
+        self.calls.append(("expire", key, ttl))
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        return []
+
+    def register_script(self, source):
+        def script(keys, args):
+            self.calls.append(("script", keys, args))
+            return self.script_result
+
+        self.script_result = 1
+        return script
+
+
+def test_hash_store_writes_only_changed_fields():
+    client = RecordingRedis()
+    store = RedisHashSessions(client, ttl=60)
+    store["sid"] = {"_ts": 1.0, "page": 1, "current_section": "experience"}
+
+    state = store["sid"]
+    state["_ts"] = 2.0  # refreshed on every command; Redis TTL covers it
+    client.calls.clear()
+    store["sid"] = state
+    assert client.calls == [("expire", "session:sid", 60)]
+
+    state["page"] = 2
+    state["notes"] = {"1": ["hi"]}
+    client.calls.clear()
+    store["sid"] = state
+    assert client.calls == [
+        ("hset", "session:sid", ["notes", "page"]),
+        ("expire", "session:sid", 60),
+    ]
+
+    state.clear()
+    client.calls.clear()
+    store["sid"] = state
+    assert client.calls == [
+        ("hdel", "session:sid", ["current_section", "notes", "page"]),
+        ("expire", "session:sid", 60),
+    ]
+    assert store.get("sid") == {"_ts": 1.0}
+
+
+def test_hash_compare_and_set_sends_the_revision_and_changed_fields_only():
+    client = RecordingRedis()
+    store = RedisHashSessions(client, ttl=60)
+    store["sid"] = {"_ts": 1.0, "page": 1, "mode": "secret"}
+
+    state = store["sid"]
+    state["page"] = 2
+    state["_rev"] = 1
+    del state["mode"]
+    client.calls.clear()
+    assert store.compare_and_set("sid", state, 0)
+    assert client.calls == [
+        ("script", ["session:sid"], ["0", 60, 2, "page", "2", "_rev", "1", "mode"])
+    ]
+    assert state.loaded == {"_ts": "1.0", "page": "2", "_rev": "1"}
+
+    client.script_result = 0
+    state["_rev"] = 2
+    assert not store.compare_and_set("sid", state, 1)
+    assert state.loaded["_rev"] == "1"
+
+
+class AsyncRecordingRedis(RecordingRedis):
+    """Awaitable facade over :class:`RecordingRedis`."""
+
+    async def hgetall(self, key):
+        return super().hgetall(key)
+
+    async def expire(self, key, ttl):
+        super().expire(key, ttl)
+
+    def pipeline(self, transaction=True):
+        return _AsyncPipeline(RecordingRedis.pipeline(self))
+
+
+class _AsyncPipeline:
+    def __init__(self, client):
+        self.client = client
+
+    def __getattr__(self, name):
+        return getattr(RecordingRedis, name).__get__(self.client)
+
+    async def execute(self):
+        return []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+
+def test_compare_and_set_scripts_run_against_redis(scripting_redis):
+    for store in (RedisSessions(scripting_redis, ttl=60), RedisHashSessions(scripting_redis, ttl=60)):
+        assert not store.compare_and_set("missing", {REVISION_FIELD: 1}, 0)
+
+        store["sid"] = {"page": 1, "notes": {"1": ["a"]}}
+        loser = store["sid"]
+        winner = store["sid"]
+        winner.update({REVISION_FIELD: 1, "page": 2})
+        assert store.compare_and_set("sid", winner, 0)
+
+        loser.update({REVISION_FIELD: 1, "page": 3})
+        assert not store.compare_and_set("sid", loser, 0)
+        assert store["sid"] == {REVISION_FIELD: 1, "page": 2, "notes": {"1": ["a"]}}
+
+        latest = store["sid"]
+        del latest["notes"]
+        latest[REVISION_FIELD] = 2
+        assert store.compare_and_set("sid", latest, 1)
+        assert store["sid"] == {REVISION_FIELD: 2, "page": 2}
+        key = "sid" if isinstance(store, RedisSessions) else "session:sid"
+        assert 0 < scripting_redis.ttl(key) <= 60
+        scripting_redis.flushdb()
+
+def test_async_hash_store_skips_unchanged_writes():
+    async def scenario():
+        client = AsyncRecordingRedis()
+        store = AsyncRedisHashSessions(client, ttl=60)
+        await store.set("sid", {"_ts": 1.0})
+        state = await store.get("sid")
+        state["page"] = 3
+        client.calls.clear()
+        await store.set("sid", state)
+        await store.set("sid", state)
+        return client.calls
+
+    assert asyncio.run(scenario()) == [
+        ("hset", "session:sid", ["page"]),
+        ("expire", "session:sid", 60),
+        ("expire", "session:sid", 60),
+    ]
@@ -0,0 +1,144 @@
+import copy
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import app.main as main
+from app.revisions import RevisionError, RevisionStore
+from app.sessions import new_session
+from app.snapshot import ResumeStore
+
+
+def _revisions(tmp_path):
+    base = json.loads(main.DATA_PATH.read_text())
+    edited = copy.deepcopy(base)
+    edited["experience"][0]["bullets"].append("Cut ticket backlog by half")
+    edited["skills"] = [s for s in edited["skills"] if s["name"] != "Azure"]
+    edited["projects"].append({"id": 99, "name": "Homelab", "role": "Owner"})
+    edited["overview"]["title"] = "Senior Engineer"
+    store = RevisionStore(tmp_path)
+    store.record("default", "aaaa0001", base)
+    store.record("default", "bbbb0002", edited)
+    return store, base
+
+
+def test_revisions_share_unchanged_items_and_diff_by_identity(tmp_path):
+    store, base = _revisions(tmp_path)
+    objects = list((tmp_path / "objects").rglob("*.json"))
+    items = sum(len(v) for v in base.values() if isinstance(v, list))
+    # Only the edited experience item, the new project and the overview are new.
+    assert len(objects) <= items + len(base) + 3
+
+    diff = store.diff("aaaa0001", "bbbb0002")
+    by_section = {sd.section: sd for sd in diff.sections}
+    assert by_section["projects"].added == ("Homelab",)
+    assert by_section["skills"].removed == ("Azure",)
+    (label, fields), = by_section["experience"].changed
+    assert fields == ("bullets",)
+    assert by_section["overview"].changed == (("overview", ("title",)),)
+    assert "+ Homelab" in diff.render()
+
+    store.diff("aaaa0001", "bbbb0002")
+    assert store.diff.cache_info().hits == 1
+    assert not store.record("default", "bbbb0002", base)
+
+
+def test_version_references_resolve_against_the_history(tmp_path):
+    store, _ = _revisions(tmp_path)
+    assert store.resolve("default", "current") == "bbbb0002"
+    assert store.resolve("default", "current~1") == "aaaa0001"
+    assert store.resolve("default", "1") == "aaaa0001"
+    assert store.resolve("default", "bbbb") == "bbbb0002"
+    with pytest.raises(RevisionError):
+        store.resolve("default", "current~2")
+    with pytest.raises(RevisionError):
+        store.resolve("other", "current")
+    # A fresh store reads the history back from disk.
+    assert RevisionStore(tmp_path).history("default")[0][0] == "aaaa0001"
+
+
+def test_versions_command_lists_and_diffs_reloaded_revisions(monkeypatch, tmp_path):
+    data = json.loads(main.DATA_PATH.read_text())
+    path = tmp_path / "resume.json"
+    path.write_text(json.dumps(data))
+    monkeypatch.setattr(main, "REVISIONS", RevisionStore(tmp_path / "revisions"))
+    store = ResumeStore(path, name="default", on_load=main.record_revision)
+    data["overview"]["title"] = "Staff Engineer"
+    path.write_text(json.dumps(data, indent=1))
+    assert store.reload()
+
+    listing = main.handle_command(new_session(), "versions --list", store.current)["text"]
+    assert "[2] " + store.current.version in listing and "(current)" in listing
+    diff = main.handle_command(new_session(), "versions --diff 1 2", store.current)["text"]
+    assert "overview: +0 ~1 -0" in diff
+    assert main.handle_command(new_session(), "versions --diff 1", store.current)["text"] == diff
+    assert "Unknown" in main.handle_command(new_session(), "versions --diff zzzz 1", store.current)["text"]
+
+
+def test_workers_recording_the_same_revisions_keep_one_history(tmp_path):
+    data = json.loads(main.DATA_PATH.read_text())
+    first, second = RevisionStore(tmp_path), RevisionStore(tmp_path)  # two workers
+    assert first.record("default", "aaaa0001", data)
+    assert not second.record("default", "aaaa0001", data)
+    assert second.record("default", "bbbb0002", data)
+    assert not first.record("default", "bbbb0002", data)  # stale cache, fresh file
+    lines = (tmp_path / "history" / "default.jsonl").read_text().splitlines()
+    assert [json.loads(line)["version"] for line in lines] == ["aaaa0001", "bbbb0002"]
+    assert first.history("default") == second.history("default")
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_read_only_stores_never_write(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    store = RevisionStore(blocker / "revisions")
+    assert not store.writable
+    assert not store.record("default", "aaaa0001", {"overview": {}})
+    assert store.history("default") == []
+
+
+def test_out_of_range_and_malformed_references_are_rejected(tmp_path):
+    store = RevisionStore(tmp_path)
+    with pytest.raises(RevisionError, match="No revisions recorded yet."):
+        store.resolve("default", "current")
+    store.record("default", "aaaa0001", {"overview": {}})
+    for ref, message in [
+        ("current~1", "Only 1 revision recorded."),
+        ("current~x", "Cannot parse 'current~x'; use current~N."),
+        ("0", r"No revision \[0\]"),
+        ("2", r"No revision \[2\]"),
+        ("abc", "Unknown or ambiguous version 'abc'."),
+        ("ffff", "Unknown or ambiguous version 'ffff'."),
+    ]:
+        with pytest.raises(RevisionError, match=message):
+            store.resolve("default", ref)
+    store.record("default", "aaaa0002", {"overview": {"title": "x"}})
+    with pytest.raises(RevisionError, match="ambiguous"):
+        store.resolve("default", "aaaa")
+    with pytest.raises(RevisionError, match="Only 2 revisions recorded."):
+        store.resolve("default", "current~2")
+
+
+def test_importing_the_app_records_nothing_until_startup(tmp_path):
+    script = """
+import sys
+from pathlib import Path
+from fastapi.testclient import TestClient
+import app.main as main
+print(Path(sys.argv[1]).exists())
+with TestClient(main.app):
+    print(main.REVISIONS.history("default")[-1][0] == main.STORE.current.version)
+"""
+    directory = tmp_path / "revisions"
+    env = dict(os.environ, REVISIONS_DIR=str(directory), RESUME_RELOAD_INTERVAL="0")
+    out = subprocess.run(
+        [sys.executable, "-c", script, str(directory)],
+        cwd=Path(__file__).resolve().parents[1], env=env, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    assert out == ["False", "True"]
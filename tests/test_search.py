@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.search import SearchIndex
+
+RESUME = {
+    "overview": {"name": "Ignored"},
+    "experience": [
+        {"id": 1, "company": "Acme", "role": "Engineer", "bullets": ["Ran Azure AD sync."]},
+        {"id": 2, "company": "Globex", "role": "Azure Architect", "tech": ["Kubernetes"]},
+    ],
+    "projects": [{"id": 1, "name": "Homelab", "bullets": ["Kubernetes cluster on Azure."]}],
+}
+
+
+def test_search_ranks_values_and_ignores_keys():
+    index = SearchIndex(RESUME)
+
+    # Headline fields outrank bullets; JSON keys such as "role" never match.
+    assert index.search("azure") == [
+        ("experience", "Globex"),
+        ("experience", "Acme"),
+        ("projects", "Homelab"),
+    ]
+    assert index.search("role") == []
+
+
+def test_search_prefix_and_terms_and_scope():
+    index = SearchIndex(RESUME)
+
+    assert index.search("kube azu") == [("experience", "Globex"), ("projects", "Homelab")]
+    assert index.search("kube", section="projects") == [("projects", "Homelab")]
+    assert index.search("kube", section="unknown") == []
@@ -0,0 +1,151 @@
+import asyncio
+import copy
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import app.main as main
+from app.sessions import REVISION_FIELD
+
+
+class VersionedSessions:
+    """Async session store with Redis' copy-on-read and compare-and-set semantics.
+
+    ``get`` yields to the event loop after reading, so concurrent commands
+    interleave between their load and their write as they do over a network.
+    """
+
+    def __init__(self, conflicts=0):
+        self.data = {}
+        self.conflicts = conflicts  # forced losses, on top of real ones
+
+    async def get(self, key):
+        state = copy.deepcopy(self.data.get(key))
+        await asyncio.sleep(0)
+        return state
+
+    async def set(self, key, value):
+        self.data[key] = copy.deepcopy(value)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def compare_and_set(self, key, value, expected):
+        current = self.data.get(key)
+        if self.conflicts or current is None or current.get(REVISION_FIELD, 0) != expected:
+            self.conflicts = max(0, self.conflicts - 1)
+            return False
+        self.data[key] = copy.deepcopy(value)
+        return True
+
+
+def _use_store(monkeypatch, store, retries=5):
+    monkeypatch.setattr(main, "sessions", store)
+    monkeypatch.setattr(main, "USE_REDIS", True)
+    monkeypatch.setattr(main, "ASYNC_SESSIONS", True)
+    monkeypatch.setattr(main, "LIMITERS", {})  # the in-memory limiters are synchronous
+    monkeypatch.setattr(main, "SESSION_CAS_RETRIES", retries)
+    monkeypatch.setattr(main, "SESSION_CAS_BACKOFF", 0.001)
+
+
+async def _hammer(writers, per_writer):
+    """Add one note per request from ``writers`` concurrent clients of one session."""
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        session_id = (await client.get("/api/start")).json()["session_id"]
+
+        async def writer(w):
+            statuses = {}
+            for i in range(per_writer):
+                text = f"w{w}-{i}"
+                body = {"session_id": session_id, "command": f"notes --add 1 {text}"}
+                statuses[text] = (await client.post("/api/command", json=body)).status_code
+            return statuses
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(writer(w) for w in range(writers)))
+        elapsed = time.perf_counter() - start
+    statuses = {text: code for r in results for text, code in r.items()}
+    return session_id, statuses, len(statuses) / elapsed
+
+
+def test_concurrent_commands_on_one_memory_session_lose_no_writes(monkeypatch):
+    monkeypatch.setattr(main, "LIMITERS", {})
+    load_session = main.load_session
+
+    async def load_and_yield(session_id, tenant=main.DEFAULT_TENANT):
+        # Hand out a private copy and suspend, so commands interleave between
+        # load and save and only ``SESSION_LOCKS`` keeps them from clobbering.
+        state = copy.deepcopy(await load_session(session_id, tenant))
+        await asyncio.sleep(0)
+        return state
+
+    monkeypatch.setattr(main, "load_session", load_and_yield)
+    session_id, statuses, rps = asyncio.run(_hammer(writers=16, per_writer=25))
+
+    state = main.sessions.get(session_id)
+    assert set(statuses.values()) == {200}
+    assert sorted(state["notes"]["1"]) == sorted(statuses)
+    assert state[REVISION_FIELD] == len(statuses)
+    assert len(main.SESSION_LOCKS) == 0
+    print(f"memory: {rps:.0f} commands/s on one session")
+
+
+def test_lost_compare_and_set_reruns_the_command_on_fresh_state(monkeypatch):
+    store = VersionedSessions()
+    _use_store(monkeypatch, store, retries=100)
+    session_id, statuses, rps = asyncio.run(_hammer(writers=8, per_writer=10))
+
+    state = store.data[session_id]
+    assert set(statuses.values()) == {200}
+    assert sorted(state["notes"]["1"]) == sorted(statuses)
+    assert state[REVISION_FIELD] == len(statuses)
+    retried = main.SESSION_CONFLICTS.labels("retried").value
+    assert retried > 0
+    print(f"compare-and-set: {rps:.0f} commands/s on one session, {retried:.0f} retried")
+
+
+def test_exhausted_retries_answer_409_without_writing(monkeypatch):
+    store = VersionedSessions()
+    _use_store(monkeypatch, store, retries=2)
+    client = TestClient(main.app)
+    session_id = client.get("/api/start").json()["session_id"]
+
+    store.conflicts = 3
+    resp = client.post("/api/command", json={"session_id": session_id, "command": "notes --add 1 x"})
+    assert resp.status_code == 409
+    assert resp.headers["retry-after"] == "1"
+    assert "notes" not in store.data[session_id]
+
+    store.conflicts = 2
+    resp = client.post("/api/command", json={"session_id": session_id, "command": "notes --add 1 y"})
+    assert resp.json()["text"] == "Note added."
+    assert store.data[session_id]["notes"] == {"1": ["y"]}
+
+
+def test_socket_flush_replays_its_commands_over_a_concurrent_write(monkeypatch):
+    monkeypatch.setattr(main, "WS_LINE_DELAY", 0)
+    monkeypatch.setattr(main, "WS_FLUSH_EVERY", 2)
+    store = VersionedSessions()
+    _use_store(monkeypatch, store)
+    client = TestClient(main.app)
+    session_id = client.get("/api/start").json()["session_id"]
+
+    with client.websocket_connect(f"/ws/terminal?session_id={session_id}") as ws:
+        ws.send_json({"command": "notes --add 1 a"})
+        assert ws.receive_json()["text"] == "Note added."
+        resp = client.post("/api/command", json={"session_id": session_id, "command": "notes --add 1 http"})
+        assert resp.json()["text"] == "Note added."
+        ws.send_json({"command": "notes --add 1 b"})  # second command: flush
+        ws.receive_json()
+        ws.send_json({"command": "notes --show 1"})  # answered after the flush
+        assert ws.receive_json()["text"] == "http | a | b"
+
+        assert store.data[session_id]["notes"] == {"1": ["http", "a", "b"]}
+        assert store.data[session_id][REVISION_FIELD] == 2
@@ -5,6 +5,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from app.main import SESSION_TTL, prune_sessions, sessions
+from app.sessions import SCHEMA_VERSION, MemorySessions, migrate_session
 
 
 def test_prune_sessions_respects_ttl():
@@ -25,3 +26,55 @@ def test_prune_sessions_respects_ttl():
     assert old_id not in sessions
     assert young_id in sessions
 
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemorySessions(ttl=60, max_sessions=2)
+    now = time.time()
+    store["a"] = {"_ts": now}
+    store["b"] = {"_ts": now}
+    store["a"] = {"_ts": now}  # touch "a" so "b" becomes the oldest
+    store["c"] = {"_ts": now}
+
+    assert list(store) == ["a", "c"]
+    assert store.stats()["evictions"] == 1
+
+
+def test_memory_store_get_drops_expired_session():
+    store = MemorySessions(ttl=60)
+    store["old"] = {"_ts": time.time() - 61}
+
+    assert store.get("old") is None
+    assert "old" not in store
+    assert store.stats() == {
+        "resident": 0,
+        "max_sessions": 0,
+        "evictions": 0,
+        "expirations": 1,
+    }
+
+
+def test_sessions_without_a_timestamp_still_expire():
+    store = MemorySessions(ttl=60)
+    now = time.time()
+    store["old"] = {"_ts": now - 120}
+    store["stamped"] = {"_rev": 1}  # e.g. after ``back`` cleared the state
+    store["young"] = {"_ts": now}
+    assert store["stamped"]["_ts"] >= now
+
+    del store["stamped"]["_ts"]  # live dict mutated in place, never saved
+    assert store.prune(now=now) == 2
+    assert list(store) == ["young"]
+    assert store.prune(now=now + 600) == 1
+
+def test_migrate_session_replaces_item_copies_with_indexes():
+    legacy = {
+        "_ts": 1.0,
+        "current_section": "experience",
+        "last_items": {"6": {"company": "Acme"}, "7": {"company": "Globex"}},
+    }
+
+    state = migrate_session(legacy)
+
+    assert state["last_items"] == [5, 6]
+    assert state["_v"] == SCHEMA_VERSION
+    assert migrate_session(state) == state
@@ -0,0 +1,35 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.snapshot import ResumeStore
+
+
+def _write(path, data, mtime):
+    path.write_text(json.dumps(data))
+    os.utime(path, (mtime, mtime))
+
+
+def test_reload_swaps_snapshot_and_keeps_old_one_on_bad_json(tmp_path):
+    path = tmp_path / "resume.json"
+    _write(path, {"skills": [{"id": 1, "name": "Azure"}]}, 1_000)
+    store = ResumeStore(path)
+    first = store.current
+
+    assert store.reload() is False
+
+    _write(path, {"skills": [{"id": 1, "name": "Kubernetes"}]}, 2_000)
+    assert store.reload() is True
+    assert store.current.version != first.version
+    assert store.current.search.search("kubernetes") == [("skills", "Kubernetes")]
+    # Readers holding the old snapshot still see consistent old data.
+    assert first.search.search("azure") == [("skills", "Azure")]
+
+    path.write_text("{not json")
+    os.utime(path, (3_000, 3_000))
+    second = store.current
+    assert store.reload() is False
+    assert store.current is second
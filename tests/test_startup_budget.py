@@ -0,0 +1,13 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.startup import measure, over_budget
+
+
+def test_cold_start_stays_within_budget():
+    """Importing the app and serving the first request must stay fast."""
+
+    result = measure(runs=3)
+    assert not over_budget(result), result
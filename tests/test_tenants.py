@@ -0,0 +1,133 @@
+import asyncio
+import json
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.tenants import TenantMiddleware, TenantStores
+
+
+def _write_tenant(directory: Path, name: str, title: str) -> None:
+    data = json.loads(main.DATA_PATH.read_text())
+    data["overview"]["title"] = title
+    (directory / f"{name}.json").write_text(json.dumps(data))
+
+
+def test_tenant_stores_load_lazily_and_evict_least_recently_used(tmp_path):
+    for name in ("ann", "bob", "cy"):
+        _write_tenant(tmp_path, name, name.upper())
+    stores = TenantStores(tmp_path, main.STORE, max_tenants=2, reload_interval=0)
+
+    async def run():
+        assert stores.stats()["resident"] == 0
+        ann = await stores.get("ann")
+        assert ann.current.data["overview"]["title"] == "ANN"
+        assert await stores.get("ann") is ann
+        await stores.get("bob")
+        await stores.get("ann")  # bob is now least recently used
+        await stores.get("cy")
+        assert list(stores.stores) == ["ann", "cy"]
+        assert await stores.get("default") is main.STORE
+        assert await stores.get("nobody") is None
+        assert await stores.get("../resume") is None
+
+    asyncio.run(run())
+    assert stores.stats()["loads"] == 3
+    assert stores.stats()["evictions"] == 1
+
+
+def test_path_tenants_get_their_own_resume_and_sessions(monkeypatch, tmp_path):
+    _write_tenant(tmp_path, "jane", "Jane's Title")
+    monkeypatch.setattr(main, "TENANTS", TenantStores(tmp_path, main.STORE, reload_interval=0))
+    client = TestClient(TenantMiddleware(main.app, mode="path"))
+
+    assert client.get("/t/jane/api/resume").json()["overview"]["title"] == "Jane's Title"
+    assert client.get("/t/nobody/api/start").status_code == 404
+
+    jane = client.get("/t/jane/api/start").json()["session_id"]
+    default = client.get("/api/start").json()["session_id"]
+    resp = client.post("/t/jane/api/command", json={"session_id": jane, "command": "open overview"})
+    assert "Jane's Title" in resp.json()["text"]
+    resp = client.post("/api/command", json={"session_id": jane, "command": "help"})
+    assert resp.json()["text"] == "Invalid session."
+    resp = client.post("/t/jane/api/command", json={"session_id": default, "command": "help"})
+    assert resp.json()["text"] == "Invalid session."
+
+
+def test_host_tenants_strip_the_configured_suffix(monkeypatch, tmp_path):
+    _write_tenant(tmp_path, "jane", "Jane's Title")
+    monkeypatch.setattr(main, "TENANTS", TenantStores(tmp_path, main.STORE, reload_interval=0))
+    client = TestClient(TenantMiddleware(main.app, mode="host", host_suffix=".resumes.test"))
+
+    resp = client.get("/api/resume", headers={"host": "jane.resumes.test:8000"})
+    assert resp.json()["overview"]["title"] == "Jane's Title"
+    resp = client.get("/api/resume", headers={"host": "example.org"})
+    assert resp.json() == main.STORE.current.data
+
+
+def test_tenant_reloads_run_off_the_event_loop(tmp_path):
+    _write_tenant(tmp_path, "ann", "Old")
+    threads = []
+    stores = TenantStores(
+        tmp_path, main.STORE, reload_interval=0.01,
+        on_load=lambda snapshot: threads.append(threading.current_thread()),
+    )
+
+    async def run():
+        ann = await stores.get("ann")
+        _write_tenant(tmp_path, "ann", "New title")
+        await asyncio.sleep(0.02)
+        assert (await stores.get("ann")) is ann
+        return ann.current.data["overview"]["title"]
+
+    assert asyncio.run(run()) == "New title"
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+def test_unknown_broken_and_invalid_tenants_are_rejected(monkeypatch, tmp_path):
+    (tmp_path / "broken.json").write_text("{not json")
+    stores = TenantStores(tmp_path, main.STORE, reload_interval=0)
+    monkeypatch.setattr(main, "TENANTS", stores)
+    client = TestClient(TenantMiddleware(main.app, mode="path"))
+
+    assert asyncio.run(stores.get("broken")) is None
+    assert asyncio.run(stores.get("UPPER")) is None
+    assert client.get("/t/broken/api/resume").status_code == 404
+    assert client.get("/t/nobody/api/export/txt").status_code == 404
+    assert client.get("/t/nobody/api/complete?line=op").status_code == 404
+    default = client.get("/api/start").json()["session_id"]
+    resp = client.post("/t/nobody/api/command", json={"session_id": default, "command": "help"})
+    assert resp.json()["text"] == "Invalid session."
+    resp = client.post("/t/nobody/api/batch", json={"session_id": default, "commands": ["help"]})
+    assert resp.json() == {"text": "Invalid session.", "results": []}
+    # Names that are not tenant names are ordinary (missing) paths.
+    assert client.get("/t/Bad_Name/api/resume").status_code == 404
+    assert stores.stats()["resident"] == 0
+
+
+def test_tenants_never_see_the_default_filesystem(monkeypatch, tmp_path):
+    _write_tenant(tmp_path, "jane", "Jane's Title")
+    _write_tenant(tmp_path, "kim", "Kim's Title")
+    tree = {"type": "dir", "children": {"contact.txt": {"type": "file", "content": "Reach Kim."}}}
+    (tmp_path / "kim.filesystem.json").write_text(json.dumps(tree))
+    monkeypatch.setattr(main, "TENANTS", TenantStores(tmp_path, main.STORE, reload_interval=0))
+    client = TestClient(TenantMiddleware(main.app, mode="path"))
+    owner = main.FILESYSTEM.nodes["/contact.txt"].content
+
+    def run(prefix, command):
+        session_id = client.get(f"{prefix}/api/start").json()["session_id"]
+        body = {"session_id": session_id, "command": command}
+        return client.post(f"{prefix}/api/command", json=body).json()["text"]
+
+    assert run("", "cat contact.txt") == owner
+    assert run("/t/kim", "cat contact.txt") == "Reach Kim."
+    jane = run("/t/jane", "cat contact.txt")
+    assert "No such file" in jane and owner not in jane
+    assert run("/t/jane", "ls") == ""
+    assert run("/t/jane", "grep reach") == "No matches."
@@ -0,0 +1,67 @@
+import hashlib
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.sessions import new_session
+from app.tokens import NONCE_FIELD, SessionTokens
+
+
+def test_token_round_trip_rejects_tampering_and_expiry():
+    tokens = SessionTokens(b"secret", ttl=60)
+    state = {**new_session(now=1000), "current_section": "projects", "page": 2, "cwd": "/skills"}
+
+    token = tokens.encode(state)
+
+    assert tokens.decode(token, now=1010) == state
+    assert tokens.decode(token, now=1060) is None
+    assert SessionTokens(b"other", ttl=60).decode(token, now=1010) is None
+    payload, signature = token[2:].split(".")
+    assert tokens.decode(f"t.{payload[:-2]}AA.{signature}", now=1010) is None
+    assert tokens.decode("t.é.x", now=1010) is None
+    assert SessionTokens(b"secret", ttl=60, max_bytes=32).encode(state) is None
+
+
+def test_token_mode_keeps_small_states_client_side_and_spills_large_ones(monkeypatch):
+    monkeypatch.setattr(main, "TOKENS", SessionTokens(b"secret", ttl=3600, max_bytes=256))
+    resident = len(main.sessions)
+    client = TestClient(main.app)
+
+    token = client.get("/api/start").json()["session_id"]
+    assert token.startswith("t.")
+    resp = client.post("/api/command", json={"session_id": token, "command": "open projects"}).json()
+    token = resp["session_id"]
+    assert resp["text"].startswith("[1]")
+    assert main.TOKENS.decode(token)["current_section"] == "projects"
+    assert len(main.sessions) == resident
+
+    note = "".join(hashlib.sha256(bytes([i])).hexdigest() for i in range(2))  # incompressible
+    resp = client.post(
+        "/api/command", json={"session_id": token, "command": f"notes --add 1 '{note}'"}
+    ).json()
+    server_id = resp["session_id"]
+    assert not server_id.startswith("t.")
+    assert server_id in main.sessions
+    resp = client.post("/api/command", json={"session_id": server_id, "command": "notes --show 1"})
+    assert note in resp.json()["text"]
+    assert "session_id" not in resp.json()
+
+
+def test_back_to_an_empty_history_keeps_the_token_valid(monkeypatch):
+    monkeypatch.setattr(main, "TOKENS", SessionTokens(b"secret", ttl=3600))
+    client = TestClient(main.app)
+
+    token = client.get("/api/start").json()["session_id"]
+    nonce = main.TOKENS.decode(token)[NONCE_FIELD]
+    resp = client.post("/api/command", json={"session_id": token, "command": "back"}).json()
+    assert resp["text"] == ""
+    token = resp.get("session_id", token)
+    assert main.TOKENS.decode(token)[NONCE_FIELD] == nonce
+
+    resp = client.post("/api/command", json={"session_id": token, "command": "help"})
+    assert resp.status_code == 200
+    assert "Invalid session" not in resp.json()["text"]
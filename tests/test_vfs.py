@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.main import handle_command
+from app.vfs import FileSystem
+
+TREE = {
+    "type": "dir",
+    "children": {
+        "notes.txt": {"type": "file", "content": "Azure\nKubernetes clusters"},
+        "labs": {
+            "type": "dir",
+            "children": {
+                "net-lab.txt": {"type": "file", "content": "VLAN trunking\nOSPF"},
+                "ad-lab.txt": {"type": "file", "content": "Active Directory"},
+            },
+        },
+    },
+}
+
+
+def test_resolve_follows_parent_links_and_rejects_missing_paths():
+    fs = FileSystem(TREE)
+
+    assert fs.nodes["/labs/net-lab.txt"].parent == "/labs"
+    assert fs.resolve("/labs", "../notes.txt") == "/notes.txt"
+    assert fs.resolve("/labs", "/../labs/./ad-lab.txt") == "/labs/ad-lab.txt"
+    assert fs.resolve("/", "notes.txt/x") is None
+    assert fs.resolve("/", "missing") is None
+    assert fs.expand("/labs", "../*/*-lab.txt") == ["/labs/ad-lab.txt", "/labs/net-lab.txt"]
+
+
+def test_grep_uses_trigram_candidates_and_reports_lines():
+    fs = FileSystem(TREE)
+
+    assert fs.grep("vlan", ["/"]) == [("/labs/net-lab.txt", 1, "VLAN trunking")]
+    assert fs.grep("ospf", ["/notes.txt"]) == []
+    assert fs.find("/", "*lab*") == ["/labs/ad-lab.txt", "/labs/net-lab.txt"]
+
+
+def test_find_reads_the_files_indexed_under_each_directory():
+    tree = {
+        "type": "dir",
+        "children": {
+            **TREE["children"],
+            "labs-old": {"type": "dir", "children": {"x.txt": {"type": "file", "content": ""}}},
+            "empty": {"type": "dir", "children": {}},
+        },
+    }
+    fs = FileSystem(tree)
+    fs.files = ()  # the index, not a scan of every path, answers ``find``
+
+    assert fs.find("/labs") == ["/labs/ad-lab.txt", "/labs/net-lab.txt"]
+    assert fs.find("/labs", "NET") == ["/labs/net-lab.txt"]
+    assert fs.find("/notes.txt") == ["/notes.txt"]
+    assert fs.find("/empty") == []
+    assert fs.find("/", "*.txt") == [
+        "/labs-old/x.txt", "/labs/ad-lab.txt", "/labs/net-lab.txt", "/notes.txt"
+    ]
+
+
+def test_shell_commands_keep_only_cwd_in_session():
+    state = {}
+
+    assert handle_command(state, "cd projects")["text"] == ""
+    assert handle_command(state, "pwd")["text"] == "/projects"
+    assert "Packet Tracer" in handle_command(state, "cat *2022*")["text"]
+    assert handle_command(state, "cd ..")["text"] == ""
+    assert "├── projects/" in handle_command(state, "tree")["text"]
+    assert handle_command(state, "cd about.txt")["error"]
+    assert state == {"cwd": "/"}